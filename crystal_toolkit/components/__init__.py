@@ -23,6 +23,7 @@ from crystal_toolkit.components.structure import StructureMoleculeComponent
 
 # from crystal_toolkit.components.submit_snl import SubmitSNLPanel
 from crystal_toolkit.components.symmetry import SymmetryPanel
+from crystal_toolkit.components.trajectory import TrajectoryComponent
 from crystal_toolkit.components.transformations.autooxistatedecoration import (
     AutoOxiStateDecorationTransformationComponent,
 )
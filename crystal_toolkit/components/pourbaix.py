@@ -18,6 +18,7 @@ from shapely.geometry import Polygon
 
 import crystal_toolkit.helpers.layouts as ctl
 from crystal_toolkit.components.messageAIO import MessageAIO
+from crystal_toolkit.core.fingerprint import memoize
 from crystal_toolkit.core.mpcomponent import MPComponent
 
 try:
@@ -783,7 +784,7 @@ class PourbaixDiagramComponent(MPComponent):
                 {"display": "block", "height": "36px"},
             )
 
-        @cache.memoize(timeout=5 * 60)
+        @memoize(cache, timeout=5 * 60)
         def get_pourbaix_diagram(pourbaix_entries, **kwargs):
             return PourbaixDiagram(pourbaix_entries, **kwargs)
 
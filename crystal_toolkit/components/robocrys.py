@@ -5,6 +5,7 @@ from dash.dependencies import Input, Output
 from robocrys import StructureCondenser, StructureDescriber
 from robocrys import __version__ as robocrys_version
 
+from crystal_toolkit.core.fingerprint import memoize
 from crystal_toolkit.core.panelcomponent import PanelComponent
 from crystal_toolkit.helpers.layouts import Loading, MessageBody, MessageContainer
 
@@ -28,7 +29,7 @@ class RobocrysComponent(PanelComponent):
         super().generate_callbacks(app, cache)
 
         @app.callback(Output(self.id("robocrys"), "children"), Input(self.id(), "data"))
-        @cache.memoize()
+        @memoize(cache)
         def run_robocrys_analysis(new_store_contents):
             struct = self.from_data(new_store_contents)
 
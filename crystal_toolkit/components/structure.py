@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import re
+import threading
+import time
 import warnings
 from base64 import b64encode
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import partial
 from itertools import chain, combinations_with_replacement
+from multiprocessing import Pipe, Process
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
 import numpy as np
+from dash import Patch, callback_context
 from dash import dash_table as dt
 from dash.dependencies import Component, Input, Output, State
 from dash.exceptions import PreventUpdate
@@ -16,19 +24,28 @@ from dash_mp_components import CrystalToolkitScene
 from emmet.core.settings import EmmetSettings
 from frozendict import frozendict
 from pymatgen.analysis.graphs import MoleculeGraph, StructureGraph
-from pymatgen.analysis.local_env import NearNeighbors
+from pymatgen.analysis.local_env import CutOffDictNN, NearNeighbors
 from pymatgen.core import Composition, Molecule, Species, Structure
 from pymatgen.core.periodic_table import DummySpecie
+from pymatgen.core.surface import Slab
 from pymatgen.io.lobster.lobsterenv import LobsterNeighbors
 from pymatgen.io.vasp.sets import MPRelaxSet
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 
+from crystal_toolkit.core.fingerprint import get_fingerprint, memoize
+from crystal_toolkit.core.graph_cache import get_graph_cache
 from crystal_toolkit.core.legend import Legend
 from crystal_toolkit.core.mpcomponent import MPComponent
+from crystal_toolkit.core.object_store import ObjectStore
 from crystal_toolkit.core.scene import Scene
-from crystal_toolkit.helpers.layouts import H2, Field, dcc, html
+from crystal_toolkit.helpers.layouts import H2, Field, Help, dcc, html
+from crystal_toolkit.renderables.site import get_site_tooltips
 from crystal_toolkit.settings import SETTINGS
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from multiprocessing.connection import Connection
+
 # TODO: make dangling bonds "stubs"? (fixed length)
 
 DEFAULTS: dict[str, str | bool] = {
@@ -49,6 +66,508 @@ DEFAULTS: dict[str, str | bool] = {
     "show_position_button": True,
 }
 
+# decode base64 typed arrays (see Scene.to_json) into nested arrays, and expand
+# IndexedCylinders and IndexedSurfaces, before a scene is passed to CrystalToolkitScene
+_DECODE_SCENE_JS = """
+function (encodedScene) {
+    if (!encodedScene) {
+        return window.dash_clientside.no_update
+    }
+
+    const reshape = function (view, dtype, shape, offset) {
+        if (shape.length === 1) {
+            const values = new Array(shape[0])
+            for (let i = 0; i < shape[0]; i++) {
+                values[i] = dtype === 'uint32'
+                    ? view.getUint32(4 * (offset + i), true)
+                    : view.getFloat32(4 * (offset + i), true)
+            }
+            return values
+        }
+        const stride = shape.slice(1).reduce((a, b) => a * b, 1)
+        const values = new Array(shape[0])
+        for (let i = 0; i < shape[0]; i++) {
+            values[i] = reshape(
+                view, dtype, shape.slice(1), offset + i * stride
+            )
+        }
+        return values
+    }
+
+    const decode = function (obj) {
+        if (Array.isArray(obj)) {
+            return obj.map(decode)
+        }
+        if (obj === null || typeof obj !== 'object') {
+            return obj
+        }
+        if (typeof obj.buffer === 'string' && obj.dtype) {
+            const bytes = Uint8Array.from(atob(obj.buffer), c => c.charCodeAt(0))
+            return reshape(new DataView(bytes.buffer), obj.dtype, obj.shape, 0)
+        }
+        const decoded = {}
+        Object.keys(obj).forEach(function (key) {
+            decoded[key] = decode(obj[key])
+        })
+        return decoded
+    }
+
+    const expand = function (obj) {
+        if (obj === null || !Array.isArray(obj.contents)) {
+            return obj
+        }
+        const positions = obj.positions || []
+        const scene = Object.assign({}, obj)
+        delete scene.positions
+        delete scene._animate
+        // positions of the table in each frame of its animation,
+        // accumulated in float32 as when they were encoded
+        let frames = null
+        if (obj._animate) {
+            let previous = positions
+            frames = obj._animate.map(function (deltas) {
+                previous = previous.map(
+                    (p, i) => p.map((x, k) => Math.fround(x + deltas[i][k]))
+                )
+                return previous
+            })
+        }
+        scene.contents = obj.contents.map(function (item) {
+            if (item && item.type === 'indexedSurface') {
+                const surface = Object.assign({}, item)
+                delete surface.faces
+                surface.type = 'surface'
+                surface.positions = []
+                surface.normals = item.normals ? [] : undefined
+                item.faces.forEach(function (face) {
+                    face.forEach(function (i) {
+                        surface.positions.push(item.positions[i])
+                        if (item.normals) {
+                            surface.normals.push(item.normals[i])
+                        }
+                    })
+                })
+                return surface
+            }
+            if (!item || item.type !== 'indexedCylinders') {
+                return expand(item)
+            }
+            const split = item.split === undefined ? 0.5 : item.split
+            const cylinders = Object.assign({}, item)
+            delete cylinders.indexPairs
+            delete cylinders.split
+            cylinders.type = 'cylinders'
+            const getPositionPairs = function (table) {
+                return item.indexPairs.map(function (pair) {
+                    const start = table[pair[0]]
+                    const end = table[pair[1]]
+                    return [
+                        start,
+                        start.map((x, k) => (1 - split) * x + split * end[k])
+                    ]
+                })
+            }
+            cylinders.positionPairs = getPositionPairs(positions)
+            if (frames) {
+                let previous = cylinders.positionPairs
+                cylinders._animate = frames.map(function (table) {
+                    const pairs = getPositionPairs(table)
+                    const deltas = pairs.map((pair, i) => pair.map(
+                        (p, j) => p.map((x, k) => x - previous[i][j][k])
+                    ))
+                    previous = pairs
+                    return deltas
+                })
+            }
+            return cylinders
+        })
+        return scene
+    }
+
+    return expand(decode(encodedScene))
+}
+"""
+
+
+UNIT_CELL_CHOICES = (
+    "input",
+    "primitive",
+    "conventional",
+    "reduced_niggli",
+    "reduced_lll",
+)
+
+# number of bonding processes running, at most BONDING_POOL_SIZE
+_BONDING_PROCESSES = 0
+_BONDING_PROCESSES_CONDITION = threading.Condition()
+
+
+def _wrap_frac_coords(structure: Structure) -> Structure:
+    """Structure with its fractional coordinates normalized to be in [0,1) (this is
+    actually not guaranteed by Structure). The structure is returned as-is if they
+    already are, otherwise a new structure of the same class is created from the
+    wrapped coordinates array, keeping site properties.
+    """
+    frac_coords = structure.frac_coords
+    wrapped_coords = np.mod(frac_coords, 1)
+    if np.array_equal(wrapped_coords, frac_coords):
+        return structure
+    if isinstance(structure, Slab):
+        wrapped = Slab(
+            structure.lattice,
+            structure.species_and_occu,
+            wrapped_coords,
+            structure.miller_index,
+            structure.oriented_unit_cell,
+            structure.shift,
+            structure.scale_factor,
+            reorient_lattice=False,
+            reconstruction=structure.reconstruction,
+            site_properties=structure.site_properties,
+            energy=structure.energy,
+        )
+    else:
+        wrapped = Structure(
+            structure.lattice,
+            structure.species_and_occu,
+            wrapped_coords,
+            charge=structure.charge,
+            site_properties=structure.site_properties,
+            labels=structure.labels,
+        )
+    wrapped.properties = dict(structure.properties)
+    return wrapped
+
+
+def _get_graph(
+    struct_or_mol: Structure | Molecule, strategy: NearNeighbors
+) -> StructureGraph | MoleculeGraph:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if isinstance(struct_or_mol, Structure):
+            return StructureGraph.with_local_env_strategy(struct_or_mol, strategy)
+        return MoleculeGraph.with_local_env_strategy(
+            struct_or_mol, strategy, reorder=False
+        )
+
+
+def _get_empty_graph(
+    struct_or_mol: Structure | Molecule,
+) -> StructureGraph | MoleculeGraph:
+    if isinstance(struct_or_mol, Structure):
+        return StructureGraph.with_empty_graph(struct_or_mol)
+    return MoleculeGraph.with_empty_graph(struct_or_mol)
+
+
+def _send_graph(
+    connection: Connection, struct_or_mol: Structure | Molecule, strategy: NearNeighbors
+) -> None:
+    # runs in the bonding process, and sends the graph or the exception back
+    try:
+        result = (True, _get_graph(struct_or_mol, strategy))
+    except Exception as exc:
+        result = (False, exc)
+    try:
+        connection.send(result)
+    except Exception as exc:
+        # e.g. an exception which cannot be pickled
+        connection.send((False, RuntimeError(repr(exc))))
+    finally:
+        connection.close()
+
+
+def _get_graph_in_process(
+    struct_or_mol: Structure | Molecule, strategy: NearNeighbors
+) -> StructureGraph | MoleculeGraph:
+    """Compute a bonding graph in a separate process, so that pathological structures
+    do not hold the thread serving the request for longer than BONDING_TIMEOUT. Each
+    computation has its own process, which is killed on a timeout without affecting
+    the computations of other requests, and at most BONDING_POOL_SIZE of them run at
+    once.
+
+    Raises:
+        concurrent.futures.TimeoutError: if the graph is not computed in time,
+            including the time spent waiting for other computations to finish.
+    """
+    global _BONDING_PROCESSES  # noqa: PLW0603
+    if SETTINGS.BONDING_POOL_SIZE <= 0:
+        return _get_graph(struct_or_mol, strategy)
+    deadline = time.monotonic() + SETTINGS.BONDING_TIMEOUT
+    with _BONDING_PROCESSES_CONDITION:
+        if not _BONDING_PROCESSES_CONDITION.wait_for(
+            lambda: _BONDING_PROCESSES < SETTINGS.BONDING_POOL_SIZE,
+            timeout=SETTINGS.BONDING_TIMEOUT,
+        ):
+            raise FuturesTimeoutError
+        _BONDING_PROCESSES += 1
+    receiver, sender = Pipe(duplex=False)
+    process = Process(
+        target=_send_graph, args=(sender, struct_or_mol, strategy), daemon=True
+    )
+    try:
+        process.start()
+        # only the process holds the sending end, so that its exit is noticed
+        sender.close()
+        if not receiver.poll(max(deadline - time.monotonic(), 0)):
+            process.kill()
+            raise FuturesTimeoutError
+        try:
+            success, result = receiver.recv()
+        except EOFError:
+            # e.g. killed for running out of memory
+            process.join()
+            raise RuntimeError(
+                f"Bonding process exited with code {process.exitcode}"
+            ) from None
+        if not success:
+            raise result
+        return result
+    finally:
+        receiver.close()
+        sender.close()
+        if process.pid is not None:
+            process.join()
+        with _BONDING_PROCESSES_CONDITION:
+            _BONDING_PROCESSES -= 1
+            _BONDING_PROCESSES_CONDITION.notify()
+
+
+def _get_unit_cell(structure: Structure, unit_cell_choice: str) -> Structure:
+    if unit_cell_choice == "primitive":
+        return structure.get_primitive_structure()
+    if unit_cell_choice == "conventional":
+        sga = SpacegroupAnalyzer(structure)
+        return sga.get_conventional_standard_structure()
+    if unit_cell_choice == "reduced_niggli":
+        return structure.get_reduced_structure(reduction_algo="niggli")
+    if unit_cell_choice == "reduced_lll":
+        return structure.get_reduced_structure(reduction_algo="LLL")
+    return structure
+
+
+class UnitCellCache:
+    """Least recently used cache of structures in alternate unit cells (primitive,
+    conventional, etc.), keyed by the fingerprint of the input structure and the unit
+    cell choice. The unit cells of a structure, and their bonding graphs, can be
+    computed in the background when the structure is loaded, so that changing the
+    unit cell choice in StructureMoleculeComponent does not wait for the symmetry
+    analysis and bonding.
+
+    Since the cache is shared by all sessions of an app, background tasks are tracked
+    per structure, and those of structures that were not requested by any session
+    for idle_timeout seconds are abandoned when other structures are precomputed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        max_workers: int | None = 1,
+        idle_timeout: float = 60,
+    ) -> None:
+        """
+        Args:
+            maxsize (int, optional): Maximum number of unit cells to keep. Defaults
+                to 64.
+            max_workers (int, optional): Number of threads used by precompute.
+                Defaults to 1, so that background work does not compete with
+                requests.
+            idle_timeout (float, optional): Number of seconds after which the
+                background tasks of a structure that is no longer requested are
+                abandoned. Defaults to 60.
+        """
+        self.maxsize = maxsize
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self._cells: OrderedDict[tuple[str, str], Structure] = OrderedDict()
+        self._pending: dict[tuple[str, str], Future] = {}
+        # time each structure was last requested, and the event set to abandon its
+        # background tasks, keyed by fingerprint while it has pending tasks
+        self._requested: dict[str, float] = {}
+        self._cancel_events: dict[str, threading.Event] = {}
+        # re-entrant, since done callbacks run in the thread that cancels a future,
+        # or adds a callback to a future which is already done
+        self._lock = threading.RLock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def get(self, structure: Structure, unit_cell_choice: str) -> Structure:
+        """Get the structure in a unit cell, computing it on a cache miss.
+
+        Args:
+            structure (Structure): The input structure.
+            unit_cell_choice (str): One of "input", "primitive", "conventional",
+                "reduced_niggli" or "reduced_lll".
+
+        Returns:
+            Structure: The structure in that unit cell.
+        """
+        if unit_cell_choice == "input":
+            return structure
+        key = (get_fingerprint(structure), unit_cell_choice)
+        with self._lock:
+            if key[0] in self._requested:
+                self._requested[key[0]] = time.monotonic()
+            # wait for a background task to also finish the bonding graph
+            pending = self._pending.get(key)
+            if pending is None and key in self._cells:
+                self.hits += 1
+                self._cells.move_to_end(key)
+                return self._cells[key]
+        if pending is not None:
+            try:
+                cell = pending.result()
+            except CancelledError:
+                cell = None
+            if cell is not None:
+                with self._lock:
+                    self.hits += 1
+                return cell
+        with self._lock:
+            self.misses += 1
+        cell = _get_unit_cell(structure, unit_cell_choice)
+        self._add(key, cell)
+        return cell
+
+    def precompute(
+        self,
+        structure: Structure,
+        unit_cell_choices: Iterable[str],
+        graph_options: dict | None = None,
+    ) -> list[Future]:
+        """Compute the structure in several unit cells, and optionally their bonding
+        graphs, in the background. The background tasks of other structures that were
+        not requested for idle_timeout seconds are abandoned.
+
+        Args:
+            structure (Structure): The input structure.
+            unit_cell_choices (Iterable[str]): The unit cells to compute.
+            graph_options (dict, optional): bonding_strategy and
+                bonding_strategy_kwargs to compute the bonding graphs with, which are
+                then served from the graph cache. Defaults to None, in which case only
+                the unit cells are computed.
+
+        Returns:
+            list[Future]: One future per unit cell that is computed, which resolves to
+                the structure in that unit cell, or None if abandoned.
+        """
+        fingerprint = get_fingerprint(structure)
+        futures = []
+        with self._lock:
+            now = time.monotonic()
+            for idle_fingerprint, requested in list(self._requested.items()):
+                if (
+                    idle_fingerprint != fingerprint
+                    and now - requested > self.idle_timeout
+                ):
+                    self._abandon(idle_fingerprint)
+            self._requested[fingerprint] = now
+            cancel_event = self._cancel_events.setdefault(
+                fingerprint, threading.Event()
+            )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="unit_cell"
+                )
+            for unit_cell_choice in unit_cell_choices:
+                key = (fingerprint, unit_cell_choice)
+                if key in self._pending:
+                    continue
+                future = self._executor.submit(
+                    self._compute, key, structure, graph_options, cancel_event
+                )
+                self._pending[key] = future
+                future.add_done_callback(partial(self._remove_pending, key))
+                futures.append(future)
+        return futures
+
+    def touch(self, fingerprint: str, unit_cell_choices: Iterable[str]) -> bool:
+        """Mark a structure as requested, so that its background tasks are not
+        abandoned, without decoding it.
+
+        Args:
+            fingerprint (str): The fingerprint of the structure, see get_fingerprint.
+            unit_cell_choices (Iterable[str]): The unit cells to check.
+
+        Returns:
+            bool: Whether all these unit cells are cached or being computed, in which
+                case they do not need to be precomputed.
+        """
+        with self._lock:
+            if fingerprint in self._requested:
+                self._requested[fingerprint] = time.monotonic()
+            return all(
+                (fingerprint, choice) in self._pending
+                or (fingerprint, choice) in self._cells
+                for choice in unit_cell_choices
+            )
+
+    def cache_info(self) -> dict[str, int]:
+        """Get the number of hits, misses and cached unit cells."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cells),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Remove all cached unit cells and reset the hit and miss counts."""
+        with self._lock:
+            self._cells.clear()
+            self.hits = self.misses = 0
+
+    def _compute(
+        self,
+        key: tuple[str, str],
+        structure: Structure,
+        graph_options: dict | None,
+        cancel_event: threading.Event,
+    ) -> Structure | None:
+        if cancel_event.is_set():
+            return None
+        with self._lock:
+            cell = self._cells.get(key)
+        if cell is None:
+            cell = _get_unit_cell(structure, key[1])
+            self._add(key, cell)
+        if graph_options is not None and not cancel_event.is_set():
+            StructureMoleculeComponent._preprocess_input_to_graph(cell, **graph_options)
+        return cell
+
+    def _abandon(self, fingerprint: str) -> None:
+        # called with the lock held; tasks which are running stop before bonding
+        self._cancel_events.pop(fingerprint).set()
+        del self._requested[fingerprint]
+        for key, future in list(self._pending.items()):
+            if key[0] == fingerprint:
+                future.cancel()
+
+    def _remove_pending(self, key: tuple[str, str], future: Future) -> None:
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            if not any(pending[0] == key[0] for pending in self._pending):
+                # no longer tracked once all tasks of the structure are done
+                self._requested.pop(key[0], None)
+                self._cancel_events.pop(key[0], None)
+
+    def _add(self, key: tuple[str, str], cell: Structure) -> None:
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._cells[key] = cell
+            self._cells.move_to_end(key)
+            while len(self._cells) > self.maxsize:
+                self._cells.popitem(last=False)
+
+
+UNIT_CELL_CACHE = UnitCellCache(
+    maxsize=SETTINGS.UNIT_CELL_CACHE_SIZE,
+    idle_timeout=SETTINGS.UNIT_CELL_PRECOMPUTE_IDLE_TIMEOUT,
+)
+
 
 class StructureMoleculeComponent(MPComponent):
     """A component to display pymatgen Structure, Molecule, StructureGraph and MoleculeGraph
@@ -117,6 +636,7 @@ class StructureMoleculeComponent(MPComponent):
         show_position_button: bool = DEFAULTS["show_position_button"],
         scene_kwargs: dict | None = None,
         site_get_scene_kwargs: dict | None = None,
+        incremental_scene_updates: bool = False,
         **kwargs,
     ) -> None:
         """Create a StructureMoleculeComponent from a structure or molecule.
@@ -154,6 +674,9 @@ class StructureMoleculeComponent(MPComponent):
                 e.g. sceneSize, axisView, renderer, customCameraState, etc. See
                 https://github.com/materialsproject/dash-mp-components/blob/maindash_mp_components/CrystalToolkitScene.py
                 for complete list.
+            incremental_scene_updates (bool, optional): if True, changes to display options only
+                send the difference to the displayed scene (see Scene.diff) to the browser rather
+                than the whole scene. Defaults to False.
             **kwargs: extra keyword arguments to pass to MPComponent. e.g. Wyckoff label.
         """
         super().__init__(id=id, default_data=struct_or_mol, **kwargs)
@@ -165,6 +688,12 @@ class StructureMoleculeComponent(MPComponent):
         self.show_image_button = show_image_button
         self.show_export_button = show_export_button
         self.show_position_button = show_position_button
+        self.incremental_scene_updates = incremental_scene_updates
+        self._decode_scene_client_side = (
+            SETTINGS.SCENE_TYPED_ARRAYS
+            or SETTINGS.SCENE_INDEXED_BONDS
+            or SETTINGS.SCENE_INDEXED_SURFACES
+        )
 
         self.initial_scene_settings = {**self.default_scene_settings}
         if scene_settings:
@@ -202,12 +731,15 @@ class StructureMoleculeComponent(MPComponent):
         if scene_additions:
             initial_scene_additions = Scene(
                 name="scene_additions", contents=scene_additions
-            ).to_json()
+            ).to_json(indexed_surfaces=SETTINGS.SCENE_INDEXED_SURFACES)
         else:
             initial_scene_additions = None
         self.create_store("scene_additions", initial_data=initial_scene_additions)
 
         if struct_or_mol:
+            self._precompute_unit_cells(
+                struct_or_mol, self.initial_data["graph_generation_options"]
+            )
             # graph is cached explicitly, this isn't necessary but is an
             # optimization so that graph is only re-generated if bonding
             # algorithm changes
@@ -240,9 +772,28 @@ class StructureMoleculeComponent(MPComponent):
         self.create_store("legend_data", initial_data=legend)
         self.create_store("graph", initial_data=graph)
 
+        if self._decode_scene_client_side:
+            # scene contains typed arrays or indexed bonds which have to be decoded
+            # client-side before they can be passed to the CrystalToolkitScene component
+            self.create_store("encoded_scene", initial_data=scene)
+            scene = None
+
         # this is used by a CrystalToolkitScene component, not a dcc.Store
         self._initial_data["scene"] = scene
 
+        if incremental_scene_updates:
+            # options used to generate the displayed scene, which scene updates are
+            # computed relative to, or None if it cannot be re-generated in callbacks
+            self.create_store(
+                "displayed_scene_options",
+                initial_data=None
+                if site_get_scene_kwargs
+                else {
+                    "display_options": self.initial_data["display_options"],
+                    "scene_additions": self.initial_data["scene_additions"],
+                },
+            )
+
         is_mol = isinstance(struct_or_mol, (Molecule, MoleculeGraph))
         self.scene_kwargs = {
             # hide axes inset for molecules
@@ -331,17 +882,8 @@ class StructureMoleculeComponent(MPComponent):
             State(self.id("display_options"), "data"),
         )
 
-        @app.callback(
-            Output(self.id("graph"), "data"),
-            Input(self.id("graph_generation_options"), "data"),
-            Input(self.id(), "data"),
-            State(self.id("graph"), "data"),
-        )
-        @cache.memoize()
-        def update_graph(graph_generation_options, struct_or_mol, current_graph):
-            if not struct_or_mol:
-                raise PreventUpdate
-
+        @memoize(cache)
+        def get_graph(graph_generation_options, struct_or_mol, current_graph):
             struct_or_mol = self.from_data(struct_or_mol)
             current_graph = self.from_data(current_graph)
 
@@ -380,38 +922,132 @@ class StructureMoleculeComponent(MPComponent):
             return graph
 
         @app.callback(
-            Output(self.id("scene"), "data"),
-            Input(self.id("graph"), "data"),
-            Input(self.id("display_options"), "data"),
-            Input(self.id("scene_additions"), "data"),
+            Output(self.id("graph"), "data"),
+            Input(self.id("graph_generation_options"), "data"),
+            Input(self.id(), "data"),
+            State(self.id("graph"), "data"),
         )
-        @cache.memoize()
-        def update_scene(graph, display_options, scene_additions):
-            if not graph or not display_options:
+        def update_graph(graph_generation_options, struct_or_mol, current_graph):
+            if not struct_or_mol:
                 raise PreventUpdate
+
+            # not memoized, so that this also happens when the graph is cached
+            self._precompute_unit_cells(struct_or_mol, graph_generation_options)
+
+            return get_graph(graph_generation_options, struct_or_mol, current_graph)
+
+        if self._decode_scene_client_side:
+            app.clientside_callback(
+                _DECODE_SCENE_JS,
+                Output(self.id("scene"), "data"),
+                Input(self.id("encoded_scene"), "data"),
+            )
+
+        # the scene and legend are computed together, and both are served from the
+        # same callback so that the scene is only built once per interaction
+        @memoize(cache)
+        def get_scene_and_legend_json(graph, display_options, scene_additions):
             display_options = self.from_data(display_options)
             graph = self.from_data(graph)
-            scene, _ = self.get_scene_and_legend(
+            return self.get_scene_and_legend(
                 graph, **display_options, scene_additions=scene_additions
             )
-            return scene
 
-        @app.callback(
-            Output(self.id("legend_data"), "data"),
-            Input(self.id("graph"), "data"),
-            Input(self.id("display_options"), "data"),
-            Input(self.id("scene_additions"), "data"),
+        scene_output = Output(
+            self.id("encoded_scene" if self._decode_scene_client_side else "scene"),
+            "data",
         )
-        @cache.memoize()
-        def update_legend_and_colors(graph, display_options, scene_additions):
-            if not graph or not display_options:
-                raise PreventUpdate
-            display_options = self.from_data(display_options)
-            graph = self.from_data(graph)
-            _, legend = self.get_scene_and_legend(
-                graph, **display_options, scene_additions=scene_additions
+
+        if self.incremental_scene_updates:
+
+            @app.callback(
+                scene_output,
+                Output(self.id("legend_data"), "data"),
+                Output(self.id("displayed_scene_options"), "data"),
+                Input(self.id("graph"), "data"),
+                Input(self.id("display_options"), "data"),
+                Input(self.id("scene_additions"), "data"),
+                State(self.id("displayed_scene_options"), "data"),
             )
-            return legend
+            def update_scene_and_legend(
+                graph, display_options, scene_additions, displayed_scene_options
+            ):
+                if not graph or not display_options:
+                    raise PreventUpdate
+                scene_options = {
+                    "display_options": display_options,
+                    "scene_additions": scene_additions,
+                }
+                scene, legend = get_scene_and_legend_json(
+                    graph, display_options, scene_additions
+                )
+
+                # a new graph always needs the full scene
+                if (
+                    callback_context.triggered_id == self.id("graph")
+                    or not displayed_scene_options
+                ):
+                    return scene, legend, scene_options
+                if displayed_scene_options == scene_options:
+                    raise PreventUpdate
+
+                displayed_scene, _ = get_scene_and_legend_json(
+                    graph,
+                    displayed_scene_options["display_options"],
+                    displayed_scene_options["scene_additions"],
+                )
+                patch = Scene.diff(displayed_scene, scene)
+                return self._scene_diff_to_patch(patch), legend, scene_options
+
+        else:
+
+            @app.callback(
+                scene_output,
+                Output(self.id("legend_data"), "data"),
+                Input(self.id("graph"), "data"),
+                Input(self.id("display_options"), "data"),
+                Input(self.id("scene_additions"), "data"),
+            )
+            def update_scene_and_legend(graph, display_options, scene_additions):
+                if not graph or not display_options:
+                    raise PreventUpdate
+                return get_scene_and_legend_json(
+                    graph, display_options, scene_additions
+                )
+
+        if SETTINGS.SCENE_LAZY_TOOLTIPS:
+
+            @app.callback(
+                Output(self.id("selected_sites"), "children"),
+                Input(self.id("scene"), "selectedObject"),
+                State(self.id("graph"), "data"),
+            )
+            def update_selected_sites(selected_objects, graph):
+                # scene primitives only carry the indices of their sites, so
+                # look up the details of the sites that were clicked
+                if not selected_objects or not graph:
+                    raise PreventUpdate
+
+                site_indices = {
+                    idx
+                    for obj in selected_objects
+                    for meta in obj.get("_meta") or []
+                    if isinstance(meta, dict)
+                    for idx in meta.get("atom_idx", [])
+                }
+                struct_or_mol = self._get_struct_or_mol(self.from_data(graph))
+                site_indices = sorted(
+                    idx for idx in site_indices if idx < len(struct_or_mol)
+                )
+                tooltips = get_site_tooltips(struct_or_mol, site_indices[:10])
+                if len(site_indices) > 10:
+                    tooltips.append(f"and {len(site_indices) - 10} more sites")
+
+                return html.Div(
+                    [html.Div(tooltip) for tooltip in tooltips],
+                    className="box",
+                    style={"position": "absolute", "bottom": "0", "left": "0"},
+                )
 
         @app.callback(
             Output(self.id("color-scheme"), "options"),
@@ -545,7 +1181,7 @@ class StructureMoleculeComponent(MPComponent):
             Output(self.id("title_container"), "children"),
             Input(self.id("legend_data"), "data"),
         )
-        @cache.memoize()
+        @memoize(cache)
         def update_title(legend):
             if not legend:
                 raise PreventUpdate
@@ -558,7 +1194,7 @@ class StructureMoleculeComponent(MPComponent):
             Output(self.id("legend_container"), "children"),
             Input(self.id("legend_data"), "data"),
         )
-        @cache.memoize()
+        @memoize(cache)
         def update_legend(legend):
             if not legend:
                 raise PreventUpdate
@@ -567,6 +1203,16 @@ class StructureMoleculeComponent(MPComponent):
 
             return self._make_legend(legend)
 
+        @app.callback(
+            Output(self.id("bonding_warning"), "children"),
+            Input(self.id("graph"), "data"),
+        )
+        def update_bonding_warning(graph):
+            if not graph:
+                raise PreventUpdate
+
+            return self._get_bonding_warning(self.from_data(graph))
+
         @app.callback(
             Output(self.id("bonding_algorithm_custom_cutoffs"), "data"),
             Output(self.id("bonding_algorithm_custom_cutoffs_container"), "style"),
@@ -574,7 +1220,7 @@ class StructureMoleculeComponent(MPComponent):
             State(self.id("graph"), "data"),
             State(self.id("bonding_algorithm_custom_cutoffs_container"), "style"),
         )
-        @cache.memoize()
+        @memoize(cache)
         def update_custom_bond_options(bonding_algorithm, graph, current_style):
             if not graph:
                 raise PreventUpdate
@@ -592,6 +1238,26 @@ class StructureMoleculeComponent(MPComponent):
 
             return rows, style
 
+    @staticmethod
+    def _scene_diff_to_patch(scene_diff: dict[str, dict[str, Any]]) -> Patch:
+        """Convert a patch from Scene.diff() into a dash Patch for the scene data."""
+        patch = Patch()
+        for path, changes in scene_diff.items():
+            node = patch
+            for idx in filter(None, path.split("/")):
+                node = node["contents"][int(idx)]
+            for key, val in changes.items():
+                if key == "_append":
+                    node["contents"].extend(val)
+                elif key == "_remove":
+                    for idx in reversed(val):
+                        del node["contents"][idx]
+                elif val is None:
+                    del node[key]
+                else:
+                    node[key] = val
+        return patch
+
     def _make_legend(self, legend):
         if not legend:
             return html.Div(id=self.id("legend"))
@@ -663,6 +1329,13 @@ class StructureMoleculeComponent(MPComponent):
             formula_components, id=self.id("title"), style={"display": "inline-block"}
         )
 
+    @staticmethod
+    def _get_bonding_warning(graph) -> str | None:
+        """Warning set on a graph if its bonds could not be computed as requested."""
+        if not isinstance(graph, (StructureGraph, MoleculeGraph)):
+            return None
+        return graph.graph.graph.get("warning")
+
     @staticmethod
     def _make_bonding_algorithm_custom_cutoff_data(graph) -> list[dict[str, Any]]:
         if not graph:
@@ -758,6 +1431,13 @@ class StructureMoleculeComponent(MPComponent):
                                 "Change bonding algorithm: ", className="mpc-label"
                             ),
                             bonding_algorithm,
+                            Help(
+                                self._get_bonding_warning(
+                                    self.initial_data.get("graph")
+                                ),
+                                id=self.id("bonding_warning"),
+                                className="is-warning",
+                            ),
                             bonding_algorithm_custom_cutoffs,
                         ]
                     ),
@@ -875,7 +1555,13 @@ class StructureMoleculeComponent(MPComponent):
         struct_layout = html.Div(
             [
                 CrystalToolkitScene(
-                    [options_layout, legend_layout],
+                    [
+                        options_layout,
+                        legend_layout,
+                        html.Div(id=self.id("selected_sites"))
+                        if SETTINGS.SCENE_LAZY_TOOLTIPS
+                        else None,
+                    ],
                     id=self.id("scene"),
                     className=self.className,
                     data=self.initial_data["scene"],
@@ -914,6 +1600,87 @@ class StructureMoleculeComponent(MPComponent):
             self._sub_layouts["struct"], style={"width": size, "height": size}
         )
 
+    @staticmethod
+    def warm_graph_cache(
+        structs_or_mols: Iterable[Structure | Molecule],
+        bonding_strategy: str = DEFAULTS["bonding_strategy"],
+        bonding_strategy_kwargs: dict | None = None,
+        unit_cell_choice: str = DEFAULTS["unit_cell_choice"],
+    ) -> int:
+        """Compute the bonding graphs of structures or molecules that are likely to be
+        viewed, e.g. the most popular materials of a website, ahead of time. With a
+        shared graph cache (see the GRAPH_CACHE setting), this can be run once when
+        deploying an app rather than in each worker.
+
+        Args:
+            structs_or_mols (Iterable[Structure | Molecule]): structures or molecules.
+            bonding_strategy (str, optional): bonding strategy from pymatgen
+                NearNeighbors class. Defaults to "CrystalNN".
+            bonding_strategy_kwargs (dict | None, optional): options for the bonding
+                strategy.
+            unit_cell_choice (str, optional): unit cell the structures will be viewed
+                in, as in StructureMoleculeComponent. Defaults to "input".
+
+        Returns:
+            int: number of graphs that were not cached yet.
+        """
+        graph_cache = get_graph_cache()
+        if graph_cache is None:
+            raise ValueError("Bonding graphs are not cached, GRAPH_CACHE_SIZE is 0.")
+        misses = graph_cache.cache_info()["misses"]
+        for struct_or_mol in structs_or_mols:
+            StructureMoleculeComponent._preprocess_input_to_graph(
+                StructureMoleculeComponent._preprocess_structure(
+                    struct_or_mol, unit_cell_choice
+                ),
+                bonding_strategy=bonding_strategy,
+                bonding_strategy_kwargs=bonding_strategy_kwargs,
+            )
+        return graph_cache.cache_info()["misses"] - misses
+
+    @staticmethod
+    def _precompute_unit_cells(
+        struct_or_mol: Structure | StructureGraph | Molecule | MoleculeGraph | dict,
+        graph_generation_options: dict[str, Any],
+    ) -> list[Future]:
+        """Compute the other unit cell choices of a structure, and their bonding graphs,
+        in the background, see UnitCellCache.precompute. If given the contents of a
+        dcc.Store, it is only decoded if the unit cells of the structure are neither
+        cached nor being computed already.
+        """
+        if not SETTINGS.UNIT_CELL_PRECOMPUTE:
+            return []
+        unit_cell_choices = [
+            choice
+            for choice in UNIT_CELL_CHOICES
+            if choice != graph_generation_options["unit_cell_choice"]
+        ]
+        if isinstance(struct_or_mol, dict) and not ObjectStore.is_handle(struct_or_mol):
+            structure_data = struct_or_mol.get("structure", struct_or_mol)
+            if "lattice" not in structure_data:
+                # a molecule
+                return []
+            if UNIT_CELL_CACHE.touch(
+                get_fingerprint(structure_data), unit_cell_choices
+            ):
+                return []
+        if isinstance(struct_or_mol, dict):
+            struct_or_mol = MPComponent.from_data(struct_or_mol)
+        if isinstance(struct_or_mol, StructureGraph):
+            struct_or_mol = struct_or_mol.structure
+        if not isinstance(struct_or_mol, Structure):
+            return []
+        return UNIT_CELL_CACHE.precompute(
+            struct_or_mol,
+            unit_cell_choices,
+            graph_options={
+                "bonding_strategy": graph_generation_options["bonding_strategy"],
+                "bonding_strategy_kwargs": graph_generation_options[
+                    "bonding_strategy_kwargs"
+                ],
+            },
+        )
+
     @staticmethod
     def _preprocess_structure(
         struct_or_mol: Structure | StructureGraph | Molecule | MoleculeGraph,
@@ -928,19 +1695,7 @@ class StructureMoleculeComponent(MPComponent):
             # will also have to be re-calculated
             struct_or_mol = struct_or_mol.structure
         if isinstance(struct_or_mol, Structure) and unit_cell_choice != "input":
-            if unit_cell_choice == "primitive":
-                struct_or_mol = struct_or_mol.get_primitive_structure()
-            elif unit_cell_choice == "conventional":
-                sga = SpacegroupAnalyzer(struct_or_mol)
-                struct_or_mol = sga.get_conventional_standard_structure()
-            elif unit_cell_choice == "reduced_niggli":
-                struct_or_mol = struct_or_mol.get_reduced_structure(
-                    reduction_algo="niggli"
-                )
-            elif unit_cell_choice == "reduced_lll":
-                struct_or_mol = struct_or_mol.get_reduced_structure(
-                    reduction_algo="LLL"
-                )
+            struct_or_mol = UNIT_CELL_CACHE.get(struct_or_mol, unit_cell_choice)
         return struct_or_mol
 
     @staticmethod
@@ -950,16 +1705,7 @@ class StructureMoleculeComponent(MPComponent):
         bonding_strategy_kwargs: dict | None = None,
     ) -> StructureGraph | MoleculeGraph:
         if isinstance(input, Structure):
-            # ensure fractional coordinates are normalized to be in [0,1)
-            # (this is actually not guaranteed by Structure)
-            try:
-                input = input.as_dict(verbosity=0)
-            except TypeError:
-                # TODO: remove this, necessary for Slab(?), some structure subclasses don't have verbosity
-                input = input.as_dict()
-            for site in input["sites"]:
-                site["abc"] = np.mod(site["abc"], 1)
-            input = Structure.from_dict(input)
+            input = _wrap_frac_coords(input)
 
             if not input.is_ordered:
                 # calculating bonds in disordered structures is currently very flaky
@@ -981,34 +1727,45 @@ class StructureMoleculeComponent(MPComponent):
                     f"subclass, choose from: {', '.join(valid_bond_strategies)}"
                 )
             bonding_strategy_kwargs = bonding_strategy_kwargs or {}
-            if (
-                bonding_strategy == "CutOffDictNN"
-                and "cut_off_dict" in bonding_strategy_kwargs
-            ):
+
+            graph_cache = get_graph_cache()
+            if graph_cache:
+                graph = graph_cache.get(
+                    input, bonding_strategy, bonding_strategy_kwargs
+                )
+                if graph is not None:
+                    return graph
+
+            strategy_kwargs = dict(bonding_strategy_kwargs)
+            if bonding_strategy == "CutOffDictNN" and "cut_off_dict" in strategy_kwargs:
                 # TODO: remove this hack by making args properly JSON serializable
-                bonding_strategy_kwargs["cut_off_dict"] = {
-                    (x[0], x[1]): x[2] for x in bonding_strategy_kwargs["cut_off_dict"]
+                strategy_kwargs["cut_off_dict"] = {
+                    (x[0], x[1]): x[2] for x in strategy_kwargs["cut_off_dict"]
                 }
-            bonding_strategy = valid_bond_strategies[bonding_strategy](
-                **bonding_strategy_kwargs
-            )
+            strategy = valid_bond_strategies[bonding_strategy](**strategy_kwargs)
             try:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    if isinstance(input, Structure):
-                        graph = StructureGraph.with_local_env_strategy(
-                            input, bonding_strategy
-                        )
-                    else:
-                        graph = MoleculeGraph.with_local_env_strategy(
-                            input, bonding_strategy, reorder=False
-                        )
+                graph = _get_graph_in_process(input, strategy)
+            except FuturesTimeoutError:
+                # a cheap strategy, so that the structure can still be viewed with bonds
+                warning = (
+                    f"Bonds could not be found with {bonding_strategy} in "
+                    f"{SETTINGS.BONDING_TIMEOUT:g} s, showing bonds shorter than "
+                    "typical bond lengths instead."
+                )
+                try:
+                    graph = _get_graph(input, CutOffDictNN.from_preset("vesta_2019"))
+                except Exception:
+                    graph = _get_empty_graph(input)
+                graph.graph.graph["warning"] = warning
             except Exception:
                 # for some reason computing bonds failed, so let's not have any bonds(!)
-                if isinstance(input, Structure):
-                    graph = StructureGraph.with_empty_graph(input)
-                else:
-                    graph = MoleculeGraph.with_empty_graph(input)
+                graph = _get_empty_graph(input)
+                graph.graph.graph["warning"] = (
+                    f"Bonds could not be found with {bonding_strategy}."
+                )
+            else:
+                if graph_cache:
+                    graph_cache.set(graph, bonding_strategy, bonding_strategy_kwargs)
 
         return graph
 
@@ -1086,10 +1843,16 @@ class StructureMoleculeComponent(MPComponent):
                 explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
                 group_by_site_property=group_by_site_property,
                 legend=legend,
+                indexed_bonds=SETTINGS.SCENE_INDEXED_BONDS,
+                lazy_tooltips=SETTINGS.SCENE_LAZY_TOOLTIPS,
                 **(site_get_scene_kwargs or {}),
             )
         elif isinstance(graph, MoleculeGraph):
-            scene = graph.get_scene(legend=legend, **(site_get_scene_kwargs or {}))
+            scene = graph.get_scene(
+                legend=legend,
+                lazy_tooltips=SETTINGS.SCENE_LAZY_TOOLTIPS,
+                **(site_get_scene_kwargs or {}),
+            )
 
         scene.name = "StructureMoleculeComponentScene"
 
@@ -1098,7 +1861,10 @@ class StructureMoleculeComponent(MPComponent):
             axes.visible = show_compass
             scene.contents.append(axes)
 
-        scene_json = scene.to_json()
+        scene_json = scene.to_json(
+            typed_arrays=SETTINGS.SCENE_TYPED_ARRAYS,
+            indexed_surfaces=SETTINGS.SCENE_INDEXED_SURFACES,
+        )
 
         if scene_additions:
             # TODO: this might be cleaner if we had a Scene.from_json() method
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from dash.dependencies import Component, Input, Output
+from dash.exceptions import PreventUpdate
+from dash_mp_components import CrystalToolkitScene
+
+from crystal_toolkit.components.structure import (
+    _DECODE_SCENE_JS,
+    StructureMoleculeComponent,
+)
+from crystal_toolkit.core.mpcomponent import MPComponent
+from crystal_toolkit.helpers.layouts import dcc, html
+from crystal_toolkit.renderables.trajectory import TrajectorySource
+from crystal_toolkit.settings import SETTINGS
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class TrajectoryComponent(MPComponent):
+    """A component to view long trajectories, e.g. from molecular dynamics, which are kept
+    on the server as a TrajectorySource. Only the window of frames selected with the
+    slider is sent to the browser, as an animated scene whose frames can be scrubbed
+    through without a callback.
+    """
+
+    def __init__(
+        self,
+        source: TrajectorySource | str | Path,
+        id: str | None = None,
+        bonding_strategy: str = "CrystalNN",
+        bonding_strategy_kwargs: dict | None = None,
+        scene_kwargs: dict | None = None,
+        **kwargs,
+    ) -> None:
+        """Create a TrajectoryComponent.
+
+        Args:
+            source (TrajectorySource | str | Path): the trajectory, or the directory it
+                was written to.
+            id (str, optional): canonical id. Defaults to None.
+            bonding_strategy (str, optional): bonding strategy from pymatgen
+                NearNeighbors class, bonds are found once in the first frame.
+                Defaults to "CrystalNN".
+            bonding_strategy_kwargs (dict | None, optional): options for the bonding
+                strategy.
+            scene_kwargs (dict, optional): extra keyword arguments to pass to
+                CrystalToolkitScene.
+            **kwargs: extra keyword arguments to pass to MPComponent.
+        """
+        super().__init__(id=id, **kwargs)
+        if not isinstance(source, TrajectorySource):
+            source = TrajectorySource(source)
+        self.source = source
+        self.bonding_strategy = StructureMoleculeComponent.available_bonding_strategies[
+            bonding_strategy
+        ](**(bonding_strategy_kwargs or {}))
+        self.scene_kwargs = scene_kwargs or {}
+
+        self.create_store("encoded_scene", initial_data=self._get_scene_json(0))
+
+    def _get_scene_json(self, index: int) -> dict:
+        scene = self.source.get_scene(index, bonding_strategy=self.bonding_strategy)
+        return scene.to_json(typed_arrays=SETTINGS.SCENE_TYPED_ARRAYS)
+
+    @property
+    def _sub_layouts(self) -> dict[str, Component]:
+        marks = {
+            index: str(self.source.get_frames(index)[0])
+            for index in range(
+                0, self.source.n_windows, max(1, self.source.n_windows // 10)
+            )
+        }
+        window = dcc.Slider(
+            id=self.id("window"),
+            min=0,
+            max=self.source.n_windows - 1,
+            step=1,
+            value=0,
+            marks=marks,
+        )
+        scene = CrystalToolkitScene(
+            id=self.id("scene"),
+            sceneSize="100%",
+            animation="slider",
+            **self.scene_kwargs,
+        )
+        return {"window": window, "scene": scene}
+
+    def layout(self, size: str = "500px") -> html.Div:
+        """Get the layout for this component.
+
+        Args:
+            size (str, optional): a CSS dimension specifying width/height of the scene.
+                Defaults to "500px".
+
+        Returns:
+            html.Div: A html.Div containing the scene and the window slider
+        """
+        return html.Div(
+            [
+                html.Div(
+                    self._sub_layouts["scene"], style={"width": size, "height": size}
+                ),
+                self._sub_layouts["window"],
+            ]
+        )
+
+    def generate_callbacks(self, app, cache) -> None:
+        app.clientside_callback(
+            _DECODE_SCENE_JS,
+            Output(self.id("scene"), "data"),
+            Input(self.id("encoded_scene"), "data"),
+        )
+
+        @app.callback(
+            Output(self.id("encoded_scene"), "data"),
+            Input(self.id("window"), "value"),
+            prevent_initial_call=True,
+        )
+        def update_window(index):
+            if index is None:
+                raise PreventUpdate
+            return self._get_scene_json(index)
@@ -10,6 +10,7 @@ from dash.dependencies import Component, Input, Output, State
 from dash.exceptions import PreventUpdate
 from pymatgen.transformations.transformation_abc import AbstractTransformation
 
+from crystal_toolkit.core.fingerprint import memoize
 from crystal_toolkit.core.mpcomponent import MPComponent
 from crystal_toolkit.helpers.layouts import (
     Column,
@@ -163,7 +164,7 @@ class TransformationComponent(MPComponent):
         return html.Div()
 
     def generate_callbacks(self, app, cache) -> None:
-        @cache.memoize()
+        @memoize(cache)
         def apply_transformation(transformation_data, struct):
             transformation = self.from_data(transformation_data)
             error = None
@@ -337,7 +338,7 @@ class AllTransformationsComponent(MPComponent):
         )
 
     def generate_callbacks(self, app, cache) -> None:
-        @cache.memoize()
+        @memoize(cache)
         def apply_transformation(transformation_data, struct):
             transformation = self.from_data(transformation_data)
             error = None
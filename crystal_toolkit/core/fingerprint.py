@@ -0,0 +1,272 @@
+"""Fast fingerprints of structures and molecules, used as cache keys."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from functools import wraps
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from monty.json import MSONable, jsanitize
+from pymatgen.analysis.graphs import MoleculeGraph, StructureGraph
+from pymatgen.core import Molecule, Structure
+
+from crystal_toolkit.core.object_store import ObjectStore
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from flask_caching import Cache
+
+logger = logging.getLogger(__name__)
+
+_FINGERPRINT_CLASSES = ("Structure", "Molecule", "StructureGraph", "MoleculeGraph")
+# keys of the adjacency of a graph in its MSON dict which are not edge properties
+_EDGE_KEYS = ("id", "key", "to_jimage")
+
+
+def get_fingerprint(
+    obj: Structure | Molecule | StructureGraph | MoleculeGraph | dict,
+    tol: float = 1e-4,
+    order_invariant: bool = False,
+) -> str:
+    """Hash of a structure or molecule that is the same for objects that only differ by
+    floating point noise, and optionally by the order of their sites.
+
+    The hash covers the lattice, the species and oxidation states, the coordinates
+    rounded to tol (fractional for structures, Cartesian for molecules), the site
+    properties, the charge and, for graphs, the bonds with their weights and other
+    properties, and the name and units of the weights. It is much faster than hashing
+    the JSON of the object.
+
+    Args:
+        obj (Structure | Molecule | StructureGraph | MoleculeGraph | dict): The object,
+            or its MSON dict, e.g. the contents of a dcc.Store. Both give the same
+            fingerprint.
+        tol (float, optional): Coordinates and lattice parameters closer than this are
+            considered equal. Defaults to 1e-4.
+        order_invariant (bool, optional): If True, sites are sorted by species and
+            coordinates before hashing, so that the same structure with its sites in
+            a different order has the same fingerprint. Defaults to False.
+
+    Returns:
+        str: The fingerprint, as a hex string.
+    """
+    name, lattice, species, coords, site_properties, properties, edges, edge_data = (
+        _get_arrays_from_dict(obj) if isinstance(obj, dict) else _get_arrays(obj)
+    )
+
+    coords = np.round(np.asarray(coords, dtype=float).reshape(-1, 3) / tol)
+    # avoid different hashes for 0.0 and -0.0
+    coords = (coords + 0.0).astype(np.int64)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 5)
+
+    if order_invariant and len(species):
+        _, species_codes = np.unique(species, return_inverse=True)
+        order = np.lexsort((*coords.T[::-1], species_codes))
+        coords = coords[order]
+        species = [species[idx] for idx in order]
+        site_properties = {
+            key: [values[idx] for idx in order]
+            for key, values in site_properties.items()
+        }
+        new_indices = np.empty_like(order)
+        new_indices[order] = np.arange(len(order))
+        edges[:, :2] = new_indices[edges[:, :2]]
+
+    # the same bond can be stored in either direction
+    reverse = edges[:, 0] > edges[:, 1]
+    edges[reverse] = edges[reverse][:, [1, 0, 2, 3, 4]] * [1, 1, -1, -1, -1]
+    if len(edges):
+        order = np.lexsort(edges.T[::-1])
+        edges = edges[order]
+        edge_data = [edge_data[idx] for idx in order]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(name.encode())
+    if lattice is not None:
+        lattice = np.round(np.asarray(lattice, dtype=float) / tol) + 0.0
+        digest.update(lattice.astype(np.int64).tobytes())
+    digest.update("\n".join(species).encode())
+    digest.update(coords.tobytes())
+    digest.update(edges.tobytes())
+    if site_properties or any(properties) or any(edge_data):
+        digest.update(
+            json.dumps(
+                jsanitize([site_properties, properties, edge_data]),
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+    return digest.hexdigest()
+
+
+def get_cache_key(*args, **kwargs) -> str:
+    """Key identifying the arguments of a function in a cache.
+
+    Structures, molecules and their graphs, as objects or MSON dicts, are keyed by
+    their fingerprint, handles to objects in the ObjectStore by the hash they contain,
+    and other MSONable objects and JSON data by a hash of their JSON.
+
+    Returns:
+        str: The key, as a hex string.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for arg in (*args, *sorted(kwargs.items())):
+        digest.update(_get_arg_key(arg).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def memoize(cache: Cache, timeout: int | None = None) -> Callable[[Callable], Callable]:
+    """Decorator to cache the results of a function, as Cache.memoize from
+    flask_caching, but keyed by get_cache_key, so that large structures are not
+    serialized to build the key and equivalent structures share a cache entry.
+
+    Args:
+        cache (Cache): The flask_caching cache of the app.
+        timeout (int, optional): Timeout of the cached results in seconds. Defaults
+            to the default timeout of the cache.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def memoized(*args, **kwargs):
+            key = f"{prefix}:{get_cache_key(*args, **kwargs)}"
+            try:
+                result = cache.get(key)
+            except Exception:
+                logger.exception("Exception possibly due to cache backend.")
+                return func(*args, **kwargs)
+            if result is None:
+                result = func(*args, **kwargs)
+                try:
+                    cache.set(key, result, timeout=timeout)
+                except Exception:
+                    logger.exception("Exception possibly due to cache backend.")
+            return result
+
+        return memoized
+
+    return decorator
+
+
+def _get_arg_key(arg: Any) -> str:
+    if isinstance(arg, (Structure, Molecule, StructureGraph, MoleculeGraph)):
+        return get_fingerprint(arg)
+    if ObjectStore.is_handle(arg):
+        return json.dumps(arg, sort_keys=True)
+    if isinstance(arg, dict) and arg.get("@class") in _FINGERPRINT_CLASSES:
+        return get_fingerprint(arg)
+    if isinstance(arg, (list, tuple)):
+        return f"[{','.join(_get_arg_key(item) for item in arg)}]"
+    if isinstance(arg, MSONable):
+        json_str = arg.to_json()
+    else:
+        json_str = json.dumps(arg, sort_keys=True, default=repr)
+    return hashlib.blake2b(json_str.encode(), digest_size=16).hexdigest()
+
+
+def _get_species(symbol: str, oxi_state: float | None, occu: float) -> str:
+    return f"{symbol}{'' if oxi_state is None else f'{oxi_state:g}'}:{occu:g}"
+
+
+def _get_graph_properties(graph_attrs: dict) -> dict:
+    return {
+        key: graph_attrs[key]
+        for key in ("edge_weight_name", "edge_weight_units")
+        if graph_attrs.get(key) is not None
+    }
+
+
+def _get_arrays(
+    obj: Structure | Molecule | StructureGraph | MoleculeGraph,
+) -> tuple:
+    if isinstance(obj, (StructureGraph, MoleculeGraph)):
+        graph = obj
+        obj = obj.structure if isinstance(graph, StructureGraph) else graph.molecule
+        edges, edge_data = [], []
+        for u, v, data in graph.graph.edges(data=True):
+            edges.append((u, v, *(data.get("to_jimage") or (0, 0, 0))))
+            edge_data.append(
+                {key: val for key, val in data.items() if key not in _EDGE_KEYS}
+            )
+        graph_properties = _get_graph_properties(graph.graph.graph)
+    else:
+        graph = None
+        edges, edge_data, graph_properties = [], [], {}
+
+    species = [
+        ",".join(
+            _get_species(sp.symbol, getattr(sp, "oxi_state", None), occu)
+            for sp, occu in site.species.items()
+        )
+        for site in obj
+    ]
+    site_properties = {key: list(values) for key, values in obj.site_properties.items()}
+    if isinstance(obj, Structure):
+        lattice, coords = obj.lattice.matrix, obj.frac_coords
+        # the charge of a structure is given by the oxidation states
+        properties = [obj.properties, graph_properties]
+    else:
+        lattice, coords = None, obj.cart_coords
+        properties = [
+            float(obj.charge),
+            obj.spin_multiplicity,
+            obj.properties,
+            graph_properties,
+        ]
+    name = type(graph).__name__ if graph is not None else type(obj).__name__
+    return name, lattice, species, coords, site_properties, properties, edges, edge_data
+
+
+def _get_arrays_from_dict(dct: dict) -> tuple:
+    name = dct["@class"]
+    if name in ("StructureGraph", "MoleculeGraph"):
+        edges, edge_data = [], []
+        for u, neighbors in enumerate(dct["graphs"]["adjacency"]):
+            for neighbor in neighbors:
+                edges.append(
+                    (u, neighbor["id"], *(neighbor.get("to_jimage") or (0, 0, 0)))
+                )
+                edge_data.append(
+                    {key: val for key, val in neighbor.items() if key not in _EDGE_KEYS}
+                )
+        # a list of pairs, as serialized by networkx
+        graph_properties = _get_graph_properties(dict(dct["graphs"].get("graph", {})))
+        dct = dct["structure" if name == "StructureGraph" else "molecule"]
+    else:
+        edges, edge_data, graph_properties = [], [], {}
+
+    species = [
+        ",".join(
+            _get_species(sp["element"], sp.get("oxidation_state"), sp["occu"])
+            for sp in site["species"]
+        )
+        for site in dct["sites"]
+    ]
+    site_properties: dict[str, list] = {}
+    for idx, site in enumerate(dct["sites"]):
+        for key, value in site.get("properties", {}).items():
+            site_properties.setdefault(key, [None] * len(dct["sites"]))[idx] = value
+    if "lattice" in dct:
+        lattice = dct["lattice"]["matrix"]
+        coords = [site["abc"] for site in dct["sites"]]
+        properties = [dct.get("properties") or {}, graph_properties]
+    else:
+        lattice = None
+        coords = [site["xyz"] for site in dct["sites"]]
+        properties = [
+            float(dct.get("charge") or 0),
+            dct.get("spin_multiplicity"),
+            dct.get("properties") or {},
+            graph_properties,
+        ]
+    return name, lattice, species, coords, site_properties, properties, edges, edge_data
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import threading
+from typing import TYPE_CHECKING
+
+from monty.json import MontyEncoder
+from networkx.readwrite import json_graph
+from pymatgen.analysis.graphs import MoleculeGraph, StructureGraph
+from pymatgen.core import Structure
+
+from crystal_toolkit.core.fingerprint import get_fingerprint
+from crystal_toolkit.core.object_store import make_cache_backend
+from crystal_toolkit.settings import SETTINGS
+
+if TYPE_CHECKING:
+    from cachelib import BaseCache
+    from pymatgen.core import Molecule
+
+
+class GraphCache:
+    """Cache of bonding graphs, keyed by the fingerprint of the structure or molecule,
+    the name of the bonding strategy and its keyword arguments.
+
+    Only the edges of a graph are kept, so that the graph can be re-created for the
+    structure or molecule it is requested for, and the backend can be shared between
+    the workers of an app (see make_cache_backend), so that the graph of a structure
+    is computed once rather than once per worker. The cache can be warm-loaded with
+    the graphs of structures that are likely to be viewed, e.g. with
+    StructureMoleculeComponent.warm_graph_cache.
+    """
+
+    def __init__(self, backend: BaseCache) -> None:
+        """
+        Args:
+            backend (BaseCache): Cache holding the edges of the graphs as JSON.
+        """
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(
+        struct_or_mol: Structure | Molecule,
+        bonding_strategy: str,
+        bonding_strategy_kwargs: dict | None = None,
+    ) -> str:
+        """Key of the graph of a structure or molecule in the cache.
+
+        Args:
+            struct_or_mol (Structure | Molecule): The structure or molecule.
+            bonding_strategy (str): Name of the NearNeighbors class.
+            bonding_strategy_kwargs (dict, optional): Its keyword arguments.
+
+        Returns:
+            str: The key.
+        """
+        # not order invariant, since the graph refers to sites by index
+        fingerprint = get_fingerprint(struct_or_mol)
+        kwargs = json.dumps(bonding_strategy_kwargs or {}, sort_keys=True, default=str)
+        return f"{fingerprint}:{bonding_strategy}:{kwargs}"
+
+    def get(
+        self,
+        struct_or_mol: Structure | Molecule,
+        bonding_strategy: str,
+        bonding_strategy_kwargs: dict | None = None,
+    ) -> StructureGraph | MoleculeGraph | None:
+        """Get the graph of a structure or molecule.
+
+        Args:
+            struct_or_mol (Structure | Molecule): The structure or molecule.
+            bonding_strategy (str): Name of the NearNeighbors class.
+            bonding_strategy_kwargs (dict, optional): Its keyword arguments.
+
+        Returns:
+            StructureGraph | MoleculeGraph | None: The graph, or None if it is not in
+                the cache.
+        """
+        key = self.get_key(struct_or_mol, bonding_strategy, bonding_strategy_kwargs)
+        graph_json = self.backend.get(key)
+        with self._lock:
+            if graph_json is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        graph_data = json.loads(graph_json)
+        if isinstance(struct_or_mol, Structure):
+            return StructureGraph(struct_or_mol, graph_data)
+        return MoleculeGraph(struct_or_mol, graph_data)
+
+    def set(
+        self,
+        graph: StructureGraph | MoleculeGraph,
+        bonding_strategy: str,
+        bonding_strategy_kwargs: dict | None = None,
+    ) -> None:
+        """Add the graph of a structure or molecule to the cache.
+
+        Args:
+            graph (StructureGraph | MoleculeGraph): The graph.
+            bonding_strategy (str): Name of the NearNeighbors class it was computed
+                with.
+            bonding_strategy_kwargs (dict, optional): Its keyword arguments.
+        """
+        struct_or_mol = (
+            graph.structure if isinstance(graph, StructureGraph) else graph.molecule
+        )
+        key = self.get_key(struct_or_mol, bonding_strategy, bonding_strategy_kwargs)
+        graph_data = json_graph.adjacency_data(graph.graph)
+        self.backend.set(key, json.dumps(graph_data, cls=MontyEncoder))
+
+    def cache_info(self) -> dict[str, int]:
+        """Hits and misses of the cache in this process."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_GRAPH_CACHE: GraphCache | None = None
+_GRAPH_CACHE_LOCK = threading.Lock()
+
+
+def get_graph_cache() -> GraphCache | None:
+    """Get the GraphCache configured by the GRAPH_CACHE settings.
+
+    Returns:
+        GraphCache | None: The cache shared by all components, or None if
+            GRAPH_CACHE_SIZE is 0 and graphs are not cached.
+    """
+    global _GRAPH_CACHE  # noqa: PLW0603
+    if SETTINGS.GRAPH_CACHE_SIZE <= 0:
+        return None
+    with _GRAPH_CACHE_LOCK:
+        if _GRAPH_CACHE is None:
+            _GRAPH_CACHE = GraphCache(
+                make_cache_backend(
+                    SETTINGS.GRAPH_CACHE,
+                    path=SETTINGS.GRAPH_CACHE_PATH,
+                    size=SETTINGS.GRAPH_CACHE_SIZE,
+                    ttl=SETTINGS.GRAPH_CACHE_TTL,
+                    name="graphs",
+                )
+            )
+    return _GRAPH_CACHE
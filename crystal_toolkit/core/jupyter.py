@@ -14,6 +14,7 @@ from pymatgen.core.structure import SiteCollection
 
 import crystal_toolkit.helpers.layouts as ctl
 from crystal_toolkit.components.structure import StructureMoleculeComponent
+from crystal_toolkit.core.object_store import get_object_store
 from crystal_toolkit.core.plugin import CrystalToolkitPlugin
 from crystal_toolkit.settings import SETTINGS
 
@@ -69,7 +70,13 @@ class _JupyterRenderer:
 
 
 def _to_plotly_json(self):
-    """Patch to ensure MSONable objects can be serialized into JSON by plotly tools."""
+    """Patch to ensure MSONable objects can be serialized into JSON by plotly tools.
+
+    If an object store is configured, the object is kept on the server and only its
+    handle is serialized.
+    """
+    if object_store := get_object_store():
+        return object_store.put(self)
     return self.as_dict()
 
 
@@ -98,7 +105,9 @@ def _ipython_display_(self):
     # TODO: This can be removed once a central registry of renderable objects is implemented.
     if hasattr(self, "get_scene"):
         display_data = {
-            "application/vnd.mp.ctk+json": self.get_scene().to_json(),
+            "application/vnd.mp.ctk+json": self.get_scene().to_json(
+                typed_arrays=SETTINGS.SCENE_TYPED_ARRAYS
+            ),
             "text/plain": repr(self),
         }
     elif hasattr(self, "get_plot"):
@@ -3,9 +3,11 @@ from __future__ import annotations
 import os
 import warnings
 from collections import defaultdict
+from functools import lru_cache
 from itertools import chain
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
 from matplotlib.pyplot import get_cmap
 from monty.json import MSONable
 from monty.serialization import loadfn
@@ -19,6 +21,7 @@ from webcolors import html5_parse_legacy_color, html5_serialize_simple_color
 from crystal_toolkit.settings import SETTINGS
 
 if TYPE_CHECKING:
+    from matplotlib.colors import Colormap
     from pymatgen.core.structure import SiteCollection
 
 # element colors forked from pymatgen
@@ -26,6 +29,14 @@ module_dir = os.path.dirname(os.path.abspath(__file__))
 EL_COLORS = loadfn(os.path.join(module_dir, "ElementColorSchemes.yaml"))
 
 
+@lru_cache
+def _get_cmap(name: str) -> Colormap:
+    """Look up a matplotlib color map by name. matplotlib returns a new copy of the color
+    map on every lookup, which has to build its lookup table again, so these are cached.
+    """
+    return get_cmap(name)
+
+
 class Legend(MSONable):
     """Help generate a legend (colors and radii) for a Structure or Molecule such that colors and
     radii can be displayed for the appropriate species.
@@ -133,6 +144,21 @@ class Legend(MSONable):
         self.cmap = cmap
         self.cmap_range = cmap_range
 
+        # lookup tables so that the per-site get_color and get_radius calls
+        # reduce to dictionary lookups, radii are only looked up when first
+        # needed since not every species has a radius for every scheme
+        self._species_colors: dict[Species | Element, str] = {}
+        self._species_radii: dict[Species | Element, float] = {}
+        self._scalar_colors: dict[float, str] = {}
+
+        if color_scheme in ("VESTA", "Jmol", "accessible"):
+            for sp in set(chain.from_iterable(site_collection.species_and_occu)):
+                self._get_species_color(sp)
+        elif color_scheme in site_prop_types.get("scalar", []):
+            self._scalar_colors = self._get_scalar_colors(
+                site_collection.site_properties[color_scheme]
+            )
+
     @staticmethod
     def generate_accessible_color_scheme_on_the_fly(
         site_collection: SiteCollection,
@@ -246,6 +272,41 @@ class Legend(MSONable):
 
         return color_scheme
 
+    def _get_species_color(self, sp: Species | Element) -> str:
+        """Get the color of a species for an element-based color scheme."""
+        if sp not in self._species_colors:
+            el = sp.as_dict()["element"]
+            color = self.el_colors[self.color_scheme].get(
+                el, self.el_colors["Extras"].get(el, self.default_color)
+            )
+            self._species_colors[sp] = html5_serialize_simple_color(color)
+        return self._species_colors[sp]
+
+    def _get_scalar_colors(self, props: list[float | None]) -> dict[float, str]:
+        """Get the colors for values of a scalar site property in a single call to the
+        color map.
+
+        Args:
+            props: values of the site property, None (or zero) values are skipped since
+                these are given the default color.
+
+        Returns: A dictionary of property value to color
+        """
+        values = np.unique([prop for prop in props if prop])
+        if not len(values):
+            return {}
+
+        cmap = _get_cmap(self.cmap) if isinstance(self.cmap, str) else self.cmap
+
+        # normalize in [0, 1] range, as expected by cmap
+        prop_min, prop_max = self.cmap_range
+        rgb = cmap((values - prop_min) / (prop_max - prop_min))[:, :3]
+
+        return {
+            value: html5_serialize_simple_color(color)
+            for value, color in zip(values.tolist(), (rgb * 255).astype(int).tolist())
+        }
+
     def get_color(self, sp: Species | Element, site: Site | None = None) -> str:
         """Get a color to render a specific species. Optionally, you can provide a site for context,
         since ...
@@ -271,12 +332,9 @@ class Legend(MSONable):
             return html5_serialize_simple_color(html5_parse_legacy_color(color))
 
         if self.color_scheme in ("VESTA", "Jmol", "accessible"):
-            el = sp.as_dict()["element"]
-            color = self.el_colors[self.color_scheme].get(
-                el, self.el_colors["Extras"].get(el, self.default_color)
-            )
+            return self._get_species_color(sp)
 
-        elif self.color_scheme in self.site_prop_types.get("scalar", []):
+        if self.color_scheme in self.site_prop_types.get("scalar", []):
             if not site:
                 raise ValueError(
                     "Requires a site for context to get the appropriate site property."
@@ -284,20 +342,18 @@ class Legend(MSONable):
 
             prop = site.properties[self.color_scheme]
 
-            if prop:
-                cmap = get_cmap(self.cmap)
-
-                # normalize in [0, 1] range, as expected by cmap
-                prop_min, prop_max = self.cmap_range
-                prop_normed = (prop - prop_min) / (prop_max - prop_min)
-
-                color = [int(c * 255) for c in cmap(prop_normed)[0:3]]
-
-            else:
+            if not prop:
                 # fallback if site prop is None
-                color = self.default_color
+                return html5_serialize_simple_color(self.default_color)
 
-        elif self.color_scheme in self.site_prop_types.get("categorical", []):
+            if prop not in self._scalar_colors:
+                # e.g. for a site that is not part of the site collection
+                colors = self._get_scalar_colors([prop])
+                self._scalar_colors.update(colors)
+                return next(iter(colors.values()))
+            return self._scalar_colors[prop]
+
+        if self.color_scheme in self.site_prop_types.get("categorical", []):
             if not site:
                 raise ValueError(
                     "Requires a site for context to get the appropriate site property."
@@ -321,6 +377,12 @@ class Legend(MSONable):
         if site and "display_radius" in site.properties:
             return site.properties["display_radius"]
 
+        if sp not in self._species_radii:
+            self._species_radii[sp] = self._get_species_radius(sp)
+        return self._species_radii[sp]
+
+    def _get_species_radius(self, sp: Species | Element) -> float:
+        """Get the radius of a species for the radius scheme of this legend."""
         if self.radius_scheme not in self.allowed_radius_schemes:
             raise ValueError(
                 f"Unknown radius scheme {self.radius_scheme}, "
@@ -398,12 +460,23 @@ class Legend(MSONable):
         else:
             raise ValueError(f"Color scheme {self.color_scheme} not known.")
 
+        # colors and labels only depend on the species, the color scheme site
+        # property and any manual color override, so only look these up once
+        # for each unique combination
+        unique_sites = {}
+        for site in self.site_collection:
+            context = (
+                site.properties.get(self.color_scheme),
+                str(site.properties.get("display_color")),
+            )
+            for sp in site.species:
+                unique_sites.setdefault((sp, *context), site)
+
         legend = defaultdict(list)
 
         # first get all our colors for different species
-        for site in self.site_collection:
-            for sp in site.species:
-                legend[self.get_color(sp, site)].append(label(site, sp))
+        for (sp, *_), site in unique_sites.items():
+            legend[self.get_color(sp, site)].append(label(site, sp))
 
         legend = {key: ", ".join(sorted(set(val))) for key, val in legend.items()}
 
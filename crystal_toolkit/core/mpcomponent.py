@@ -19,6 +19,7 @@ from dash import dcc, html
 from dash.dependencies import ALL
 from monty.json import MontyDecoder, MSONable
 
+from crystal_toolkit.core.object_store import ObjectStore, get_object_store
 from crystal_toolkit.core.plugin import CrystalToolkitPlugin
 from crystal_toolkit.helpers.layouts import H6, Button, Icon, Loading, add_label_help
 from crystal_toolkit.settings import SETTINGS
@@ -268,9 +269,13 @@ class MPComponent(ABC):  # noqa: B024
         if name in self.links:
             return
 
+        store_data = initial_data
+        if isinstance(initial_data, MSONable) and (object_store := get_object_store()):
+            store_data = object_store.put(initial_data)
+
         store = dcc.Store(
             id=self.id(name),
-            data=initial_data,
+            data=store_data,
             storage_type=storage_type,
             clear_data=debug_clear,
         )
@@ -287,9 +292,17 @@ class MPComponent(ABC):  # noqa: B024
     def from_data(data: dict[str, Any]) -> MPComponent:
         """Converts the contents of a dcc.Store back into a Python object.
 
-        :param data: contents of a dcc.Store created by to_data
+        :param data: contents of a dcc.Store created by to_data, or a handle to an
+            object in the object store
         :return: a Python object
         """
+        if ObjectStore.is_handle(data):
+            object_store = get_object_store()
+            if object_store is None:
+                raise ValueError(
+                    "Received a handle to an object store, but OBJECT_STORE is not set."
+                )
+            return object_store.get(data)
         return loads(dumps(data), cls=MontyDecoder)
 
     @property
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from json import loads
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+from cachelib import FileSystemCache, RedisCache, SimpleCache
+from monty.json import MontyDecoder
+
+from crystal_toolkit.settings import SETTINGS
+
+try:
+    from redis import from_url as redis_from_url
+except ImportError:
+    redis_from_url = None
+
+if TYPE_CHECKING:
+    from cachelib import BaseCache
+    from monty.json import MSONable
+
+# key of the dict sent to the browser in place of an object
+HANDLE_KEY = "@object_store"
+
+
+class ObjectStore:
+    """Server-side store for the MSONable objects held by MPComponent dcc.Stores.
+
+    Instead of the full JSON of an object, the browser holds a handle, a small dict
+    containing a hash of that JSON, and only this handle is uploaded again when the
+    store is the input or state of a callback. The JSON is kept in a shared backend
+    (e.g. on disk or in Redis, so that it is available to every worker of the app),
+    and the decoded objects in a least recently used cache in each process, so that
+    repeated callbacks on the same object do not decode it again.
+
+    Objects returned by get are shared between callbacks and should not be modified in
+    place.
+    """
+
+    def __init__(self, backend: BaseCache, maxsize: int = 32) -> None:
+        """
+        Args:
+            backend (BaseCache): Cache holding the JSON of the objects, keyed by hash.
+                Its timeout and threshold control how long and how many objects are
+                kept.
+            maxsize (int, optional): Maximum number of decoded objects to keep in
+                memory. Defaults to 32.
+        """
+        self.backend = backend
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._objects: OrderedDict[str, MSONable] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_handle(data: Any) -> bool:
+        """Whether the data is a handle to an object in an ObjectStore."""
+        return isinstance(data, dict) and HANDLE_KEY in data
+
+    def put(self, obj: MSONable) -> dict[str, str]:
+        """Add an object to the store.
+
+        Args:
+            obj (MSONable): The object.
+
+        Returns:
+            dict: The handle of the object, to send to the browser instead of its JSON.
+        """
+        json_str = obj.to_json()
+        key = hashlib.blake2b(json_str.encode(), digest_size=16).hexdigest()
+        # always written, to reset the timeout of objects that are still in use
+        self.backend.set(key, json_str)
+        self._add(key, obj)
+        return {HANDLE_KEY: key, "@class": type(obj).__name__}
+
+    def get(self, handle: dict[str, str]) -> MSONable:
+        """Get an object from the store.
+
+        Args:
+            handle (dict): The handle returned by put.
+
+        Raises:
+            KeyError: If the object is not in the store, e.g. if its timeout expired.
+
+        Returns:
+            MSONable: The object.
+        """
+        key = handle[HANDLE_KEY]
+        with self._lock:
+            if key in self._objects:
+                self.hits += 1
+                self._objects.move_to_end(key)
+                return self._objects[key]
+            self.misses += 1
+        json_str = self.backend.get(key)
+        if json_str is None:
+            raise KeyError(
+                f"Object {key} is no longer in the object store, increase "
+                "OBJECT_STORE_TTL or OBJECT_STORE_SIZE to keep objects for longer."
+            )
+        obj = loads(json_str, cls=MontyDecoder)
+        self._add(key, obj)
+        return obj
+
+    def cache_info(self) -> dict[str, int]:
+        """Hits, misses and size of the in-memory cache of decoded objects."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._objects),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Empty the in-memory cache of decoded objects."""
+        with self._lock:
+            self._objects.clear()
+            self.hits = self.misses = 0
+
+    def _add(self, key: str, obj: MSONable) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._objects[key] = obj
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.maxsize:
+                self._objects.popitem(last=False)
+
+
+def make_cache_backend(
+    kind: Literal["disk", "redis"] | None,
+    path: str | Path | None = None,
+    size: int = 1000,
+    ttl: int = 0,
+    name: str = "cache",
+) -> BaseCache:
+    """Create the backend of a cache shared by the components of an app.
+
+    Args:
+        kind ("disk" | "redis" | None): "disk" to share the cache between the workers
+            on a machine, "redis" to share it between machines using the Redis
+            instance at REDIS_URL, or None for a cache private to each process.
+        path (str | Path, optional): Directory of a "disk" cache. Defaults to a
+            directory named after the cache in the system temporary directory.
+        size (int, optional): Maximum number of entries of "disk" and in-process
+            caches. Defaults to 1000.
+        ttl (int, optional): Number of seconds entries are kept, or 0 to keep them
+            until they are evicted. Defaults to 0.
+        name (str, optional): Name of the cache, used to keep the entries of
+            different caches apart. Defaults to "cache".
+
+    Returns:
+        BaseCache: The backend.
+    """
+    if kind == "redis":
+        if redis_from_url is None:
+            raise ImportError(
+                f"The 'redis' {name} cache requires the redis package. "
+                "Please pip install redis."
+            )
+        return RedisCache(
+            host=redis_from_url(str(SETTINGS.REDIS_URL)),
+            default_timeout=ttl,
+            key_prefix=f"crystal_toolkit_{name}_",
+        )
+    if kind == "disk":
+        return FileSystemCache(
+            str(path or Path(tempfile.gettempdir()) / f"crystal_toolkit_{name}"),
+            threshold=size,
+            default_timeout=ttl,
+        )
+    return SimpleCache(threshold=size, default_timeout=ttl)
+
+
+_OBJECT_STORE: ObjectStore | None = None
+_OBJECT_STORE_LOCK = threading.Lock()
+
+
+def get_object_store() -> ObjectStore | None:
+    """Get the ObjectStore configured by the OBJECT_STORE settings.
+
+    Returns:
+        ObjectStore | None: The store shared by all components, or None if
+            OBJECT_STORE is not set and objects are sent to the browser in full.
+    """
+    global _OBJECT_STORE  # noqa: PLW0603
+    if SETTINGS.OBJECT_STORE is None:
+        return None
+    with _OBJECT_STORE_LOCK:
+        if _OBJECT_STORE is None:
+            backend = make_cache_backend(
+                SETTINGS.OBJECT_STORE,
+                path=SETTINGS.OBJECT_STORE_PATH,
+                size=SETTINGS.OBJECT_STORE_SIZE,
+                ttl=SETTINGS.OBJECT_STORE_TTL,
+                name="objects",
+            )
+            _OBJECT_STORE = ObjectStore(
+                backend, maxsize=SETTINGS.OBJECT_STORE_MEMORY_SIZE
+            )
+    return _OBJECT_STORE
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 from abc import abstractmethod
+from base64 import b64decode, b64encode
 from collections import defaultdict
-from dataclasses import asdict, dataclass, field
+from copy import deepcopy
+from dataclasses import dataclass, field, fields, is_dataclass
 from itertools import chain
-from json import dump
-from typing import Any, Sequence
+from json import dump, dumps
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from crystal_toolkit.settings import SETTINGS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 """
 This module gives a Python interface to generate JSON for the
@@ -13,8 +24,493 @@ CrystalToolkitSceneComponent. To use, create a Scene whose contents can either b
 a list of any of the geometric primitives defined below (e.g. Spheres,
 Cylinders, etc.) or can be another Scene. Then use scene_to_json() to convert
 the Scene to the JSON format to pass to CrystalToolkitSceneComponent's data attribute.
+
+For large scenes, the positions of Spheres, Ellipsoids, Cylinders, Arrows and Lines can
+be given as numpy arrays instead of nested lists. Merging array-backed primitives is then
+a single concatenation, and arrays are only converted to lists when calling to_json().
+
+Scene.to_json(typed_arrays=True) encodes positions, position pairs and surface normals
+as base64 little-endian float32 buffers (and the indexPairs of IndexedCylinders as
+uint32 buffers), see encode_typed_array() for the format. This greatly reduces payload
+size and parse time for large scenes, but requires the client to decode the buffers
+(see decode_typed_arrays()).
+
+IndexedCylinders draw cylinders between positions in a table shared by the whole Scene,
+which greatly reduces the size of bonded scenes. Similarly, an IndexedSurface stores each
+vertex of a mesh only once, together with the indices of the vertices of each face. Like
+typed arrays, these have to be expanded by the client (see expand_indexed_primitives()),
+and IndexedSurfaces are only sent as such with Scene.to_json(indexed_surfaces=True),
+otherwise they are converted to a regular Surface.
+
+Primitives can be animated over a sequence of frames, e.g. a molecular dynamics
+trajectory, with _animate holding an (n_frames, *positions.shape) float32 array of the
+change in position from one frame to the next, starting from positions, see
+encode_animation() and decode_animation(). The _animate of IndexedCylinders animates
+their position table, and is stored once as the "_animate" of the Scene in the scene
+JSON, like the table itself.
+
+To update a scene that is already displayed, Scene.diff() gives a compact patch
+containing only the changed fields of each scene and primitive, which can be applied
+with Scene.apply_diff() (or converted to a dash.Patch, see StructureMoleculeComponent).
 """
 
+# fields which are sent as typed arrays when using Scene.to_json(typed_arrays=True)
+TYPED_ARRAY_FIELDS = frozenset({"positions", "positionPairs", "normals", "_animate"})
+# fields which are sent as uint32 typed arrays when using Scene.to_json(typed_arrays=True)
+TYPED_INDEX_FIELDS = frozenset({"indexPairs", "faces"})
+# below this number of values, the buffer metadata outweighs the savings
+TYPED_ARRAY_MIN_SIZE = 12
+
+
+# numpy equivalents of the supported typed array dtypes
+TYPED_ARRAY_DTYPES = {"float32": "<f4", "uint32": "<u4"}
+
+
+def encode_typed_array(
+    values: Sequence | np.ndarray, dtype: str = "float32"
+) -> dict[str, Any]:
+    """Encode a (nested) list of numbers as a base64 little-endian buffer.
+
+    Args:
+        values: a rectangular (nested) list or numpy array of numbers
+        dtype: "float32" (default) or "uint32", e.g. for indices
+
+    Returns:
+        dict[str, Any]: with keys "dtype", "shape" (list of ints) and "buffer"
+            (base64-encoded bytes)
+    """
+    arr = np.ascontiguousarray(values, dtype=TYPED_ARRAY_DTYPES[dtype])
+    return {
+        "dtype": dtype,
+        "shape": list(arr.shape),
+        "buffer": b64encode(arr.tobytes()).decode("ascii"),
+    }
+
+
+def decode_typed_arrays(scene_json: Any) -> Any:
+    """Decode all typed arrays in a scene JSON created with Scene.to_json(typed_arrays=True)
+    back into nested lists of numbers. This is the Python equivalent of the decoding done
+    in the browser.
+
+    Args:
+        scene_json: scene JSON, or any part of it
+
+    Returns:
+        Any: a copy of scene_json with all typed arrays replaced by nested lists
+    """
+    if isinstance(scene_json, list):
+        return [decode_typed_arrays(item) for item in scene_json]
+    if isinstance(scene_json, dict):
+        if isinstance(scene_json.get("buffer"), str) and "dtype" in scene_json:
+            arr = np.frombuffer(
+                b64decode(scene_json["buffer"]),
+                dtype=TYPED_ARRAY_DTYPES[scene_json["dtype"]],
+            )
+            return arr.reshape(scene_json["shape"]).tolist()
+        return {key: decode_typed_arrays(val) for key, val in scene_json.items()}
+    return scene_json
+
+
+def encode_animation(
+    frames: np.ndarray, positions: np.ndarray | None = None
+) -> np.ndarray:
+    """Delta-encode the positions of a primitive in each frame of an animation.
+
+    The deltas are float32, and each is taken relative to the previous frame as it is
+    decoded in float32, so that rounding errors do not accumulate over the frames.
+
+    Args:
+        frames: (n_frames, ...) array with the positions in each frame
+        positions: the positions of the primitive, defaults to the first frame
+
+    Returns:
+        np.ndarray: float32 array of the same shape as frames, for the _animate of the
+            primitive
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    previous = frames[0] if positions is None else np.float32(positions)
+    deltas = np.empty_like(frames)
+    for idx, frame in enumerate(frames):
+        deltas[idx] = frame - previous
+        previous = previous + deltas[idx]
+    return deltas
+
+
+def decode_animation(positions: Any, animate: Any) -> np.ndarray:
+    """Get the positions of a primitive in each frame of an animation.
+
+    Args:
+        positions: the positions of the primitive
+        animate: the _animate of the primitive, see encode_animation()
+
+    Returns:
+        np.ndarray: float32 array of shape (n_frames, *positions.shape)
+    """
+    frames = np.asarray(animate, dtype=np.float32).copy()
+    if len(frames):
+        frames[0] += np.asarray(positions, dtype=np.float32)
+    # float32 accumulation, as in the browser
+    return np.cumsum(frames, axis=0, dtype=np.float32)
+
+
+def _maybe_encode_typed_array(
+    values: Sequence | np.ndarray, dtype: str = "float32"
+) -> Any:
+    """Encode values as a typed array if they are rectangular and large enough for
+    this to be worthwhile, otherwise return them as (nested) lists.
+    """
+    try:
+        encoded = encode_typed_array(values, dtype=dtype)
+    except ValueError:
+        # ragged lists cannot be encoded, send as-is
+        return values
+    if np.prod(encoded["shape"]) >= TYPED_ARRAY_MIN_SIZE:
+        return encoded
+    return values.tolist() if isinstance(values, np.ndarray) else values
+
+
+# field names of each dataclass, computed once per class
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _field_names(cls: type) -> tuple[str, ...]:
+    if (names := _FIELD_NAMES.get(cls)) is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def _is_dataclass_instance(obj: Any) -> bool:
+    return is_dataclass(obj) and not isinstance(obj, type)
+
+
+def _to_plain(obj: Any) -> Any:
+    """Equivalent of dataclasses.asdict for arbitrary objects, without copying leaves."""
+    if _is_dataclass_instance(obj):
+        return {name: _to_plain(getattr(obj, name)) for name in _field_names(type(obj))}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_plain(item) for item in obj)
+    if isinstance(obj, dict):
+        return {key: _to_plain(val) for key, val in obj.items()}
+    return obj
+
+
+def _serialize(
+    obj: Any, typed_arrays: bool = False, indexed_surfaces: bool = False
+) -> Any:
+    """Serialize a primitive, Scene or dict into a JSON-compatible dict in a single pass.
+
+    Any key whose value is None (i.e. its default value) is removed to reduce the
+    file size of the JSON. The output shares leaf lists (e.g. positions) with the
+    primitives rather than copying them, and so should be treated as read-only.
+    """
+    if isinstance(obj, dict):
+        items: Iterable = obj.items()
+    else:
+        items = ((name, getattr(obj, name)) for name in _field_names(type(obj)))
+
+    trimmed = {}
+    for key, val in items:
+        if val is None or isinstance(val, dict) or _is_dataclass_instance(val):
+            # nested dicts are not supported by the scene format and are dropped
+            continue
+        if (
+            typed_arrays
+            and key in TYPED_ARRAY_FIELDS
+            and isinstance(val, (list, np.ndarray))
+        ):
+            trimmed[key] = _maybe_encode_typed_array(val)
+        elif (
+            typed_arrays
+            and key in TYPED_INDEX_FIELDS
+            and isinstance(val, (list, np.ndarray))
+        ):
+            trimmed[key] = _maybe_encode_typed_array(val, dtype="uint32")
+        elif isinstance(val, list) and key in TYPED_ARRAY_FIELDS:
+            # positions only contain numbers, no need to inspect every item
+            trimmed[key] = val
+        elif key == "contents" and any(
+            isinstance(item, IndexedCylinders) for item in val
+        ):
+            trimmed[key], positions, animate = _serialize_indexed_contents(
+                val, typed_arrays, indexed_surfaces
+            )
+            trimmed["positions"] = (
+                _maybe_encode_typed_array(positions)
+                if typed_arrays
+                else positions.tolist()
+            )
+            if animate is not None:
+                trimmed["_animate"] = (
+                    _maybe_encode_typed_array(animate)
+                    if typed_arrays
+                    else animate.tolist()
+                )
+        elif isinstance(val, list):
+            trimmed[key] = [
+                _serialize_item(item, typed_arrays, indexed_surfaces) for item in val
+            ]
+        elif isinstance(val, np.ndarray):
+            # array-backed primitives are only converted to lists here
+            trimmed[key] = val.tolist()
+        else:
+            trimmed[key] = val
+    return trimmed
+
+
+def _serialize_item(item: Any, typed_arrays: bool, indexed_surfaces: bool) -> Any:
+    if isinstance(item, IndexedSurface) and not indexed_surfaces:
+        # fall back to a flat list of triangles for clients which cannot expand them
+        item = item.to_surface()
+    if isinstance(item, dict) or _is_dataclass_instance(item):
+        return _serialize(
+            item, typed_arrays=typed_arrays, indexed_surfaces=indexed_surfaces
+        )
+    if isinstance(item, (list, tuple)) and any(
+        isinstance(sub_item, dict) or _is_dataclass_instance(sub_item)
+        for sub_item in item
+    ):
+        # e.g. Scene contents nested by Scene.__add__
+        return _to_plain(item)
+    return item
+
+
+def _serialize_indexed_contents(
+    contents: list, typed_arrays: bool, indexed_surfaces: bool
+) -> tuple[list, np.ndarray, np.ndarray | None]:
+    """Serialize the contents of a scene which include IndexedCylinders. The position
+    tables of all IndexedCylinders are concatenated into a single table for the scene,
+    and their indexPairs are offset accordingly. Likewise for the animations of the
+    tables, where tables without one stay in place.
+    """
+    serialized = []
+    tables: list[np.ndarray] = []
+    animations: list[np.ndarray | None] = []
+    offsets: dict[int, int] = {}
+    n_positions = 0
+
+    for item in contents:
+        if not isinstance(item, IndexedCylinders):
+            serialized.append(_serialize_item(item, typed_arrays, indexed_surfaces))
+            continue
+
+        if (offset := offsets.get(id(item.positions))) is None:
+            offset = offsets[id(item.positions)] = n_positions
+            tables.append(np.reshape(np.asarray(item.positions, dtype=float), (-1, 3)))
+            animations.append(item._animate)
+            n_positions += len(tables[-1])
+
+        index_pairs = np.reshape(np.asarray(item.indexPairs, dtype=int), (-1, 2))
+        index_pairs = index_pairs + offset
+        item_json = _serialize(
+            {
+                name: getattr(item, name)
+                for name in _field_names(IndexedCylinders)
+                if name not in ("indexPairs", "positions", "_animate")
+            },
+            typed_arrays=typed_arrays,
+        )
+        serialized.append(
+            {
+                "indexPairs": _maybe_encode_typed_array(index_pairs, dtype="uint32")
+                if typed_arrays
+                else index_pairs.tolist(),
+                **item_json,
+            }
+        )
+
+    animate = None
+    if any(animation is not None for animation in animations):
+        n_frames = max(
+            len(animation) for animation in animations if animation is not None
+        )
+        animate = np.concatenate(
+            [
+                np.zeros((n_frames, len(table), 3), dtype=np.float32)
+                if animation is None
+                else np.asarray(animation, dtype=np.float32)
+                for table, animation in zip(tables, animations)
+            ],
+            axis=1,
+        )
+
+    return serialized, np.concatenate(tables), animate
+
+
+def expand_indexed_primitives(scene_json: Any) -> Any:
+    """Replace all IndexedCylinders and IndexedSurfaces in a scene JSON, as created by
+    Scene.to_json(), by the equivalent Cylinders and Surfaces. This is the Python
+    equivalent of the expansion done in the browser, and requires typed arrays to be
+    decoded first (see decode_typed_arrays()).
+
+    Args:
+        scene_json: scene JSON, or any part of it
+
+    Returns:
+        Any: a copy of scene_json with only regular Cylinders and Surfaces
+    """
+    if isinstance(scene_json, list):
+        return [expand_indexed_primitives(item) for item in scene_json]
+    if not isinstance(scene_json, dict) or "contents" not in scene_json:
+        return scene_json
+
+    positions = np.array(scene_json.get("positions", []), dtype=float)
+    frames = (
+        decode_animation(positions, scene_json["_animate"])
+        if "_animate" in scene_json
+        else None
+    )
+    scene_json = {
+        key: val
+        for key, val in scene_json.items()
+        if key not in ("positions", "_animate")
+    }
+    contents = []
+    for item in scene_json["contents"]:
+        if isinstance(item, dict) and item.get("type") == "indexedCylinders":
+            cylinders = {
+                key: val
+                for key, val in item.items()
+                if key not in ("indexPairs", "split")
+            }
+            index_pairs = np.reshape(np.asarray(item["indexPairs"], dtype=int), (-1, 2))
+            split = item.get("split", 0.5)
+            start, end = positions[index_pairs[:, 0]], positions[index_pairs[:, 1]]
+            position_pairs = np.stack(
+                [start, (1 - split) * start + split * end], axis=1
+            )
+            cylinders["positionPairs"] = position_pairs.tolist()
+            if frames is not None:
+                start, end = frames[:, index_pairs[:, 0]], frames[:, index_pairs[:, 1]]
+                cylinders["_animate"] = encode_animation(
+                    np.stack([start, (1 - split) * start + split * end], axis=2),
+                    position_pairs,
+                ).tolist()
+            cylinders["type"] = "cylinders"
+            contents.append(cylinders)
+        elif isinstance(item, dict) and item.get("type") == "indexedSurface":
+            surface = {key: val for key, val in item.items() if key != "faces"}
+            faces = np.reshape(np.asarray(item["faces"], dtype=int), (-1,))
+            for key in ("positions", "normals"):
+                if key in item:
+                    surface[key] = np.asarray(item[key], dtype=float)[faces].tolist()
+            surface["type"] = "surface"
+            contents.append(surface)
+        else:
+            contents.append(expand_indexed_primitives(item))
+    scene_json["contents"] = contents
+    return scene_json
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    try:
+        return bool(a == b)
+    except ValueError:
+        # numpy arrays nested inside lists cannot be compared directly
+        return dumps(a, default=_json_default) == dumps(b, default=_json_default)
+
+
+def _diff_scene_json(
+    old: dict, new: dict, path: str, patch: dict[str, dict[str, Any]]
+) -> None:
+    """Add the changes between the scene or primitive JSON old and new to patch."""
+    changes: dict[str, Any] = {}
+    patch[path] = changes  # keep parents before their children
+
+    old_contents, new_contents = old.get("contents"), new.get("contents")
+    recurse = (
+        isinstance(old_contents, list)
+        and isinstance(new_contents, list)
+        # contents which are not scenes or primitives cannot be patched
+        # field-by-field, so if any of them changed, replace them all
+        and all(
+            (isinstance(old_item, dict) and isinstance(new_item, dict))
+            or _json_equal(old_item, new_item)
+            for old_item, new_item in zip(old_contents, new_contents)
+        )
+    )
+
+    for key, val in new.items():
+        if recurse and key == "contents":
+            continue
+        if key not in old or not _json_equal(old[key], val):
+            changes[key] = val
+    for key in old.keys() - new.keys():
+        changes[key] = None
+
+    if recurse:
+        for idx, (old_item, new_item) in enumerate(zip(old_contents, new_contents)):
+            if isinstance(old_item, dict) and isinstance(new_item, dict):
+                child_path = f"{path}/{idx}" if path else str(idx)
+                _diff_scene_json(old_item, new_item, child_path, patch)
+        if len(new_contents) > len(old_contents):
+            changes["_append"] = new_contents[len(old_contents) :]
+        elif len(new_contents) < len(old_contents):
+            changes["_remove"] = list(range(len(new_contents), len(old_contents)))
+
+    if not changes:
+        del patch[path]
+
+
+def _concatenate(
+    arrays: Sequence[Sequence | np.ndarray], shape: tuple[int, ...] = (3,)
+) -> list | np.ndarray:
+    """Concatenate the positions of several primitives.
+
+    If any of the inputs is a numpy array, the result will be a single contiguous
+    float array (with trailing dimensions given by shape), otherwise a flat list
+    is returned as before.
+
+    Args:
+        arrays: list of positions, positionPairs etc. from the primitives to merge
+        shape: trailing shape of a single element, e.g. (3,) for positions or
+            (2, 3) for positionPairs
+
+    Returns:
+        list | np.ndarray: the concatenated positions
+    """
+    if any(isinstance(arr, np.ndarray) for arr in arrays):
+        return np.concatenate(
+            [np.asarray(arr, dtype=float).reshape(-1, *shape) for arr in arrays]
+        )
+    return list(chain.from_iterable(arrays))
+
+
+def _concatenate_animations(
+    animations: Sequence, lengths: Sequence[int], shape: tuple[int, ...] = (3,)
+) -> np.ndarray | None:
+    """Concatenate the _animate of several primitives to merge, see encode_animation().
+    Primitives without an animation stay in place.
+
+    Args:
+        animations: the _animate of each primitive, or None
+        lengths: the number of positions (or position pairs) of each primitive
+        shape: trailing shape of a single element, as for _concatenate()
+
+    Returns:
+        np.ndarray | None: (n_frames, sum(lengths), *shape) float32 array, or None if
+            none of the primitives is animated
+    """
+    if all(animation is None or not len(animation) for animation in animations):
+        return None
+    n_frames = max(len(animation) for animation in animations if animation is not None)
+    return np.concatenate(
+        [
+            np.zeros((n_frames, length, *shape), dtype=np.float32)
+            if animation is None or not len(animation)
+            else np.reshape(
+                np.asarray(animation, dtype=np.float32), (n_frames, -1, *shape)
+            )
+            for animation, length in zip(animations, lengths)
+        ],
+        axis=1,
+    )
+
 
 class Primitive:
     """A Mixin class for standard plottable primitive behavior.
@@ -35,6 +531,9 @@ class Primitive:
 
     @property
     def bounding_box(self) -> list[list[float]]:
+        if isinstance(self.positions, np.ndarray):
+            positions = self.positions.reshape(-1, 3)
+            return [positions.min(axis=0).tolist(), positions.max(axis=0).tolist()]
         x, y, z = zip(*self.positions)
         return [[min(x), min(y), min(z)], [max(x), max(y), max(z)]]
 
@@ -71,11 +570,14 @@ class Scene:
     def _repr_mimebundle_(self, include=None, exclude=None):
         """Render Scenes using crystaltoolkit-extension for Jupyter Lab."""
         return {
-            "application/vnd.mp.ctk+json": self.to_json(),
+            "application/vnd.mp.ctk+json": self.to_json(
+                typed_arrays=SETTINGS.SCENE_TYPED_ARRAYS,
+                indexed_surfaces=SETTINGS.SCENE_INDEXED_SURFACES,
+            ),
             "text/plain": repr(self),
         }
 
-    def to_json(self):
+    def to_json(self, typed_arrays: bool = False, indexed_surfaces: bool = False):
         """Convert a Scene into JSON. It will implicitly assume all None values means that attribute
         uses its default value, and so will be removed from the JSON to reduce the file size of the
         resulting JSON.
@@ -84,7 +586,11 @@ class Scene:
         that can be converted to a JSON string using the standard library JSON
         encoder.
 
-        :param scene: A Scene object
+        :param typed_arrays: if True, positions, positionPairs and normals will be
+        encoded as base64 float32 buffers, see encode_typed_array()
+        :param indexed_surfaces: if True, IndexedSurfaces are kept as vertices and faces,
+        which have to be expanded by the client (see expand_indexed_primitives()),
+        otherwise they are converted to a Surface with a flat list of triangles
         :return: dict in a format that can be parsed by CrystalToolkitSceneComponent
         """
         merged_scene = Scene(
@@ -94,24 +600,30 @@ class Scene:
             lattice=self.lattice,
         )
 
-        def remove_defaults(scene_dict):
-            """Reduce file size of JSON by removing any key which is just its default value."""
-            trimmed_dict = {}
-            for key, val in scene_dict.items():
-                # if key == "_meta":
-                #     trimmed_dict[key] = val
-                if isinstance(val, dict):
-                    val = remove_defaults(val)  # noqa: PLW2901
-                elif isinstance(val, list):
-                    trimmed_dict[key] = [
-                        remove_defaults(item) if isinstance(item, dict) else item
-                        for item in val
-                    ]
-                elif val is not None:
-                    trimmed_dict[key] = val
-            return trimmed_dict
-
-        return remove_defaults(asdict(merged_scene))
+        return _serialize(
+            merged_scene, typed_arrays=typed_arrays, indexed_surfaces=indexed_surfaces
+        )
+
+    def to_json_bytes(
+        self, typed_arrays: bool = False, indexed_surfaces: bool = False
+    ) -> bytes:
+        """Convert a Scene directly into JSON bytes, e.g. to return from a Flask route.
+
+        Uses orjson if installed, which is considerably faster than the
+        standard library JSON encoder for large scenes.
+
+        :param typed_arrays: see to_json()
+        :param indexed_surfaces: see to_json()
+        :return: compact JSON as bytes
+        """
+        scene_json = self.to_json(
+            typed_arrays=typed_arrays, indexed_surfaces=indexed_surfaces
+        )
+        if orjson:
+            return orjson.dumps(
+                scene_json, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+            )
+        return dumps(scene_json, default=_json_default, separators=(",", ":")).encode()
 
     def to_plotly_json(self):
         """Easy way to allow Scene objects to be returned from callbacks."""
@@ -165,6 +677,59 @@ class Scene:
 
         return merged + remainder
 
+    @staticmethod
+    def diff(old: Scene | dict, new: Scene | dict) -> dict[str, dict[str, Any]]:
+        """Compute a compact patch to turn the scene old into the scene new, e.g. to
+        update a scene that is already displayed without sending it again in full.
+
+        The patch is keyed by the path of each changed scene or primitive, given as
+        "/"-separated indices into the nested "contents" lists, with "" for the root
+        scene. For example, "1/0" is the first primitive of the second sub-scene.
+        Primitives are identified by their position, which is stable since primitives
+        are merged by key in order of first appearance.
+
+        Each value is a dict of the fields which changed, where None means that the
+        field was removed. Additionally, "_append" gives a list of new items to add
+        to the end of "contents" and "_remove" gives the indices of items to remove
+        from the end of "contents".
+
+        :param old: Scene, or its JSON from Scene.to_json(), that is displayed
+        :param new: Scene, or its JSON from Scene.to_json(), to display
+        :return: patch, empty if the scenes are identical
+        """
+        if isinstance(old, Scene):
+            old = old.to_json()
+        if isinstance(new, Scene):
+            new = new.to_json()
+        patch: dict[str, dict[str, Any]] = {}
+        _diff_scene_json(old, new, "", patch)
+        return patch
+
+    @staticmethod
+    def apply_diff(scene_json: dict, patch: dict[str, dict[str, Any]]) -> dict:
+        """Apply a patch created by Scene.diff() to scene JSON.
+
+        :param scene_json: JSON of the old scene, will not be modified
+        :param patch: patch from Scene.diff()
+        :return: JSON of the new scene
+        """
+        scene_json = deepcopy(scene_json)
+        for path, changes in patch.items():
+            node = scene_json
+            for idx in filter(None, path.split("/")):
+                node = node["contents"][int(idx)]
+            for key, val in changes.items():
+                if key == "_append":
+                    node["contents"].extend(deepcopy(val))
+                elif key == "_remove":
+                    for idx in reversed(val):
+                        del node["contents"][idx]
+                elif val is None:
+                    node.pop(key, None)
+                else:
+                    node[key] = deepcopy(val)
+        return scene_json
+
 
 @dataclass
 class Spheres(Primitive):
@@ -172,7 +737,7 @@ class Spheres(Primitive):
     only drawing a section of a sphere).
 
     :param positions: This is a list of lists corresponding to the vector
-    positions of the spheres.
+    positions of the spheres, or an (N, 3) numpy array.
     :param color: Sphere color as a hexadecimal string, e.g. #ff0000
     :param radius: The radius of the sphere, defaults to 1.
     :param phiStart: Start angle in radians if drawing only a section of the
@@ -185,7 +750,7 @@ class Spheres(Primitive):
     and trigger and event
     """
 
-    positions: list[list[float]]
+    positions: list[list[float]] | np.ndarray
     _animate: list[list[float]] | None = None
     color: str | None = None
     radius: float | None = None
@@ -204,11 +769,26 @@ class Spheres(Primitive):
 
     @classmethod
     def merge(cls, sphere_list):
-        new_positions = list(
-            chain.from_iterable([sphere.positions for sphere in sphere_list])
-        )
+        new_positions = _concatenate([sphere.positions for sphere in sphere_list])
+
+        # a list of _meta has one entry per position, e.g. the index of its site
+        new_meta = sphere_list[0]._meta
+        if any(isinstance(sphere._meta, list) for sphere in sphere_list):
+            new_meta = list(
+                chain.from_iterable(
+                    sphere._meta
+                    if isinstance(sphere._meta, list)
+                    else [sphere._meta] * len(sphere.positions)
+                    for sphere in sphere_list
+                )
+            )
+
         return cls(
             positions=new_positions,
+            _animate=_concatenate_animations(
+                [sphere._animate for sphere in sphere_list],
+                [len(sphere.positions) for sphere in sphere_list],
+            ),
             color=sphere_list[0].color,
             radius=sphere_list[0].radius,
             phiStart=sphere_list[0].phiStart,
@@ -216,7 +796,7 @@ class Spheres(Primitive):
             visible=sphere_list[0].visible,
             clickable=sphere_list[0].clickable,
             tooltip=sphere_list[0].tooltip,
-            _meta=sphere_list[0]._meta,
+            _meta=new_meta,
         )
 
 
@@ -227,9 +807,9 @@ class Ellipsoids(Primitive):
 
     :param scale: This is the scale to apply to the x,y and z axis of the ellipsoid prior to rotation to the target axes
     :param positions: This is a list of lists corresponding to the vector
-    positions of the ellipsoids.
+    positions of the ellipsoids, or an (N, 3) numpy array.
     :param rotate_to: This is a list of vectors that specify the direction the major axis of the ellipsoid should point
-        towards. The major axis is the z-axis: (0,0,1)
+        towards. The major axis is the z-axis: (0,0,1). Can also be an (N, 3) numpy array.
     :param color: Ellipsoid color as a hexadecimal string, e.g. #ff0000
     :param phiStart: Start angle in radians if drawing only a section of the
     ellipsoid, defaults to 0
@@ -242,8 +822,8 @@ class Ellipsoids(Primitive):
     """
 
     scale: list[float]
-    positions: list[list[float]]
-    rotate_to: list[list[float]]
+    positions: list[list[float]] | np.ndarray
+    rotate_to: list[list[float]] | np.ndarray
     _animate: list[list[float]] | None = None
     color: str | None = None
     phiStart: float | None = None
@@ -260,18 +840,16 @@ class Ellipsoids(Primitive):
 
     @classmethod
     def merge(cls, ellipsoid_list):
-        new_positions = list(
-            chain.from_iterable([ellipsoid.positions for ellipsoid in ellipsoid_list])
-        )
-        rotate_to = list(
-            chain.from_iterable([ellipsoid.rotate_to for ellipsoid in ellipsoid_list])
+        new_positions = _concatenate(
+            [ellipsoid.positions for ellipsoid in ellipsoid_list]
         )
+        rotate_to = _concatenate([ellipsoid.rotate_to for ellipsoid in ellipsoid_list])
         new__animate = list(
             chain.from_iterable(
                 [
                     ellipsoid._animate
                     for ellipsoid in ellipsoid_list
-                    if ellipsoid._animate
+                    if ellipsoid._animate is not None and len(ellipsoid._animate)
                 ]
             )
         )
@@ -293,7 +871,7 @@ class Cylinders(Primitive):
     """Create a set of cylinders. All cylinders will have the same color and radius.
 
     :param positionPairs: This is a list of pairs of lists corresponding to the
-    start and end position of the cylinder.
+    start and end position of the cylinder, or an (N, 2, 3) numpy array.
     :param color: Cylinder color as a hexadecimal string, e.g. #ff0000
     :param radius: The radius of the cylinder, defaults to 1.
     :param visible: If False, will hide the object by default.
@@ -302,7 +880,7 @@ class Cylinders(Primitive):
     and trigger and event
     """
 
-    positionPairs: list[list[list[float]]]
+    positionPairs: list[list[list[float]]] | np.ndarray
     _animate: list[list[list[float]]] | None = None
     color: str | None = None
     radius: float | None = None
@@ -319,16 +897,25 @@ class Cylinders(Primitive):
 
     @classmethod
     def merge(cls, cylinder_list):
-        new_positionPairs = list(
-            chain.from_iterable([cylinder.positionPairs for cylinder in cylinder_list])
+        new_positionPairs = _concatenate(
+            [cylinder.positionPairs for cylinder in cylinder_list], shape=(2, 3)
         )
 
+        # merged cylinders already have a list of _meta, one per position pair
         new_meta_list = list(
-            chain.from_iterable([[cylinder._meta] for cylinder in cylinder_list])
+            chain.from_iterable(
+                cylinder._meta if isinstance(cylinder._meta, list) else [cylinder._meta]
+                for cylinder in cylinder_list
+            )
         )
 
         return cls(
             positionPairs=new_positionPairs,
+            _animate=_concatenate_animations(
+                [cylinder._animate for cylinder in cylinder_list],
+                [len(cylinder.positionPairs) for cylinder in cylinder_list],
+                shape=(2, 3),
+            ),
             color=cylinder_list[0].color,
             radius=cylinder_list[0].radius,
             visible=cylinder_list[0].visible,
@@ -343,6 +930,113 @@ class Cylinders(Primitive):
         return [[min(x), min(y), min(z)], [min(x), min(y), min(z)]]
 
 
+@dataclass
+class IndexedCylinders(Primitive):
+    """Create a set of cylinders between positions in a table shared with other
+    primitives, e.g. to draw bonds without repeating the atom positions for every bond.
+    All cylinders will have the same color and radius.
+
+    The cylinder for the index pair (i, j) starts at positions[i] and ends at
+    (1 - split) * positions[i] + split * positions[j], so the default split of 0.5
+    gives half a bond. In the scene JSON, the position tables of all IndexedCylinders in
+    a Scene are stored only once, as the "positions" of that Scene, see
+    expand_indexed_primitives() to convert them to Cylinders.
+
+    :param indexPairs: This is a list of pairs of indices into positions, or an
+    (N, 2) numpy array.
+    :param positions: An (M, 3) numpy array of positions, which should be the same
+    object for all IndexedCylinders sharing a table.
+    :param _animate: An (n_frames, M, 3) array to animate the positions table, see
+    encode_animation().
+    :param split: Fraction of the distance from the first to the second position
+    covered by the cylinder, defaults to 0.5
+    :param color: Cylinder color as a hexadecimal string, e.g. #ff0000
+    :param radius: The radius of the cylinder, defaults to 1.
+    :param visible: If False, will hide the object by default.
+    :param reference: name to reference the primitive for callback
+    :param clickable: if true, allows this primitive to be clicked
+    and trigger and event
+    """
+
+    indexPairs: list[list[int]] | np.ndarray
+    positions: np.ndarray = field(repr=False)
+    _animate: np.ndarray | None = field(default=None, repr=False)
+    split: float | None = None
+    color: str | None = None
+    radius: float | None = None
+    type: str = field(default="indexedCylinders", init=False)  # private field
+    visible: bool | None = None
+    tooltip: str | None = None
+    clickable: bool = False
+    reference: str | None = None
+    _meta: Any = None
+
+    @property
+    def key(self):
+        # only IndexedCylinders sharing a position table can be merged
+        return f"indexed_cylinder_{id(self.positions)}_{self.split}_{self.color}_{self.radius}_{self.reference}_{self.clickable}_{self.tooltip}"
+
+    @classmethod
+    def merge(cls, cylinder_list):
+        index_pairs = [cylinder.indexPairs for cylinder in cylinder_list]
+        if any(isinstance(pairs, np.ndarray) for pairs in index_pairs):
+            new_index_pairs = np.concatenate(
+                [
+                    np.reshape(np.asarray(pairs, dtype=int), (-1, 2))
+                    for pairs in index_pairs
+                ]
+            )
+        else:
+            new_index_pairs = list(chain.from_iterable(index_pairs))
+
+        new_meta_list = list(
+            chain.from_iterable(
+                cylinder._meta if isinstance(cylinder._meta, list) else [cylinder._meta]
+                for cylinder in cylinder_list
+            )
+        )
+        if all(meta is None for meta in new_meta_list):
+            # keep the payload small, a list of None is not worth sending
+            new_meta_list = None
+
+        return cls(
+            indexPairs=new_index_pairs,
+            positions=cylinder_list[0].positions,
+            _animate=cylinder_list[0]._animate,
+            split=cylinder_list[0].split,
+            color=cylinder_list[0].color,
+            radius=cylinder_list[0].radius,
+            visible=cylinder_list[0].visible,
+            clickable=cylinder_list[0].clickable,
+            tooltip=cylinder_list[0].tooltip,
+            reference=cylinder_list[0].reference,
+            _meta=new_meta_list,
+        )
+
+    def to_cylinders(self) -> Cylinders:
+        """Get the equivalent Cylinders, with explicit position pairs."""
+        positions = np.reshape(np.asarray(self.positions, dtype=float), (-1, 3))
+        index_pairs = np.reshape(np.asarray(self.indexPairs, dtype=int), (-1, 2))
+        split = 0.5 if self.split is None else self.split
+        start, end = positions[index_pairs[:, 0]], positions[index_pairs[:, 1]]
+        return Cylinders(
+            positionPairs=np.stack([start, (1 - split) * start + split * end], axis=1),
+            color=self.color,
+            radius=self.radius,
+            visible=self.visible,
+            tooltip=self.tooltip,
+            clickable=self.clickable,
+            reference=self.reference,
+            _meta=self._meta,
+        )
+
+    @property
+    def bounding_box(self) -> list[list[float]]:
+        positions = np.reshape(np.asarray(self.positions, dtype=float), (-1, 3))
+        positions = positions[np.unique(np.asarray(self.indexPairs, dtype=int))]
+        return [positions.min(axis=0).tolist(), positions.max(axis=0).tolist()]
+
+
 @dataclass
 class Cubes(Primitive):
     """Create a set of cubes. All cubes will have the same color and width.
@@ -391,7 +1085,7 @@ class Lines(Primitive):
     :param positions: This is a list of lists corresponding to the positions of
     the lines. Each consecutive pair of vectors corresponds to the start and end
     position of a line segment (line segments do not have to be joined
-    together).
+    together). Can also be an (N, 3) numpy array.
     :param color: Line color as a hexadecimal string, e.g. #ff0000
     :param linewidth: The width of the line, defaults to 1
     :param scale: Optional, if provided will set a global scale for line dashes.
@@ -403,7 +1097,7 @@ class Lines(Primitive):
     and trigger and event
     """
 
-    positions: list[list[float]]
+    positions: list[list[float]] | np.ndarray
     _animate: list[list[float]] | None = None
     color: str | None = None
     linewidth: float | None = None
@@ -422,11 +1116,13 @@ class Lines(Primitive):
 
     @classmethod
     def merge(cls, line_list):
-        new_positions = list(
-            chain.from_iterable([line.positions for line in line_list])
-        )
+        new_positions = _concatenate([line.positions for line in line_list])
         return cls(
             positions=new_positions,
+            _animate=_concatenate_animations(
+                [line._animate for line in line_list],
+                [len(line.positions) for line in line_list],
+            ),
             color=line_list[0].color,
             linewidth=line_list[0].linewidth,
             scale=line_list[0].scale,
@@ -462,6 +1158,56 @@ class Surface:
         return [[0, 0, 0], [0, 0, 0]]
 
 
+@dataclass
+class IndexedSurface:
+    """Define a surface by its vertices and the indices of the vertices of each
+    triangular face, e.g. as returned by marching cubes. Since vertices are shared by
+    several faces, this is several times smaller than the equivalent Surface.
+
+    Unless the scene is serialized with Scene.to_json(indexed_surfaces=True), it is
+    converted to a Surface, see to_surface().
+
+    :param positions: An (N, 3) numpy array of vertices.
+    :param faces: An (M, 3) array of indices into positions, one row per triangle.
+    :param normals: An (N, 3) array of normals, one per vertex, if known.
+    """
+
+    positions: np.ndarray = field(repr=False)
+    faces: np.ndarray = field(repr=False)
+    normals: np.ndarray | None = field(default=None, repr=False)
+    color: str | None = None
+    opacity: float | None = None
+    show_edges: bool = False
+    type: str = field(default="indexedSurface", init=False)  # private field
+    visible: bool | None = None
+    clickable: bool = False
+    reference: str | None = None
+    _meta: Any = None
+
+    def to_surface(self) -> Surface:
+        """Convert to a Surface with three explicit positions per face."""
+        faces = np.reshape(np.asarray(self.faces, dtype=int), (-1,))
+        normals = self.normals
+        if normals is not None:
+            normals = np.asarray(normals, dtype=float)[faces]
+        return Surface(
+            positions=np.asarray(self.positions, dtype=float)[faces],
+            normals=normals,
+            color=self.color,
+            opacity=self.opacity,
+            show_edges=self.show_edges,
+            visible=self.visible,
+            clickable=self.clickable,
+            reference=self.reference,
+            _meta=self._meta,
+        )
+
+    @property
+    def bounding_box(self) -> list[list[float]]:
+        # Not used in the calculation of the bounding box
+        return [[0, 0, 0], [0, 0, 0]]
+
+
 @dataclass
 class Convex:
     """Create a surface from the convex hull formed by list of points.
@@ -492,7 +1238,7 @@ class Arrows(Primitive):
     """Create a set of arrows. All arrows will have the same color radius and head shape.
 
     :param positionPairs: This is a list of pairs of lists corresponding to the
-    start and end position of the cylinder.
+    start and end position of the cylinder, or an (N, 2, 3) numpy array.
     :param color: Cylinder color as a hexadecimal string, e.g. #ff0000
     :param radius: The radius of the cylinder, defaults to 1.
     :param visible: If False, will hide the object by default.
@@ -501,7 +1247,7 @@ class Arrows(Primitive):
     and trigger and event
     """
 
-    positionPairs: list[list[list[float]]]
+    positionPairs: list[list[list[float]]] | np.ndarray
     _animate: list[list[list[float]]] | None = None
     color: str | None = None
     radius: float | None = None
@@ -527,8 +1273,8 @@ class Arrows(Primitive):
         Returns:
             Arrows: Merged arrows
         """
-        new_positionPairs = list(
-            chain.from_iterable([arrow.positionPairs for arrow in arrow_list])
+        new_positionPairs = _concatenate(
+            [arrow.positionPairs for arrow in arrow_list], shape=(2, 3)
         )
         return cls(
             positionPairs=new_positionPairs,
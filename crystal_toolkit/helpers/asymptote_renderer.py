@@ -414,6 +414,9 @@ class AsySurface(AsyObject):
         Returns:
             AsySurface: The AsySurface object.
         """
+        if ctk_scene.type == "indexedSurface":
+            # asymptote needs the vertices of each triangle
+            ctk_scene = ctk_scene.to_surface()
         if len(ctk_scene.positions) < 1:
             return None
 
@@ -449,6 +452,7 @@ ASY_OBJS = {
     "spheres": AsySphere,
     "cylinders": AsyCylinder,
     "surface": AsySurface,
+    "indexedSurface": AsySurface,
 }
 
 
@@ -7,4 +7,5 @@ from crystal_toolkit.renderables.phasediagram import PhaseDiagram
 from crystal_toolkit.renderables.site import Site
 from crystal_toolkit.renderables.structure import Structure
 from crystal_toolkit.renderables.structuregraph import StructureGraph
+from crystal_toolkit.renderables.trajectory import Trajectory
 from crystal_toolkit.renderables.volumetric import VolumetricData
@@ -8,12 +8,16 @@ from crystal_toolkit.core.legend import Legend
 from crystal_toolkit.core.scene import Scene
 
 
-def get_scene_from_molecule(self, origin=None, legend: Legend | None = None):
+def get_scene_from_molecule(
+    self, origin=None, legend: Legend | None = None, lazy_tooltips: bool = False
+):
     """Create CTK objects for the lattice and sties
     Args:
         self:  Structure object
         origin: x,y,z fractional coordinates of the origin
         legend: Legend for the sites.
+        lazy_tooltips: If true atoms only carry their site index instead of
+        tooltip text, see get_site_tooltips.
 
     Returns:
         CTK scene object to be rendered
@@ -24,8 +28,10 @@ def get_scene_from_molecule(self, origin=None, legend: Legend | None = None):
 
     primitives: dict[str, list] = defaultdict(list)
 
-    for site in self:
-        site_scene = site.get_scene(origin=origin, legend=legend)
+    for idx, site in enumerate(self):
+        site_scene = site.get_scene(
+            origin=origin, legend=legend, site_idx=idx, lazy_tooltips=lazy_tooltips
+        )
 
         for scene in site_scene.contents:
             primitives[scene.name] += scene.contents
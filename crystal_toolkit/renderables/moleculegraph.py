@@ -1,15 +1,217 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING
 
+import numpy as np
 from pymatgen.analysis.graphs import MoleculeGraph
 from pymatgen.analysis.local_env import OpenBabelNN
 
+from crystal_toolkit.core.fingerprint import get_fingerprint
 from crystal_toolkit.core.legend import Legend
-from crystal_toolkit.core.scene import Scene
+from crystal_toolkit.core.scene import Cylinders, Scene
+from crystal_toolkit.renderables.site import (
+    _get_atom_primitives,
+    _get_bond_meta,
+    _get_polyhedron,
+)
+from crystal_toolkit.settings import SETTINGS
+
+if TYPE_CHECKING:
+    from pymatgen.analysis.local_env import NearNeighbors
+    from pymatgen.core import Molecule
 
 # TODO: fix Sam's bug (reorder)
 
+# graphs derived from a molecule with another bonding strategy, e.g. to visualize bond
+# orders, keyed by the fingerprint of the molecule and the strategy, least recently used last
+_DERIVED_GRAPHS: OrderedDict[tuple[str, str], MoleculeGraph] = OrderedDict()
+_DERIVED_GRAPHS_LOCK = threading.Lock()
+
+
+def _get_derived_graph(
+    molecule: Molecule, strategy: NearNeighbors | None = None
+) -> MoleculeGraph:
+    """Get the MoleculeGraph of a molecule with a bonding strategy, which is only computed
+    once for the same molecule and strategy, up to SETTINGS.MOLECULE_GRAPH_CACHE_SIZE
+    graphs. The returned graph is shared and should not be modified.
+
+    Args:
+        molecule (Molecule): The molecule.
+        strategy (NearNeighbors, optional): The bonding strategy. Defaults to OpenBabelNN,
+            which gives integral bond orders as edge weights.
+
+    Returns:
+        MoleculeGraph: The graph of the molecule.
+    """
+    strategy = strategy or OpenBabelNN()
+    key = (
+        get_fingerprint(molecule),
+        f"{type(strategy).__name__}{sorted(vars(strategy).items())}",
+    )
+    with _DERIVED_GRAPHS_LOCK:
+        if (graph := _DERIVED_GRAPHS.get(key)) is not None:
+            _DERIVED_GRAPHS.move_to_end(key)
+            return graph
+
+    graph = MoleculeGraph.with_local_env_strategy(molecule, strategy)
+    with _DERIVED_GRAPHS_LOCK:
+        if SETTINGS.MOLECULE_GRAPH_CACHE_SIZE > 0:
+            _DERIVED_GRAPHS[key] = graph
+            while len(_DERIVED_GRAPHS) > SETTINGS.MOLECULE_GRAPH_CACHE_SIZE:
+                _DERIVED_GRAPHS.popitem(last=False)
+    return graph
+
+
+def _get_neighbors(self) -> list[list[tuple[int, float | None, float]]]:
+    """Get the neighbors of every site at once. This is equivalent to calling
+    get_connected_sites for every site, but does not construct a Site for every neighbor.
+
+    Returns:
+        list[list[tuple[int, float | None, float]]]: for each site, the (index, weight,
+            dist) of its neighbors sorted by closest first
+    """
+    neighbors: list[set] = [set() for _ in range(len(self.molecule))]
+    for u, v, data in self.graph.edges(data=True):
+        neighbors[u].add((v, data.get("weight")))
+        neighbors[v].add((u, data.get("weight")))
+
+    cart_coords = self.molecule.cart_coords
+    return [
+        sorted(
+            (
+                (
+                    index,
+                    weight,
+                    float(np.linalg.norm(cart_coords[index] - cart_coords[idx])),
+                )
+                for index, weight in site_neighbors
+            ),
+            key=lambda neighbor: neighbor[2],
+        )
+        for idx, site_neighbors in enumerate(neighbors)
+    ]
+
+
+def _get_batched_primitives(
+    self,
+    vis_mol_graph: MoleculeGraph,
+    legend: Legend,
+    explicitly_calculate_polyhedra_hull: bool = False,
+    draw_polyhedra: bool = False,
+    show_atom_idx: bool = True,
+    show_atom_coord: bool = True,
+    show_bond_order: bool = True,
+    show_bond_length: bool = False,
+    visualize_bond_orders: bool = False,
+    edge_weight_name_mapping: dict[str, str] | None = None,
+    lazy_tooltips: bool = False,
+) -> dict[str, list]:
+    """Get the primitives of all sites in a single pass.
+
+    This gives the same scene as calling Site.get_scene for every site and merging
+    the results, but the bonds are collected for the whole molecule and emitted as a
+    single Cylinders per color, radius and tooltip.
+
+    Returns:
+        dict[str, list]: primitives for the "atoms", "bonds", "polyhedra" and "magmoms"
+            sub-scenes
+    """
+    molecule = self.molecule
+    cart_coords = molecule.cart_coords
+    neighbors = vis_mol_graph._get_neighbors()
+    edge_weight_name = (edge_weight_name_mapping or {}).get(
+        vis_mol_graph.edge_weight_name, vis_mol_graph.edge_weight_name
+    )
+    edge_weight_unit = vis_mol_graph.edge_weight_unit
+    species = [site.specie if site.is_ordered else None for site in molecule]
+
+    primitives: dict[str, list] = {
+        "atoms": [],
+        "bonds": [],
+        "polyhedra": [],
+        "magmoms": [],
+    }
+    # (color, radius, tooltip) -> position pairs and _meta of the bonds
+    bonds: dict[tuple[str, float, str | None], list] = defaultdict(list)
+
+    for idx, site in enumerate(molecule):
+        position = cart_coords[idx].tolist()
+        max_radius = float(min(legend.get_radius(sp, site=site) for sp in site.species))
+        atoms, magmoms, site_color = _get_atom_primitives(
+            site,
+            position,
+            legend,
+            max_radius,
+            site_idx=idx,
+            show_atom_idx=show_atom_idx,
+            show_atom_coord=show_atom_coord,
+            lazy_tooltips=lazy_tooltips,
+        )
+        primitives["atoms"] += atoms
+        primitives["magmoms"] += magmoms
+
+        if not neighbors[idx]:
+            continue
+
+        # as in Site.get_scene, a bond without weight reuses the previous tooltip
+        name_cyl = " "
+        for index, weight, dist in neighbors[idx]:
+            if show_bond_order and weight is not None:
+                name_cyl = f"{edge_weight_name}:{weight:.2f}"
+                if edge_weight_unit:
+                    name_cyl += f" ({edge_weight_unit})"
+            if show_bond_length:
+                name_cyl += f"\nbond length:{dist:.3f}"
+
+            tooltip = None if lazy_tooltips else name_cyl
+            meta = _get_bond_meta(idx, index, lazy_tooltips=lazy_tooltips)
+            midpoint = (cart_coords[idx] + cart_coords[index]) / 2
+            if not visualize_bond_orders:
+                bonds[site_color, 0.1, tooltip].append(([position, midpoint], meta))
+            elif weight is not None and weight > 1:
+                for bond in range(weight):
+                    offset = bond * 0.25 * max_radius
+                    bonds[site_color, 0.05, tooltip].append(
+                        ([np.add(position, offset), midpoint + offset], meta)
+                    )
+            elif weight is not None:
+                bonds[site_color, 0.1, tooltip].append(([position, midpoint], meta))
+
+        # as in Site.get_scene, polyhedra are drawn around the most electronegative site
+        if (
+            draw_polyhedra
+            and len(neighbors[idx]) > 3
+            and species[idx] is not None
+            and not any(
+                species[index] is None
+                or species[index] < species[idx]
+                or species[index] == species[idx]
+                for index, _, _ in neighbors[idx]
+            )
+        ):
+            primitives["polyhedra"] += _get_polyhedron(
+                [position]
+                + [cart_coords[index].tolist() for index, _, _ in neighbors[idx]],
+                site_color,
+                explicitly_calculate_polyhedra_hull,
+            )
+
+    for (color, radius, tooltip), color_bonds in bonds.items():
+        primitives["bonds"].append(
+            Cylinders(
+                positionPairs=np.array([pair for pair, _ in color_bonds], dtype=float),
+                color=color,
+                radius=radius,
+                clickable=True,
+                tooltip=tooltip,
+                _meta=[meta for _, meta in color_bonds],
+            )
+        )
+
+    return primitives
+
 
 def get_molecule_graph_scene(
     self,
@@ -23,6 +225,8 @@ def get_molecule_graph_scene(
     show_bond_length=False,
     visualize_bond_orders=False,
     edge_weight_name_mapping: dict[str, str] | None = None,
+    lazy_tooltips: bool = False,
+    batched: bool = True,
 ) -> Scene:
     """Create a Molecule Graph scene.
 
@@ -33,16 +237,18 @@ def get_molecule_graph_scene(
             environment strategy
         show_bond_length: Defaults to False, shows the calculated length between two connected atoms
         visualize_bpnd_orders: Defaults False, will show the 'integral' number of bonds calculated
-            from the OpenBabelNN strategy in the Molecule Graph
+            from the OpenBabelNN strategy in the Molecule Graph, which is cached for the molecule
         edge_weight_name_mapping: A custom mapping from the edge weight name in the MoleculeGraph, which will be shown in the tooltip if show_bond_order is True. If None, defaults to {"weight": "bond order"}.
+        lazy_tooltips: Defaults to False, if True atoms and bonds only carry the indices of
+            their sites instead of tooltip text, see get_site_tooltips
+        batched: Defaults to True, creates the primitives for all sites at once rather than
+            calling Site.get_scene for every site, which is much faster for large molecules
 
     Returns:
         A Molecule Graph scene.
     """
     if visualize_bond_orders:
-        vis_mol_graph = MoleculeGraph.with_local_env_strategy(
-            self.molecule, OpenBabelNN()
-        )
+        vis_mol_graph = _get_derived_graph(self.molecule, OpenBabelNN())
     else:
         vis_mol_graph = self
     legend = legend or Legend(self.molecule)
@@ -52,27 +258,45 @@ def get_molecule_graph_scene(
     if edge_weight_name_mapping is None:
         edge_weight_name_mapping = {"weight": "bond order"}
 
-    for idx, site in enumerate(self.molecule):
-        connected_sites = vis_mol_graph.get_connected_sites(idx)
-
-        site_scene = site.get_scene(
-            site_idx=idx,
-            connected_sites=connected_sites,
-            origin=origin,
-            explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
-            legend=legend,
-            show_atom_idx=show_atom_idx,
-            show_atom_coord=show_atom_coord,
-            show_bond_order=show_bond_order,
-            show_bond_length=show_bond_length,
-            visualize_bond_orders=visualize_bond_orders,
-            draw_polyhedra=draw_polyhedra,
-            edge_weight_name=vis_mol_graph.edge_weight_name,
-            edge_weight_unit=vis_mol_graph.edge_weight_unit,
-            edge_weight_name_mapping=edge_weight_name_mapping,
+    if batched:
+        primitives.update(
+            self._get_batched_primitives(
+                vis_mol_graph,
+                legend,
+                explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
+                draw_polyhedra=draw_polyhedra,
+                show_atom_idx=show_atom_idx,
+                show_atom_coord=show_atom_coord,
+                show_bond_order=show_bond_order,
+                show_bond_length=show_bond_length,
+                visualize_bond_orders=visualize_bond_orders,
+                edge_weight_name_mapping=edge_weight_name_mapping,
+                lazy_tooltips=lazy_tooltips,
+            )
         )
-        for scene in site_scene.contents:
-            primitives[scene.name] += scene.contents
+    else:
+        for idx, site in enumerate(self.molecule):
+            connected_sites = vis_mol_graph.get_connected_sites(idx)
+
+            site_scene = site.get_scene(
+                site_idx=idx,
+                connected_sites=connected_sites,
+                origin=origin,
+                explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
+                legend=legend,
+                show_atom_idx=show_atom_idx,
+                show_atom_coord=show_atom_coord,
+                show_bond_order=show_bond_order,
+                show_bond_length=show_bond_length,
+                visualize_bond_orders=visualize_bond_orders,
+                draw_polyhedra=draw_polyhedra,
+                edge_weight_name=vis_mol_graph.edge_weight_name,
+                edge_weight_unit=vis_mol_graph.edge_weight_unit,
+                edge_weight_name_mapping=edge_weight_name_mapping,
+                lazy_tooltips=lazy_tooltips,
+            )
+            for scene in site_scene.contents:
+                primitives[scene.name] += scene.contents
 
     return Scene(
         name=self.molecule.composition.reduced_formula,
@@ -81,4 +305,6 @@ def get_molecule_graph_scene(
     )
 
 
+MoleculeGraph._get_neighbors = _get_neighbors
+MoleculeGraph._get_batched_primitives = _get_batched_primitives
 MoleculeGraph.get_scene = get_molecule_graph_scene
@@ -15,6 +15,7 @@ from crystal_toolkit.core.scene import (
     Convex,
     Cubes,
     Cylinders,
+    Primitive,
     Scene,
     Spheres,
     Surface,
@@ -22,95 +23,124 @@ from crystal_toolkit.core.scene import (
 
 if TYPE_CHECKING:
     from pymatgen.analysis.graphs import ConnectedSite
+    from pymatgen.core import Element, Species
+    from pymatgen.core.structure import SiteCollection
 
 
-def get_site_scene(
-    self,
-    connected_sites: list[ConnectedSite] | None = None,
-    # connected_site_metadata: None,
-    # connected_sites_to_draw,
-    connected_sites_not_drawn: list[ConnectedSite] | None = None,
-    hide_incomplete_edges: bool = False,
+def _get_site_tooltip(
+    site: Site,
+    sp: Species | Element | None = None,
+    position: list[float] | None = None,
     site_idx: int | None = 0,
-    incomplete_edge_length_scale: float | None = 1.0,
-    connected_sites_colors: list[str] | None = None,
-    connected_sites_not_drawn_colors: list[str] | None = None,
-    origin: Sequence[float] | None = None,
-    draw_polyhedra: bool = True,
-    explicitly_calculate_polyhedra_hull: bool = False,
-    bond_radius: float = 0.1,
-    draw_magmoms: bool = True,
     show_atom_idx: bool = False,
     show_atom_coord: bool = True,
-    show_bond_order: bool = True,
-    show_bond_length: bool = False,
-    visualize_bond_orders: bool = False,
-    magmom_scale: float = 1.0,
-    legend: Legend | None = None,
-    retain_atom_idx: bool = False,
-    total_repeat_cell_cnt: int = 1,
-    edge_weight_name_mapping: dict[str, str] | None = None,
-    edge_weight_name: str = "bond order",
-    edge_weight_unit: str = "",
-) -> Scene:
-    """Get a Scene object for a Site.
+) -> str:
+    """Get the tooltip text of a species on a site, or of all species on the site if sp is
+    None. See get_site_scene for a description of the arguments.
+    """
+    if sp is None:
+        return ", ".join(
+            _get_site_tooltip(
+                site, sp, position, site_idx, show_atom_idx, show_atom_coord
+            )
+            for sp in site.species
+        )
+
+    occu = site.species[sp]
+    position = site.coords if position is None else position
+
+    name = str(sp)
+    if occu != 1.0:
+        name += f" ({occu}% occupancy)"
+
+    if show_atom_coord:
+        name += f" ({position[0]:.3f}, {position[1]:.3f}, {position[2]:.3f})"
+
+    if show_atom_idx:
+        name += f"\nindex:{site_idx}"
+
+    if site.properties:
+        for key, val in site.properties.items():
+            name += f" ({key} = {val})"
+
+    return name
+
+
+def get_site_tooltips(
+    site_collection: SiteCollection,
+    site_indices: Sequence[int] | None = None,
+    show_atom_idx: bool = True,
+    show_atom_coord: bool = True,
+) -> list[str]:
+    """Get the tooltip text of sites in a scene created with lazy_tooltips=True, where
+    primitives only carry the indices of their sites in their _meta (as "atom_idx").
+
+    Coordinates are those of the site in the site collection, not of the periodic image
+    that may have been drawn.
 
     Args:
-        connected_sites (list[ConnectedSite], optional): Defaults to None.
-        connected_sites_not_drawn (list[ConnectedSite], optional): Defaults to None.
-        hide_incomplete_edges (bool, optional): Defaults to False.
-        site_idx (int | None, optional): Defaults to 0.
-        incomplete_edge_length_scale (float | None, optional): Defaults to 1.0.
-        connected_sites_colors (list[str] | None, optional): Defaults to None.
-        connected_sites_not_drawn_colors (list[str] | None, optional): Defaults to None.
-        origin (Sequence[float] | None, optional): Defaults to None.
-        draw_polyhedra (bool, optional): Defaults to True.
-        explicitly_calculate_polyhedra_hull (bool, optional): Defaults to False.
-        bond_radius (float, optional): Defaults to 0.1.
-        draw_magmoms (bool, optional): Defaults to True.
-        show_atom_idx (bool, optional): Defaults to False.
+        site_collection (SiteCollection): the Structure or Molecule of the scene.
+        site_indices (Sequence[int] | None, optional): indices of the sites to get the
+            tooltips of. Defaults to None, for all sites.
+        show_atom_idx (bool, optional): Defaults to True.
         show_atom_coord (bool, optional): Defaults to True.
-        show_bond_order (bool, optional): Defaults to True.
-        show_bond_length (bool, optional): Defaults to False.
-        visualize_bond_orders (bool, optional): Defaults to False.
-        magmom_scale (float, optional): Defaults to 1.0.
-        legend (Legend | None, optional): Defaults to None.
-        retain_atom_idx (bool, optional): Defaults to False.
-        total_repeat_cell_cnt (int, optional): Defaults to 1.
-        edge_weight_name_mapping (dict[str, str] | None, optional): Mapping of ConnectedSite attribute names to display names for edge weights. If None, defaults to {"weight": "bond order"}.
-        edge_weight_name (str, optional): Defaults to "bond order".
-        edge_weight_unit (str, optional): Defaults to "".
 
     Returns:
-        Scene: The scene object containing atoms, bonds, polyhedra, magmoms.
+        list[str]: tooltip text of each site
     """
-    atoms = []
-    bonds = []
-    polyhedron = []
-    magmoms = []
+    if site_indices is None:
+        site_indices = range(len(site_collection))
+    return [
+        _get_site_tooltip(
+            site_collection[idx],
+            site_idx=idx,
+            show_atom_idx=show_atom_idx,
+            show_atom_coord=show_atom_coord,
+        )
+        for idx in site_indices
+    ]
 
-    legend = legend or Legend(self)
 
+def _get_atom_primitives(
+    site: Site,
+    position: list[float],
+    legend: Legend,
+    max_radius: float,
+    site_idx: int | None = 0,
+    show_atom_idx: bool = False,
+    show_atom_coord: bool = True,
+    draw_magmoms: bool = True,
+    magmom_scale: float = 1.0,
+    retain_atom_idx: bool = False,
+    total_repeat_cell_cnt: int = 1,
+    lazy_tooltips: bool = False,
+) -> tuple[list[Primitive], list[Arrows], str | None]:
+    """Get the primitives for the atoms and magnetic moment of a site. See get_site_scene
+    for a description of the arguments.
+
+    Returns:
+        tuple[list[Primitive], list[Arrows], str | None]: atoms (Spheres or Cubes), magmoms
+            and the color of the last species, used for bonds and polyhedra
+    """
     # for disordered structures
-    is_ordered = self.is_ordered
+    is_ordered = site.is_ordered
     phiStart, phiEnd = None, None
     occu_start = 0.0
 
-    position = self.coords.tolist()
-
-    radii = [legend.get_radius(sp, site=self) for sp in self.species]
-    max_radius = float(min(radii))
+    atoms: list[Primitive] = []
+    magmoms: list[Arrows] = []
+    color = None
 
-    for sp, occu in self.species.items():
+    for sp, occu in site.species.items():
         if isinstance(sp, DummySpecie):
             cube = Cubes(
-                positions=[position], color=legend.get_color(sp, site=self), width=0.4
+                positions=[position], color=legend.get_color(sp, site=site), width=0.4
             )
             atoms.append(cube)
 
         else:
-            color = legend.get_color(sp, site=self)
-            radius = legend.get_radius(sp, site=self)
+            color = legend.get_color(sp, site=site)
+            radius = legend.get_radius(sp, site=site)
 
             # TODO: make optional/default to None
             # in disordered structures, we fractionally color-code spheres,
@@ -123,19 +153,27 @@ def get_site_scene(
                 phiStart = phi_frac_start * np.pi * 2
                 phiEnd = phi_frac_end * np.pi * 2
 
-            name = str(sp)
-            if occu != 1.0:
-                name += f" ({occu}% occupancy)"
-
-            if show_atom_coord:
-                name += f" ({position[0]:.3f}, {position[1]:.3f}, {position[2]:.3f})"
-
-            if show_atom_idx:
-                name += f"\nindex:{site_idx}"
+            # with lazy tooltips, the tooltip is resolved from the site index on
+            # demand, see get_site_tooltips, so that spheres can merge by appearance
+            name = (
+                None
+                if lazy_tooltips
+                else _get_site_tooltip(
+                    site, sp, position, site_idx, show_atom_idx, show_atom_coord
+                )
+            )
 
-            if self.properties:
-                for key, val in self.properties.items():
-                    name += f" ({key} = {val})"
+            if retain_atom_idx:
+                meta = [
+                    {
+                        "unit_cell_atom_idx": [site_idx // total_repeat_cell_cnt],
+                        "atom_idx": [site_idx],
+                    }
+                ]
+            elif lazy_tooltips:
+                meta = [{"atom_idx": [site_idx]}]
+            else:
+                meta = None
 
             sphere = Spheres(
                 positions=[position],
@@ -145,20 +183,13 @@ def get_site_scene(
                 phiEnd=phiEnd,
                 clickable=True,
                 tooltip=name,
-                _meta=[
-                    {
-                        "unit_cell_atom_idx": [site_idx // total_repeat_cell_cnt],
-                        "atom_idx": [site_idx],
-                    }
-                ]
-                if retain_atom_idx
-                else None,
+                _meta=meta,
                 # _meta=[site_idx // total_repeat_cell_cnt] if retain_atom_idx else None,
             )
             atoms.append(sphere)
 
         # Add magmoms
-        if draw_magmoms and (magmom := self.properties.get("magmom")):
+        if draw_magmoms and (magmom := site.properties.get("magmom")):
             # enforce type
             magmom = np.array(Magmom(magmom).get_moment())
             magmom = 2 * magmom_scale * max_radius * magmom
@@ -186,6 +217,161 @@ def get_site_scene(
         )
         atoms.append(sphere)
 
+    return atoms, magmoms, color
+
+
+def _get_bond_meta(
+    site_idx: int,
+    connected_idx: int,
+    retain_atom_idx: bool = False,
+    lazy_tooltips: bool = False,
+    total_repeat_cell_cnt: int = 1,
+) -> dict[str, list[int]] | None:
+    """Get the _meta of a bond, which carries the indices of the sites it connects if
+    retain_atom_idx or lazy_tooltips. See get_site_scene for a description of the arguments.
+    """
+    if retain_atom_idx:
+        return {
+            "unit_cell_atom_idx": [
+                site_idx // total_repeat_cell_cnt,
+                connected_idx // total_repeat_cell_cnt,
+            ],
+            "atom_idx": [site_idx, connected_idx],
+        }
+    if lazy_tooltips:
+        return {"atom_idx": [site_idx, connected_idx]}
+    return None
+
+
+def _get_polyhedron(
+    all_positions: list[list[float]],
+    color: str,
+    explicitly_calculate_polyhedra_hull: bool = False,
+    hull_triangles: np.ndarray | None = None,
+) -> list[Primitive]:
+    """Get the polyhedron spanned by a site and its connected sites.
+
+    Args:
+        all_positions (list[list[float]]): position of the site followed by the
+            positions of its connected sites
+        color (str): color of the polyhedron
+        explicitly_calculate_polyhedra_hull (bool, optional): Defaults to False.
+        hull_triangles (np.ndarray | None, optional): vertex indices of the triangles of
+            the hull, if already known. Defaults to None, to calculate the hull.
+
+    Returns:
+        list[Primitive]: a Surface if explicitly_calculate_polyhedra_hull, else a Convex
+    """
+    if explicitly_calculate_polyhedra_hull and hull_triangles is not None:
+        vertices_indices = hull_triangles
+    elif explicitly_calculate_polyhedra_hull:
+        try:
+            # all_positions = [[0, 0, 0], [0, 0, 10], [0, 10, 0], [10, 0, 0]]
+            # gives...
+            # .convex_hull = [[2, 3, 0], [1, 3, 0], [1, 2, 0], [1, 2, 3]]
+            # .vertex_neighbor_vertices = [1, 2, 3, 2, 3, 0, 1, 3, 0, 1, 2, 0]
+
+            vertices_indices = Delaunay(all_positions).convex_hull
+        except Exception:
+            vertices_indices = []
+
+    if explicitly_calculate_polyhedra_hull:
+        vertices = [all_positions[idx] for idx in chain.from_iterable(vertices_indices)]
+
+        return [Surface(positions=vertices, color=color)]
+
+    return [Convex(positions=all_positions, color=color)]
+
+
+def get_site_scene(
+    self,
+    connected_sites: list[ConnectedSite] | None = None,
+    # connected_site_metadata: None,
+    # connected_sites_to_draw,
+    connected_sites_not_drawn: list[ConnectedSite] | None = None,
+    hide_incomplete_edges: bool = False,
+    site_idx: int | None = 0,
+    incomplete_edge_length_scale: float | None = 1.0,
+    connected_sites_colors: list[str] | None = None,
+    connected_sites_not_drawn_colors: list[str] | None = None,
+    origin: Sequence[float] | None = None,
+    draw_polyhedra: bool = True,
+    explicitly_calculate_polyhedra_hull: bool = False,
+    bond_radius: float = 0.1,
+    draw_magmoms: bool = True,
+    show_atom_idx: bool = False,
+    show_atom_coord: bool = True,
+    show_bond_order: bool = True,
+    show_bond_length: bool = False,
+    visualize_bond_orders: bool = False,
+    magmom_scale: float = 1.0,
+    legend: Legend | None = None,
+    retain_atom_idx: bool = False,
+    total_repeat_cell_cnt: int = 1,
+    edge_weight_name_mapping: dict[str, str] | None = None,
+    edge_weight_name: str = "bond order",
+    edge_weight_unit: str = "",
+    lazy_tooltips: bool = False,
+) -> Scene:
+    """Get a Scene object for a Site.
+
+    Args:
+        connected_sites (list[ConnectedSite], optional): Defaults to None.
+        connected_sites_not_drawn (list[ConnectedSite], optional): Defaults to None.
+        hide_incomplete_edges (bool, optional): Defaults to False.
+        site_idx (int | None, optional): Defaults to 0.
+        incomplete_edge_length_scale (float | None, optional): Defaults to 1.0.
+        connected_sites_colors (list[str] | None, optional): Defaults to None.
+        connected_sites_not_drawn_colors (list[str] | None, optional): Defaults to None.
+        origin (Sequence[float] | None, optional): Defaults to None.
+        draw_polyhedra (bool, optional): Defaults to True.
+        explicitly_calculate_polyhedra_hull (bool, optional): Defaults to False.
+        bond_radius (float, optional): Defaults to 0.1.
+        draw_magmoms (bool, optional): Defaults to True.
+        show_atom_idx (bool, optional): Defaults to False.
+        show_atom_coord (bool, optional): Defaults to True.
+        show_bond_order (bool, optional): Defaults to True.
+        show_bond_length (bool, optional): Defaults to False.
+        visualize_bond_orders (bool, optional): Defaults to False.
+        magmom_scale (float, optional): Defaults to 1.0.
+        legend (Legend | None, optional): Defaults to None.
+        retain_atom_idx (bool, optional): Defaults to False.
+        total_repeat_cell_cnt (int, optional): Defaults to 1.
+        edge_weight_name_mapping (dict[str, str] | None, optional): Mapping of ConnectedSite attribute names to display names for edge weights. If None, defaults to {"weight": "bond order"}.
+        edge_weight_name (str, optional): Defaults to "bond order".
+        edge_weight_unit (str, optional): Defaults to "".
+        lazy_tooltips (bool, optional): If True, atoms and bonds have no tooltip text and
+            only carry the indices of their sites in their _meta, so that the tooltip text
+            can be resolved on demand with get_site_tooltips. Defaults to False.
+
+    Returns:
+        Scene: The scene object containing atoms, bonds, polyhedra, magmoms.
+    """
+    bonds = []
+    polyhedron = []
+
+    legend = legend or Legend(self)
+
+    position = self.coords.tolist()
+
+    radii = [legend.get_radius(sp, site=self) for sp in self.species]
+    max_radius = float(min(radii))
+
+    atoms, magmoms, color = _get_atom_primitives(
+        self,
+        position,
+        legend,
+        max_radius,
+        site_idx=site_idx,
+        show_atom_idx=show_atom_idx,
+        show_atom_coord=show_atom_coord,
+        draw_magmoms=draw_magmoms,
+        magmom_scale=magmom_scale,
+        retain_atom_idx=retain_atom_idx,
+        total_repeat_cell_cnt=total_repeat_cell_cnt,
+        lazy_tooltips=lazy_tooltips,
+    )
+
     if connected_sites:
         # TODO: more graceful solution here
         # if ambiguous (disordered), reuse last color used
@@ -213,6 +399,13 @@ def get_site_scene(
 
             connected_position = connected_site.site.coords
             bond_midpoint = np.add(position, connected_position) / 2
+            bond_meta = _get_bond_meta(
+                site_idx,
+                connected_site.index,
+                retain_atom_idx,
+                lazy_tooltips,
+                total_repeat_cell_cnt,
+            )
 
             color = (
                 connected_sites_colors[idx] if connected_sites_colors else site_color
@@ -233,20 +426,11 @@ def get_site_scene(
                                     color=color,
                                     radius=bond_radius / 2,
                                     clickable=True,
-                                    tooltip=name_cyl,
+                                    tooltip=None if lazy_tooltips else name_cyl,
                                     # _meta=[site_idx // total_repeat_cell_cnt, connected_site.index // total_repeat_cell_cnt]
                                     # if retain_atom_idx
                                     # else None,
-                                    _meta={
-                                        "unit_cell_atom_idx": [
-                                            site_idx // total_repeat_cell_cnt,
-                                            connected_site.index
-                                            // total_repeat_cell_cnt,
-                                        ],
-                                        "atom_idx": [site_idx, connected_site.index],
-                                    }
-                                    if retain_atom_idx
-                                    else None,
+                                    _meta=bond_meta,
                                 )
                             )
                             trans_vector = trans_vector + 0.25 * max_radius
@@ -257,19 +441,11 @@ def get_site_scene(
                             color=color,
                             radius=bond_radius,
                             clickable=True,
-                            tooltip=name_cyl,
+                            tooltip=None if lazy_tooltips else name_cyl,
                             # _meta=[site_idx // total_repeat_cell_cnt, connected_site.index // total_repeat_cell_cnt]
                             # if retain_atom_idx
                             # else None,
-                            _meta={
-                                "unit_cell_atom_idx": [
-                                    site_idx // total_repeat_cell_cnt,
-                                    connected_site.index // total_repeat_cell_cnt,
-                                ],
-                                "atom_idx": [site_idx, connected_site.index],
-                            }
-                            if retain_atom_idx
-                            else None,
+                            _meta=bond_meta,
                         )
                         bonds.append(cylinder)
 
@@ -279,17 +455,9 @@ def get_site_scene(
                     color=color,
                     radius=bond_radius,
                     clickable=True,
-                    tooltip=name_cyl,
+                    tooltip=None if lazy_tooltips else name_cyl,
                     # _meta=[site_idx // total_repeat_cell_cnt, connected_site.index // total_repeat_cell_cnt] if retain_atom_idx else None,
-                    _meta={
-                        "unit_cell_atom_idx": [
-                            site_idx // total_repeat_cell_cnt,
-                            connected_site.index // total_repeat_cell_cnt,
-                        ],
-                        "atom_idx": [site_idx, connected_site.index],
-                    }
-                    if retain_atom_idx
-                    else None,
+                    _meta=bond_meta,
                 )
                 bonds.append(cylinder)
             all_positions.append(connected_position.tolist())
@@ -308,21 +476,20 @@ def get_site_scene(
                     if connected_sites_not_drawn_colors
                     else site_color
                 )
+                bond_meta = _get_bond_meta(
+                    site_idx,
+                    connected_site.index,
+                    retain_atom_idx,
+                    lazy_tooltips,
+                    total_repeat_cell_cnt,
+                )
 
                 cylinder = Cylinders(
                     positionPairs=[[position, bond_midpoint.tolist()]],
                     color=color,
                     radius=bond_radius,
                     # _meta=[site_idx // total_repeat_cell_cnt, connected_site.index // total_repeat_cell_cnt] if retain_atom_idx else None,
-                    _meta={
-                        "unit_cell_atom_idx": [
-                            site_idx // total_repeat_cell_cnt,
-                            connected_site.index // total_repeat_cell_cnt,
-                        ],
-                        "atom_idx": [site_idx, connected_site.index],
-                    }
-                    if retain_atom_idx
-                    else None,
+                    _meta=bond_meta,
                 )
                 bonds.append(cylinder)
                 all_positions.append(connected_position.tolist())
@@ -341,25 +508,9 @@ def get_site_scene(
             and not connected_sites_not_drawn
             and not any(not_most_electro_negative)
         ):
-            if explicitly_calculate_polyhedra_hull:
-                try:
-                    # all_positions = [[0, 0, 0], [0, 0, 10], [0, 10, 0], [10, 0, 0]]
-                    # gives...
-                    # .convex_hull = [[2, 3, 0], [1, 3, 0], [1, 2, 0], [1, 2, 3]]
-                    # .vertex_neighbor_vertices = [1, 2, 3, 2, 3, 0, 1, 3, 0, 1, 2, 0]
-
-                    vertices_indices = Delaunay(all_positions).convex_hull
-                except Exception:
-                    vertices_indices = []
-
-                vertices = [
-                    all_positions[idx] for idx in chain.from_iterable(vertices_indices)
-                ]
-
-                polyhedron = [Surface(positions=vertices, color=site_color)]
-
-            else:
-                polyhedron = [Convex(positions=all_positions, color=site_color)]
+            polyhedron = _get_polyhedron(
+                all_positions, site_color, explicitly_calculate_polyhedra_hull
+            )
 
     return Scene(
         self.species_string,
@@ -10,48 +10,61 @@ from pymatgen.core import PeriodicSite, Structure
 from crystal_toolkit.core.legend import Legend
 from crystal_toolkit.core.scene import Scene
 
+# subsets of the lattice directions, in the order given by itertools.combinations
+_DIRECTION_SUBSETS = np.array(
+    [
+        [direction in subset for direction in range(3)]
+        for length in range(1, 4)
+        for subset in combinations(range(3), length)
+    ]
+)
+# image vectors for sites at fractional coordinate 0 (first 7) or 1 (last 7)
+_IMAGE_VECTORS = np.concatenate([_DIRECTION_SUBSETS, -1 * _DIRECTION_SUBSETS])
+
+
+def _get_image_sites(
+    frac_coords: np.ndarray, tol: float = 0.05
+) -> list[tuple[int, tuple[int, int, int]]]:
+    """Find the periodic images of sites lying on the boundary of the unit cell.
+
+    A site with fractional coordinates close to 0 along some lattice directions gets
+    an image translated by +1 along every non-empty subset of those directions, and
+    similarly by -1 for fractional coordinates close to 1.
 
-def _get_sites_to_draw(self, draw_image_atoms=True):
+    Args:
+        frac_coords (np.ndarray): (N, 3) fractional coordinates of the sites
+        tol (float): absolute tolerance for a fractional coordinate to be considered
+            on the boundary. Defaults to 0.05.
+
+    Returns:
+        list[tuple[int, tuple[int, int, int]]]: site indices and image vectors, ordered
+            by site index
+    """
+    frac_coords = np.reshape(frac_coords, (-1, 3))
+    near_zero = np.isclose(frac_coords, 0, atol=tol)
+    near_one = np.isclose(frac_coords, 1, atol=tol)
+    # (N, 14) mask of which image vectors each site needs
+    needs_image = np.concatenate(
+        [
+            (near_zero[:, None, :] | ~_DIRECTION_SUBSETS).all(axis=-1),
+            (near_one[:, None, :] | ~_DIRECTION_SUBSETS).all(axis=-1),
+        ],
+        axis=1,
+    )
+    site_indices, image_indices = np.nonzero(needs_image)
+    return list(
+        zip(site_indices.tolist(), map(tuple, _IMAGE_VECTORS[image_indices].tolist()))
+    )
+
+
+def _get_sites_to_draw(self, draw_image_atoms=True, tol=0.05):
     """Returns a list of site indices and image vectors."""
     sites_to_draw = [(idx, (0, 0, 0)) for idx in range(len(self))]
 
     if not draw_image_atoms:  # return early if we don't need to search for image atoms
         return set(sites_to_draw)
 
-    for idx, site in enumerate(self):
-        zero_elements = [
-            idx
-            for idx, frac_coord in enumerate(site.frac_coords)
-            if np.allclose(frac_coord, 0, atol=0.05)
-        ]
-
-        coord_permutations = [
-            x
-            for tmp_ in range(1, len(zero_elements) + 1)
-            for x in combinations(zero_elements, tmp_)
-        ]
-
-        sites_to_draw += [
-            (idx, (int(0 in perm), int(1 in perm), int(2 in perm)))
-            for perm in coord_permutations
-        ]
-
-        one_elements = [
-            idx
-            for idx, f in enumerate(site.frac_coords)
-            if np.allclose(f, 1, atol=0.05)
-        ]
-
-        coord_permutations = [
-            x
-            for tmp_ in range(1, len(one_elements) + 1)
-            for x in combinations(one_elements, tmp_)
-        ]
-
-        sites_to_draw += [
-            (idx, (-int(0 in perm), -int(1 in perm), -int(2 in perm)))
-            for perm in coord_permutations
-        ]
+    sites_to_draw += _get_image_sites(self.frac_coords, tol=tol)
 
     return set(sites_to_draw)
 
@@ -61,6 +74,7 @@ def get_structure_scene(
     origin: Sequence[float] | None = None,
     legend: Legend | None = None,
     draw_image_atoms: bool = True,
+    lazy_tooltips: bool = False,
 ) -> Scene:
     """Create CTK objects for the lattice and sties
     Args:
@@ -69,6 +83,8 @@ def get_structure_scene(
         legend: Legend for the sites
         draw_image_atoms: If true draw image atoms that are just outside the
         periodic boundary.
+        lazy_tooltips: If true atoms only carry their site index instead of
+        tooltip text, see get_site_tooltips.
 
     Returns:
         CTK scene object to be rendered
@@ -90,7 +106,9 @@ def get_structure_scene(
                 site.lattice,
                 properties=site.properties,
             )
-        site_scene = site.get_scene(legend=legend)
+        site_scene = site.get_scene(
+            legend=legend, site_idx=idx, lazy_tooltips=lazy_tooltips
+        )
         for scene in site_scene.contents:
             primitives[scene.name] += scene.contents
 
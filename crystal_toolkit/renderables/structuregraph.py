@@ -1,68 +1,87 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from itertools import combinations
 from typing import Sequence
 
 import numpy as np
 from matplotlib.pyplot import get_cmap
 from pymatgen.analysis.graphs import StructureGraph
 from pymatgen.core import PeriodicSite
+from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
+from scipy.spatial import Delaunay
 
 from crystal_toolkit.core.legend import Legend
-from crystal_toolkit.core.scene import Scene
+from crystal_toolkit.core.scene import Cylinders, IndexedCylinders, Scene
+from crystal_toolkit.renderables.site import _get_atom_primitives, _get_polyhedron
+from crystal_toolkit.renderables.structure import _get_image_sites
+
+
+def _get_neighbors(
+    self,
+) -> list[list[tuple[int, tuple[int, int, int], float | None, float]]]:
+    """Get the neighbors of every site at once. This is equivalent to calling
+    get_connected_sites for every site, but does not construct a PeriodicSite for
+    every neighbor.
+
+    Returns:
+        list[list[tuple[int, tuple[int, int, int], float | None, float]]]: for each site,
+            the (index, jimage, weight, dist) of its neighbors sorted by closest first,
+            where jimage is relative to the site
+    """
+    neighbors: list[list] = [[] for _ in range(len(self.structure))]
+    edges = list(self.graph.edges(data=True))
+    if not edges:
+        return neighbors
+
+    # edges are undirected for the purpose of finding neighbors
+    from_idx = np.array([u for u, _, _ in edges] + [v for _, v, _ in edges])
+    to_idx = np.array([v for _, v, _ in edges] + [u for u, _, _ in edges])
+    images = np.array([data["to_jimage"] for _, _, data in edges], dtype=int)
+    images = np.concatenate([images, -images])
+    weights = [data.get("weight") for _, _, data in edges] * 2
+
+    cart_coords = self.structure.cart_coords
+    dists = np.linalg.norm(
+        cart_coords[to_idx]
+        + images @ self.structure.lattice.matrix
+        - cart_coords[from_idx],
+        axis=1,
+    )
+
+    seen = set()
+    from_idx, to_idx, images = from_idx.tolist(), to_idx.tolist(), images.tolist()
+    for edge_idx in np.lexsort((dists, from_idx)).tolist():
+        neighbor = (from_idx[edge_idx], to_idx[edge_idx], tuple(images[edge_idx]))
+        if neighbor not in seen:
+            seen.add(neighbor)
+            neighbors[neighbor[0]].append(
+                (neighbor[1], neighbor[2], weights[edge_idx], dists[edge_idx])
+            )
+
+    return neighbors
 
 
 def _get_sites_to_draw(
-    self, draw_image_atoms=True, bonded_sites_outside_unit_cell=False
+    self,
+    draw_image_atoms=True,
+    bonded_sites_outside_unit_cell=False,
+    tol=0.05,
+    neighbors=None,
 ):
     """Returns a list of site indices and image vectors."""
     sites_to_draw = [(idx, (0, 0, 0)) for idx in range(len(self.structure))]
 
     if draw_image_atoms:
-        for idx, site in enumerate(self.structure):
-            zero_elements = [
-                idx
-                for idx, f in enumerate(site.frac_coords)
-                if np.allclose(f, 0, atol=0.05)
-            ]
-
-            coord_permutations = [
-                x
-                for length in range(1, len(zero_elements) + 1)
-                for x in combinations(zero_elements, length)
-            ]
-
-            sites_to_draw += [
-                (idx, (int(0 in perm), int(1 in perm), int(2 in perm)))
-                for perm in coord_permutations
-            ]
-
-            one_elements = [
-                idx
-                for idx, f in enumerate(site.frac_coords)
-                if np.allclose(f, 1, atol=0.05)
-            ]
-
-            coord_permutations = [
-                x
-                for length in range(1, len(one_elements) + 1)
-                for x in combinations(one_elements, length)
-            ]
-            sites_to_draw += [
-                (idx, (-int(0 in perm), -int(1 in perm), -int(2 in perm)))
-                for perm in coord_permutations
-            ]
+        sites_to_draw += _get_image_sites(self.structure.frac_coords, tol=tol)
 
     if bonded_sites_outside_unit_cell:
+        neighbors = neighbors or self._get_neighbors()
         sites_to_append = []
         for n, jimage in sites_to_draw:
-            connected_sites = self.get_connected_sites(n, jimage=jimage)
-            for connected_site in connected_sites:
-                if connected_site.jimage != (0, 0, 0):
-                    sites_to_append.append(  # noqa: PERF401
-                        (connected_site.index, connected_site.jimage)
-                    )
+            for index, image, _, _ in neighbors[n]:
+                to_jimage = tuple(i + j for i, j in zip(image, jimage))
+                if to_jimage != (0, 0, 0):
+                    sites_to_append.append((index, to_jimage))
         sites_to_draw += sites_to_append
 
     # remove any duplicate sites
@@ -72,6 +91,267 @@ def _get_sites_to_draw(
     return set(sites_to_draw)
 
 
+def _get_hull_triangles(
+    self,
+    neighbors: list[list[tuple[int, tuple[int, int, int], float | None, float]]],
+    site_indices: list[int],
+    use_symmetry: bool = False,
+    symprec: float = 0.01,
+) -> dict[int, np.ndarray]:
+    """Get the convex hulls of the polyhedra spanned by sites and all of their neighbors.
+
+    Hulls are computed once per site rather than for every periodic image drawn. With
+    use_symmetry, they are only computed once per symmetry-distinct site, and mapped onto
+    the equivalent sites by matching the rotated neighbors of the distinct site with the
+    neighbors of the equivalent site.
+
+    Args:
+        neighbors: neighbors of every site, as returned by _get_neighbors
+        site_indices: the sites to get the hulls of
+        use_symmetry: whether to only compute the hull of symmetry-distinct sites
+        symprec: tolerance for the symmetry analysis, in Angstrom
+
+    Returns:
+        dict[int, np.ndarray]: for each site, the (n, 3) vertex indices of the triangles
+            of its hull, where 0 is the site itself and i the (i - 1)th neighbor
+    """
+    structure = self.structure
+    frac_coords = structure.frac_coords
+    matrix = structure.lattice.matrix
+
+    def get_neighbor_vectors(idx):
+        return (
+            frac_coords[[index for index, *_ in neighbors[idx]]]
+            + np.reshape([image for _, image, *_ in neighbors[idx]], (-1, 3))
+            - frac_coords[idx]
+        ) @ matrix
+
+    def get_hull(vectors):
+        try:
+            return Delaunay(np.concatenate([[[0, 0, 0]], vectors])).convex_hull
+        except Exception:
+            return np.zeros((0, 3), dtype=int)
+
+    if not use_symmetry:
+        return {idx: get_hull(get_neighbor_vectors(idx)) for idx in site_indices}
+
+    dataset = SpacegroupAnalyzer(structure, symprec=symprec).get_symmetry_dataset()
+    # the distinct rotations of the space group, of which there are far fewer than
+    # symmetry operations for supercells, as Cartesian matrices acting on row vectors
+    rotations = dataset.rotations.reshape(-1, 9)
+    _, unique_idx = np.unique(rotations @ 3 ** np.arange(9), return_index=True)
+    rotations = rotations[unique_idx].reshape(-1, 3, 3)
+    rotations = np.linalg.inv(matrix) @ np.transpose(rotations, (0, 2, 1)) @ matrix
+
+    # symmetry-equivalent sites can still have a different number of neighbors,
+    # e.g. for custom bonding
+    orbits: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for idx in site_indices:
+        orbits[dataset.equivalent_atoms[idx], len(neighbors[idx])].append(idx)
+
+    hulls = {}
+    for (_, n_neighbors), members in orbits.items():
+        hull = get_hull(get_neighbor_vectors(members[0]))
+        rotated = get_neighbor_vectors(members[0]) @ rotations
+        vectors = np.array([get_neighbor_vectors(idx) for idx in members])
+
+        # for every site and rotation, find which neighbor of the site each rotated
+        # neighbor of the first site coincides with, in chunks to bound memory
+        chunk_size = max(1, 2**20 // (len(rotations) * n_neighbors**2))
+        for start in range(0, len(members), chunk_size):
+            dists = np.linalg.norm(
+                rotated[None, :, :, None]
+                - vectors[start : start + chunk_size, None, None],
+                axis=-1,
+            )
+            perms = np.argmin(dists, axis=-1)
+            matches = np.all(np.min(dists, axis=-1) < 2 * symprec, axis=-1) & np.all(
+                np.sort(perms, axis=-1) == np.arange(n_neighbors), axis=-1
+            )
+
+            for idx, site_perms, site_matches in zip(
+                members[start : start + chunk_size], perms, matches
+            ):
+                if site_matches.any():
+                    # map the vertex indices of the first site onto this site
+                    perm = site_perms[np.argmax(site_matches)]
+                    hulls[idx] = np.concatenate([[0], perm + 1])[hull]
+                else:
+                    hulls[idx] = get_hull(get_neighbor_vectors(idx))
+
+    return hulls
+
+
+def _get_batched_primitives(
+    self,
+    sites_to_draw: set[tuple[int, tuple[int, int, int]]],
+    neighbors: list[list[tuple[int, tuple[int, int, int], float | None, float]]],
+    legend: Legend,
+    get_weight_color=None,
+    explicitly_calculate_polyhedra_hull: bool = False,
+    group_by_site_property: str | None = None,
+    bond_radius: float = 0.1,
+    indexed_bonds: bool = False,
+    lazy_tooltips: bool = False,
+    use_symmetry: bool = False,
+) -> dict[str, list]:
+    """Get the primitives of all sites to draw in a single pass.
+
+    This gives the same scene as calling Site.get_scene for every site and merging
+    the results, but the bonds are collected for the whole graph and emitted as a
+    single Cylinders per color and tooltip. With indexed_bonds, these are
+    IndexedCylinders referencing the positions of all sites to draw instead.
+
+    Returns:
+        dict[str, list]: primitives for the "atoms", "bonds", "polyhedra" and "magmoms"
+            sub-scenes
+    """
+    structure = self.structure
+    drawn = list(sites_to_draw)
+    drawn_idx = {site: i for i, site in enumerate(drawn)}
+    coords = structure.lattice.get_cartesian_coords(
+        structure.frac_coords[[idx for idx, _ in drawn]]
+        + np.reshape([jimage for _, jimage in drawn], (-1, 3))
+    )
+
+    # polyhedra are drawn around the most electronegative site, which is only
+    # defined for ordered sites
+    species = [site.specie if site.is_ordered else None for site in structure]
+
+    def has_polyhedron(idx, connected_indices):
+        return (
+            len(connected_indices) > 3
+            and species[idx] is not None
+            and not any(
+                species[index] is None
+                or (species[index] < species[idx])
+                or (species[index] == species[idx])
+                for index in connected_indices
+            )
+        )
+
+    # a site with all of its neighbors drawn has the same polyhedron in every
+    # periodic image, so only decide on and compute the hull of these once
+    has_complete_polyhedron = {
+        idx: has_polyhedron(idx, [index for index, *_ in neighbors[idx]])
+        for idx in {idx for idx, _ in drawn}
+    }
+    hulls = (
+        self._get_hull_triangles(
+            neighbors,
+            [idx for idx, val in has_complete_polyhedron.items() if val],
+            use_symmetry=use_symmetry,
+        )
+        if explicitly_calculate_polyhedra_hull
+        else {}
+    )
+
+    primitives: dict[str, list] = {}
+    atoms: list = []
+    grouped_atoms: dict[str, list] = defaultdict(list)
+    # (color, tooltip) -> list of (site, connected site) indices into drawn
+    bonds: dict[tuple[str, str], list[tuple[int, int]]] = defaultdict(list)
+    polyhedra: list = []
+    magmoms: list = []
+
+    for i, (idx, jimage) in enumerate(drawn):
+        site = structure[idx]
+        position = coords[i].tolist()
+        max_radius = float(min(legend.get_radius(sp, site=site) for sp in site.species))
+        site_atoms, site_magmoms, site_color = _get_atom_primitives(
+            site,
+            position,
+            legend,
+            max_radius,
+            site_idx=idx,
+            show_atom_idx=True,
+            lazy_tooltips=lazy_tooltips,
+        )
+        magmoms += site_magmoms
+
+        if group_by_site_property:
+            group_name = f"{site.properties[group_by_site_property]}"
+            site_atoms[0].tooltip = group_name
+            grouped_atoms[group_name] += site_atoms
+        else:
+            atoms += site_atoms
+
+        connected = []
+        for index, image, weight, _ in neighbors[idx]:
+            to_jimage = tuple(i + j for i, j in zip(image, jimage))
+            if (j := drawn_idx.get((index, to_jimage))) is not None:
+                connected.append((j, index, weight))
+
+        # as in Site.get_scene, a bond without weight reuses the previous tooltip
+        tooltip = None if lazy_tooltips else " "
+        for j, _, weight in connected:
+            if weight is not None and not lazy_tooltips:
+                tooltip = f"bond order:{weight:.2f}"
+            color = get_weight_color(weight) if get_weight_color else site_color
+            bonds[color, tooltip].append((i, j))
+
+        is_complete = len(connected) == len(neighbors[idx])
+        if (
+            has_complete_polyhedron[idx]
+            if is_complete
+            else has_polyhedron(idx, [index for _, index, _ in connected])
+        ):
+            all_positions = [position] + [coords[j].tolist() for j, _, _ in connected]
+            polyhedra += _get_polyhedron(
+                all_positions,
+                site_color,
+                explicitly_calculate_polyhedra_hull,
+                hull_triangles=hulls.get(idx) if is_complete else None,
+            )
+
+    if drawn and not group_by_site_property:
+        primitives["atoms"] = Scene.merge_primitives(atoms)
+    if drawn:
+        primitives["bonds"] = []
+        for (color, tooltip), pairs in bonds.items():
+            # with lazy tooltips, bonds carry the indices of the sites they connect
+            meta = [
+                {"atom_idx": [drawn[i][0], drawn[j][0]]} if lazy_tooltips else None
+                for i, j in pairs
+            ]
+            if indexed_bonds:
+                primitives["bonds"].append(
+                    IndexedCylinders(
+                        indexPairs=np.array(pairs, dtype=int),
+                        positions=coords,
+                        color=color,
+                        radius=bond_radius,
+                        clickable=True,
+                        tooltip=tooltip,
+                        _meta=meta if lazy_tooltips else None,
+                    )
+                )
+                continue
+            start, end = (
+                coords[[pair[0] for pair in pairs]],
+                coords[[pair[1] for pair in pairs]],
+            )
+            primitives["bonds"].append(
+                Cylinders(
+                    positionPairs=np.stack([start, (start + end) / 2], axis=1),
+                    color=color,
+                    radius=bond_radius,
+                    clickable=True,
+                    tooltip=tooltip,
+                    _meta=meta,
+                )
+            )
+        primitives["polyhedra"] = polyhedra
+        primitives["magmoms"] = Scene.merge_primitives(magmoms)
+    if group_by_site_property:
+        primitives["atoms"] = [
+            Scene(name=key, contents=Scene.merge_primitives(val))
+            for key, val in grouped_atoms.items()
+        ]
+
+    return primitives
+
+
 def get_structure_graph_scene(
     self,
     origin: Sequence[float] | None = None,
@@ -86,6 +366,10 @@ def get_structure_graph_scene(
     group_by_site_property: str | None = None,
     bond_radius: float = 0.1,
     site_get_scene_kwargs: dict | None = None,
+    batched: bool = True,
+    indexed_bonds: bool = False,
+    lazy_tooltips: bool = False,
+    use_symmetry: bool = False,
 ) -> Scene:
     """Returns a Scene containing a representation of the StructureGraph.
 
@@ -107,6 +391,21 @@ def get_structure_graph_scene(
         bond_radius (float, optional): Radius of bonds. Defaults to 0.1.
         site_get_scene_kwargs (dict | None, optional): Keyword arguments to pass to `Site.get_scene`
             Defaults to None.
+        batched (bool, optional): Whether to create the primitives for all sites at once rather
+            than calling `Site.get_scene` for every site, which is much faster for large
+            structures. Not supported together with site_get_scene_kwargs. Defaults to True.
+        indexed_bonds (bool, optional): Whether to draw bonds as IndexedCylinders between
+            positions in a table shared by all bonds, which greatly reduces the size of the
+            scene JSON but requires the client to expand them, see `expand_indexed_primitives`.
+            Only used if batched. Defaults to False.
+        lazy_tooltips (bool, optional): Whether atoms and bonds should only carry the indices
+            of their sites in their _meta instead of tooltip text, which is then resolved on
+            demand with `get_site_tooltips`. This allows atoms to be merged by appearance.
+            Defaults to False.
+        use_symmetry (bool, optional): Whether to compute the polyhedra hulls only once per
+            symmetry-distinct site and map them onto the equivalent sites, which is faster
+            for large high-symmetry structures. Only used if batched and
+            explicitly_calculate_polyhedra_hull. Defaults to False.
 
     Returns:
         Scene: containing a representation of the StructureGraph.
@@ -121,9 +420,11 @@ def get_structure_graph_scene(
     # combine into one big Scene
     primitives: dict[str, list] = defaultdict(list)
 
+    neighbors = self._get_neighbors()
     sites_to_draw = self._get_sites_to_draw(
         draw_image_atoms=draw_image_atoms,
         bonded_sites_outside_unit_cell=bonded_sites_outside_unit_cell,
+        neighbors=neighbors,
     )
 
     color_edges = False
@@ -148,74 +449,93 @@ def get_structure_graph_scene(
 
             color_edges = True
 
-    if group_by_site_property:
-        # we will create sub-scenes for each group of atoms
-        # for example, if the Structure has a "wyckoff" site property
-        # this might be used to allow grouping by Wyckoff position,
-        # this then changes mouseover/interaction behavior with this scene
-        grouped_atom_scene_contents: dict[str, list] = defaultdict(list)
-
-    for idx, jimage in sites_to_draw:
-        site = self.structure[idx]
-        if jimage != (0, 0, 0):
-            connected_sites = self.get_connected_sites(idx, jimage=jimage)
-            site = PeriodicSite(
-                site.species,
-                np.add(site.frac_coords, jimage),
-                site.lattice,
-                properties=site.properties,
+    if batched and not site_get_scene_kwargs:
+        primitives.update(
+            self._get_batched_primitives(
+                sites_to_draw,
+                neighbors,
+                legend,
+                get_weight_color=get_weight_color if color_edges else None,
+                explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
+                group_by_site_property=group_by_site_property,
+                bond_radius=bond_radius,
+                indexed_bonds=indexed_bonds,
+                lazy_tooltips=lazy_tooltips,
+                use_symmetry=use_symmetry,
             )
-        else:
-            connected_sites = self.get_connected_sites(idx)
-
-        connected_sites = [
-            cs for cs in connected_sites if (cs.index, cs.jimage) in sites_to_draw
-        ]
-        connected_sites_not_drawn = [
-            cs for cs in connected_sites if (cs.index, cs.jimage) not in sites_to_draw
-        ]
+        )
+    else:
+        if group_by_site_property:
+            # we will create sub-scenes for each group of atoms
+            # for example, if the Structure has a "wyckoff" site property
+            # this might be used to allow grouping by Wyckoff position,
+            # this then changes mouseover/interaction behavior with this scene
+            grouped_atom_scene_contents: dict[str, list] = defaultdict(list)
+
+        for idx, jimage in sites_to_draw:
+            site = self.structure[idx]
+            if jimage != (0, 0, 0):
+                connected_sites = self.get_connected_sites(idx, jimage=jimage)
+                site = PeriodicSite(
+                    site.species,
+                    np.add(site.frac_coords, jimage),
+                    site.lattice,
+                    properties=site.properties,
+                )
+            else:
+                connected_sites = self.get_connected_sites(idx)
 
-        if color_edges:
-            connected_sites_colors = [
-                get_weight_color(cs.weight) for cs in connected_sites
+            connected_sites = [
+                cs for cs in connected_sites if (cs.index, cs.jimage) in sites_to_draw
             ]
-            connected_sites_not_drawn_colors = [
-                get_weight_color(cs.weight) for cs in connected_sites_not_drawn
+            connected_sites_not_drawn = [
+                cs
+                for cs in connected_sites
+                if (cs.index, cs.jimage) not in sites_to_draw
             ]
 
-        else:
-            connected_sites_colors = None
-            connected_sites_not_drawn_colors = None
-
-        site_scene = site.get_scene(
-            connected_sites=connected_sites,
-            connected_sites_not_drawn=connected_sites_not_drawn,
-            hide_incomplete_edges=hide_incomplete_edges,
-            incomplete_edge_length_scale=incomplete_edge_length_scale,
-            connected_sites_colors=connected_sites_colors,
-            connected_sites_not_drawn_colors=connected_sites_not_drawn_colors,
-            explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
-            legend=legend,
-            bond_radius=bond_radius,
-            site_idx=idx,
-            show_atom_idx=True,
-            **(site_get_scene_kwargs or {}),
-        )
-
-        for scene in site_scene.contents:
-            if group_by_site_property and scene.name == "atoms":
-                group_name = f"{site.properties[group_by_site_property]}"
-                scene.contents[0].tooltip = group_name
-                grouped_atom_scene_contents[group_name] += scene.contents
+            if color_edges:
+                connected_sites_colors = [
+                    get_weight_color(cs.weight) for cs in connected_sites
+                ]
+                connected_sites_not_drawn_colors = [
+                    get_weight_color(cs.weight) for cs in connected_sites_not_drawn
+                ]
 
             else:
-                primitives[scene.name] += scene.contents
+                connected_sites_colors = None
+                connected_sites_not_drawn_colors = None
+
+            site_scene = site.get_scene(
+                connected_sites=connected_sites,
+                connected_sites_not_drawn=connected_sites_not_drawn,
+                hide_incomplete_edges=hide_incomplete_edges,
+                incomplete_edge_length_scale=incomplete_edge_length_scale,
+                connected_sites_colors=connected_sites_colors,
+                connected_sites_not_drawn_colors=connected_sites_not_drawn_colors,
+                explicitly_calculate_polyhedra_hull=explicitly_calculate_polyhedra_hull,
+                legend=legend,
+                bond_radius=bond_radius,
+                site_idx=idx,
+                show_atom_idx=True,
+                lazy_tooltips=lazy_tooltips,
+                **(site_get_scene_kwargs or {}),
+            )
 
-    if group_by_site_property:
-        atoms_scenes: list[Scene] = []
-        for key, val in grouped_atom_scene_contents.items():
-            atoms_scenes.append(Scene(name=key, contents=val))
-        primitives["atoms"] = atoms_scenes
+            for scene in site_scene.contents:
+                if group_by_site_property and scene.name == "atoms":
+                    group_name = f"{site.properties[group_by_site_property]}"
+                    scene.contents[0].tooltip = group_name
+                    grouped_atom_scene_contents[group_name] += scene.contents
+
+                else:
+                    primitives[scene.name] += scene.contents
+
+        if group_by_site_property:
+            atoms_scenes: list[Scene] = []
+            for key, val in grouped_atom_scene_contents.items():
+                atoms_scenes.append(Scene(name=key, contents=val))
+            primitives["atoms"] = atoms_scenes
 
     primitives["unit_cell"].append(self.structure.lattice.get_scene())
 
@@ -230,5 +550,8 @@ def get_structure_graph_scene(
     )
 
 
+StructureGraph._get_neighbors = _get_neighbors
 StructureGraph._get_sites_to_draw = _get_sites_to_draw
+StructureGraph._get_hull_triangles = _get_hull_triangles
+StructureGraph._get_batched_primitives = _get_batched_primitives
 StructureGraph.get_scene = get_structure_graph_scene
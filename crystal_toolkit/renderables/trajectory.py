@@ -0,0 +1,613 @@
+from __future__ import annotations
+
+import threading
+import warnings
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+from monty.io import zopen
+from monty.serialization import dumpfn, loadfn
+from pymatgen.analysis.graphs import MoleculeGraph, StructureGraph
+from pymatgen.analysis.local_env import CovalentBondNN, CrystalNN
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.trajectory import Trajectory
+
+from crystal_toolkit.core.legend import Legend
+from crystal_toolkit.core.scene import (
+    IndexedCylinders,
+    Lines,
+    Scene,
+    Spheres,
+    encode_animation,
+)
+from crystal_toolkit.settings import SETTINGS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from pymatgen.analysis.local_env import NearNeighbors
+
+# fractional coordinates and lattice (3, 3) or lattices (n_frames, 3, 3) of a window
+_Window = tuple[np.ndarray, np.ndarray]
+
+
+def _get_frames(self) -> tuple[np.ndarray, np.ndarray | None]:
+    """Get the Cartesian coordinates of the sites and the lattice matrix in every frame.
+
+    Fractional coordinates are unwrapped, so that sites move continuously instead of
+    jumping across the cell boundaries and bonds found in one frame stay valid in the
+    following ones.
+
+    Returns:
+        tuple: (n_frames, n_sites, 3) Cartesian coordinates, and the (n_frames, 3, 3)
+            lattice matrices, or None for a Molecule-based Trajectory
+    """
+    self.to_positions()
+    coords = np.asarray(self.coords, dtype=float)
+    if self.lattice is None:
+        return coords, None
+
+    lattices = np.asarray(self.lattice, dtype=float)
+    if lattices.ndim == 2:
+        lattices = np.broadcast_to(lattices, (len(coords), 3, 3))
+    steps = np.diff(coords, axis=0)
+    steps -= np.round(steps)
+    frac_coords = np.concatenate([coords[:1], coords[:1] + np.cumsum(steps, axis=0)])
+    return np.einsum("fni,fij->fnj", frac_coords, lattices), lattices
+
+
+def _get_bonds(
+    self,
+    frame: int,
+    coords: np.ndarray,
+    lattices: np.ndarray | None,
+    bonding_strategy: NearNeighbors,
+) -> list[tuple[int, int, tuple[int, int, int]]]:
+    """Get the bonds in a frame as (from index, to index, to_jimage), where to_jimage is
+    relative to the unwrapped coordinates given by _get_frames.
+    """
+    struct_or_mol = self[frame]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if lattices is None:
+                graph = MoleculeGraph.with_local_env_strategy(
+                    struct_or_mol, bonding_strategy, reorder=False
+                )
+            else:
+                graph = StructureGraph.with_local_env_strategy(
+                    struct_or_mol, bonding_strategy
+                )
+    except Exception:
+        # as in StructureMoleculeComponent, if computing bonds fails draw no bonds
+        return []
+
+    shifts = np.zeros((len(struct_or_mol), 3), dtype=int)
+    if lattices is not None:
+        # the structure of a frame is wrapped back into the unit cell
+        shifts = np.round(
+            coords[frame] @ np.linalg.inv(lattices[frame]) - struct_or_mol.frac_coords
+        ).astype(int)
+
+    return [
+        (u, v, tuple(np.add(data.get("to_jimage", (0, 0, 0)), shifts[u] - shifts[v])))
+        for u, v, data in graph.graph.edges(data=True)
+    ]
+
+
+def get_trajectory_scene(
+    self,
+    origin: Sequence[float] | None = None,
+    bonding_strategy: NearNeighbors | None = None,
+    bond_interval: int | None = None,
+    legend: Legend | None = None,
+    bond_radius: float = 0.1,
+    bonds: list[tuple[int, int, tuple[int, int, int]]] | None = None,
+) -> Scene:
+    """Get a Scene of the first frame of the Trajectory that is animated over all frames.
+
+    Atoms, bonds and, if the lattice changes, the unit cell carry their positions in
+    every frame in their _animate, delta-encoded as float32 (see encode_animation), so
+    that a client can step through the frames without requesting a new scene. Bonds
+    are IndexedCylinders between the atoms (and their periodic images where a bond
+    crosses the cell boundary), so each bond adds no data per frame.
+
+    Args:
+        origin (list[float], optional): x,y,z coordinates of the scene's origin. Defaults
+            to the center of the first unit cell, or (0, 0, 0) for molecules.
+        bonding_strategy (NearNeighbors, optional): Strategy used to find the bonds.
+            Defaults to CrystalNN for structures and CovalentBondNN for molecules.
+        bond_interval (int, optional): Find the bonds again every bond_interval frames,
+            e.g. when bonds break or form during the trajectory. The bonds of each
+            interval of frames are IndexedCylinders with a reference of
+            "frames {start}-{stop}" (inclusive), of which only the first are visible.
+            Defaults to None, in which case the bonds of the first frame are used
+            throughout.
+        legend (Legend, optional): Legend for the atom colors and radii. Defaults to
+            the Legend of the first frame.
+        bond_radius (float, optional): Radius of bonds. Defaults to 0.1.
+        bonds (list, optional): Bonds of the first frame as (from index, to index,
+            to_jimage), e.g. found once for a long trajectory that is shown in windows
+            of frames (see TrajectorySource). Defaults to None, in which case they are
+            found with the bonding_strategy.
+
+    Returns:
+        Scene: containing the "atoms", "bonds" and "unit_cell" of the trajectory
+    """
+    coords, lattices = self._get_frames()
+    n_frames, n_sites = coords.shape[:2]
+    first_frame = self[0]
+    legend = legend or Legend(first_frame)
+    if bonding_strategy is None:
+        bonding_strategy = CovalentBondNN() if lattices is None else CrystalNN()
+    if origin is None:
+        origin = (0, 0, 0) if lattices is None else list(-lattices[0].sum(axis=0) / 2)
+
+    # atoms with the same color and radius are drawn as a single Spheres
+    grouped_sites = defaultdict(list)
+    site_colors = []
+    for idx, site in enumerate(first_frame):
+        sp = next(iter(site.species))
+        site_colors.append(legend.get_color(sp, site=site))
+        grouped_sites[site_colors[-1], legend.get_radius(sp, site=site)].append(idx)
+    atoms = [
+        Spheres(
+            positions=coords[0, indices],
+            _animate=encode_animation(coords[:, indices]),
+            color=color,
+            radius=radius,
+        )
+        for (color, radius), indices in grouped_sites.items()
+    ]
+
+    # half bonds from every atom towards each of its neighbors, which are in the
+    # positions table after the atoms if they are periodic images
+    interval = bond_interval or n_frames
+    image_rows: dict[tuple[int, tuple[int, int, int]], int] = {}
+    bonds_by_interval = []
+    for start in range(0, n_frames, interval):
+        pairs = defaultdict(list)
+        if start == 0 and bonds is not None:
+            frame_bonds = bonds
+        else:
+            frame_bonds = self._get_bonds(start, coords, lattices, bonding_strategy)
+        for u, v, jimage in frame_bonds:
+            for from_idx, to_idx, to_jimage in (
+                (u, v, jimage),
+                (v, u, tuple(-np.array(jimage))),
+            ):
+                row = to_idx
+                if any(to_jimage):
+                    row = image_rows.setdefault(
+                        (to_idx, to_jimage), n_sites + len(image_rows)
+                    )
+                pairs[site_colors[from_idx]].append((from_idx, row))
+        bonds_by_interval.append((start, min(start + interval, n_frames) - 1, pairs))
+
+    table_frames = coords
+    if image_rows:
+        image_indices = [idx for idx, _ in image_rows]
+        image_jimages = np.array([jimage for _, jimage in image_rows], dtype=float)
+        table_frames = np.concatenate(
+            [
+                coords,
+                coords[:, image_indices]
+                + np.einsum("ni,fij->fnj", image_jimages, lattices),
+            ],
+            axis=1,
+        )
+    # IndexedCylinders sharing a positions table must share the array itself
+    table = table_frames[0]
+    table_animation = encode_animation(table_frames)
+    bonds = [
+        IndexedCylinders(
+            indexPairs=np.array(color_pairs, dtype=int),
+            positions=table,
+            _animate=table_animation,
+            color=color,
+            radius=bond_radius,
+            visible=None if start == 0 else False,
+            reference=f"frames {start}-{stop}" if bond_interval else None,
+        )
+        for start, stop, pairs in bonds_by_interval
+        for color, color_pairs in pairs.items()
+    ]
+
+    contents = [
+        Scene("atoms", atoms, origin=origin),
+        Scene("bonds", bonds, origin=origin),
+    ]
+    if lattices is not None:
+        unit_cell = Lattice(lattices[0]).get_scene()
+        if not self.constant_lattice:
+            # the lines of the unit cell of the identity matrix are the coefficients
+            # of the lattice vectors at each end of the lines
+            line_coefficients = np.array(
+                Lattice(np.eye(3)).get_scene().contents[0].positions
+            )
+            unit_cell.contents = [
+                Lines(
+                    positions=line_coefficients @ lattices[0],
+                    _animate=encode_animation(
+                        np.einsum("li,fij->flj", line_coefficients, lattices)
+                    ),
+                )
+            ]
+        contents.append(Scene("unit_cell", [unit_cell], origin=origin))
+
+    return Scene(name="Trajectory", contents=contents, origin=origin)
+
+
+def _read_xdatcar(
+    filename: str | Path,
+) -> Iterator[tuple[list[str], np.ndarray, np.ndarray]]:
+    """Read the frames of an XDATCAR one at a time, as (species, lattice, fractional
+    coordinates), so that long trajectories do not have to fit into memory. The header
+    with the lattice is repeated before every frame of a variable-cell run.
+    """
+    species: list[str] = []
+    lattice = np.eye(3)
+    with zopen(filename, mode="rt") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            if "configuration" not in line.lower():
+                header = [line, *islice(file, 6)]
+                scale = float(header[1])
+                lattice = np.array(
+                    [row.split()[:3] for row in header[2:5]], dtype=float
+                )
+                # a negative scale is the volume of the cell
+                lattice *= (
+                    scale
+                    if scale > 0
+                    else (-scale / abs(np.linalg.det(lattice))) ** (1 / 3)
+                )
+                species = [
+                    name
+                    for name, count in zip(header[5].split(), header[6].split())
+                    for _ in range(int(count))
+                ]
+                continue
+            coords = np.array(
+                [row.split()[:3] for row in islice(file, len(species))], dtype=float
+            )
+            if line.lower().startswith("c"):
+                coords = coords @ np.linalg.inv(lattice)
+            yield species, lattice, coords
+
+
+class TrajectorySource:
+    """Frames of a long periodic trajectory stored as memory-mapped .npy files, which are
+    served as animated Scenes of one window of frames at a time, so that trajectories
+    of any length can be viewed without keeping them in memory or sending them to the
+    browser at once (see TrajectoryComponent).
+
+    Decoded windows are kept in a least recently used cache, and the windows following a
+    requested one are loaded in the background. Bonds are found once, in the first
+    frame, and reused for all windows.
+
+    Written with TrajectorySource.write or TrajectorySource.from_xdatcar, which store the
+    fractional coordinates in "frac_coords.npy", the lattice (or the lattice of each
+    frame) in "lattices.npy" and the species in "trajectory.json".
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        window_size: int | None = None,
+        cache_size: int | None = None,
+        prefetch: int | None = None,
+    ) -> None:
+        """
+        Args:
+            path (str | Path): Directory written by TrajectorySource.write.
+            window_size (int, optional): Number of frames per window. Defaults to
+                SETTINGS.TRAJECTORY_WINDOW_SIZE.
+            cache_size (int, optional): Maximum number of decoded windows to keep.
+                Defaults to SETTINGS.TRAJECTORY_CACHE_SIZE.
+            prefetch (int, optional): Number of windows to load ahead of a requested
+                one. Defaults to SETTINGS.TRAJECTORY_PREFETCH.
+        """
+        self.path = Path(path)
+        self.species = loadfn(self.path / "trajectory.json")["species"]
+        self.frac_coords = np.load(self.path / "frac_coords.npy", mmap_mode="r")
+        self.lattices = np.load(self.path / "lattices.npy", mmap_mode="r")
+        self.constant_lattice = self.lattices.ndim == 2
+        self.window_size = window_size or SETTINGS.TRAJECTORY_WINDOW_SIZE
+        self.cache_size = (
+            SETTINGS.TRAJECTORY_CACHE_SIZE if cache_size is None else cache_size
+        )
+        self.prefetch_size = (
+            SETTINGS.TRAJECTORY_PREFETCH if prefetch is None else prefetch
+        )
+        self.hits = 0
+        self.misses = 0
+        self._windows: OrderedDict[int, _Window] = OrderedDict()
+        self._pending: dict[int, Future] = {}
+        self._bonds: dict[str, list[tuple[int, int, tuple[int, int, int]]]] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def write(
+        cls,
+        path: str | Path,
+        species: Sequence[str],
+        frac_coords: np.ndarray,
+        lattices: np.ndarray,
+        **kwargs,
+    ) -> TrajectorySource:
+        """Write the frames of a TrajectorySource.
+
+        Args:
+            path (str | Path): Directory to write to, created if it does not exist.
+            species (list[str]): The species of the sites.
+            frac_coords (np.ndarray): (n_frames, n_sites, 3) fractional coordinates.
+            lattices (np.ndarray): (3, 3) lattice matrix, or (n_frames, 3, 3) for a
+                variable-cell trajectory.
+            **kwargs: Passed to TrajectorySource.
+
+        Returns:
+            TrajectorySource: The written trajectory.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "frac_coords.npy", np.asarray(frac_coords, dtype=float))
+        np.save(path / "lattices.npy", np.asarray(lattices, dtype=float))
+        dumpfn({"species": [str(sp) for sp in species]}, path / "trajectory.json")
+        return cls(path, **kwargs)
+
+    @classmethod
+    def from_trajectory(
+        cls, trajectory: Trajectory, path: str | Path, **kwargs
+    ) -> TrajectorySource:
+        """Write a pymatgen Trajectory of a periodic structure as a TrajectorySource."""
+        trajectory.to_positions()
+        return cls.write(
+            path,
+            trajectory.species,
+            trajectory.coords,
+            trajectory.lattice,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_xdatcar(
+        cls, filename: str | Path, path: str | Path, **kwargs
+    ) -> TrajectorySource:
+        """Convert an XDATCAR into a TrajectorySource, reading and writing one frame at a
+        time so that the trajectory never has to fit into memory.
+
+        Args:
+            filename (str | Path): The XDATCAR, which may be compressed.
+            path (str | Path): Directory to write to, created if it does not exist.
+            **kwargs: Passed to TrajectorySource.
+
+        Returns:
+            TrajectorySource: The written trajectory.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with zopen(filename, mode="rt") as file:
+            n_frames = sum("configuration" in line.lower() for line in file)
+
+        frac_coords = lattices = None
+        species: list[str] = []
+        for frame, (frame_species, lattice, coords) in enumerate(
+            _read_xdatcar(filename)
+        ):
+            species = frame_species
+            if frac_coords is None:
+                frac_coords = np.lib.format.open_memmap(
+                    path / "frac_coords.npy", mode="w+", shape=(n_frames, *coords.shape)
+                )
+                lattices = np.lib.format.open_memmap(
+                    path / "lattices.npy", mode="w+", shape=(n_frames, 3, 3)
+                )
+            frac_coords[frame] = coords
+            lattices[frame] = lattice
+        if frac_coords is None:
+            raise ValueError(f"No frames found in {filename}")
+        frac_coords.flush()
+        if np.all(lattices == lattices[0]):
+            del lattices
+            np.save(path / "lattices.npy", np.load(path / "lattices.npy")[0])
+        else:
+            lattices.flush()
+        dumpfn({"species": species}, path / "trajectory.json")
+        return cls(path, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.frac_coords)
+
+    @property
+    def n_windows(self) -> int:
+        """Number of windows of frames."""
+        return -(-len(self) // self.window_size)
+
+    def get_frames(self, index: int) -> tuple[int, int]:
+        """Get the first and last frame (inclusive) of a window."""
+        start = index * self.window_size
+        return start, min(start + self.window_size, len(self)) - 1
+
+    def get_window(self, index: int) -> _Window:
+        """Get the decoded frames of a window, and load the following windows in the
+        background.
+
+        Args:
+            index (int): The window, from 0 to n_windows - 1.
+
+        Returns:
+            tuple: (n_frames, n_sites, 3) fractional coordinates and the lattice, or
+                the (n_frames, 3, 3) lattices of a variable-cell trajectory, as
+                read-only arrays
+        """
+        if not 0 <= index < self.n_windows:
+            raise IndexError(
+                f"Window {index} out of range for {self.n_windows} windows"
+            )
+        with self._lock:
+            window = self._windows.get(index)
+            pending = self._pending.get(index)
+            if window is not None:
+                self.hits += 1
+                self._windows.move_to_end(index)
+            elif pending is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if window is None:
+            window = pending.result() if pending is not None else self._load(index)
+        self.prefetch(range(index + 1, index + 1 + self.prefetch_size))
+        return window
+
+    def prefetch(self, indices: Iterable[int]) -> list[Future]:
+        """Load windows in the background. Windows that are cached, already being
+        loaded or out of range are skipped.
+
+        Args:
+            indices (Iterable[int]): The windows to load.
+
+        Returns:
+            list[Future]: One future per window that is loaded.
+        """
+        futures = []
+        with self._lock:
+            for index in indices:
+                if (
+                    not 0 <= index < self.n_windows
+                    or index in self._windows
+                    or index in self._pending
+                ):
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="trajectory"
+                    )
+                future = self._executor.submit(self._prefetch, index)
+                self._pending[index] = future
+                futures.append(future)
+        return futures
+
+    def cache_info(self) -> dict[str, int]:
+        """Get the number of hits, misses and cached windows."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._windows),
+                "maxsize": self.cache_size,
+            }
+
+    def get_bonds(
+        self, bonding_strategy: NearNeighbors | None = None
+    ) -> list[tuple[int, int, tuple[int, int, int]]]:
+        """Get the bonds in the first frame as (from index, to index, to_jimage), found
+        only once for each bonding strategy.
+
+        Args:
+            bonding_strategy (NearNeighbors, optional): Strategy used to find the bonds.
+                Defaults to CrystalNN.
+
+        Returns:
+            list: the bonds, with to_jimage relative to the stored coordinates
+        """
+        bonding_strategy = bonding_strategy or CrystalNN()
+        key = (
+            f"{type(bonding_strategy).__name__}{sorted(vars(bonding_strategy).items())}"
+        )
+        with self._lock:
+            bonds = self._bonds.get(key)
+        if bonds is None:
+            trajectory = self._get_trajectory(
+                self.frac_coords[:1],
+                self.lattices if self.constant_lattice else self.lattices[:1],
+            )
+            coords, lattices = trajectory._get_frames()
+            bonds = trajectory._get_bonds(0, coords, lattices, bonding_strategy)
+            with self._lock:
+                self._bonds[key] = bonds
+        return bonds
+
+    def get_scene(
+        self,
+        index: int,
+        bonding_strategy: NearNeighbors | None = None,
+        **kwargs,
+    ) -> Scene:
+        """Get an animated Scene of the frames of a window, see Trajectory.get_scene.
+
+        Args:
+            index (int): The window, from 0 to n_windows - 1.
+            bonding_strategy (NearNeighbors, optional): Strategy used to find the bonds
+                of the first frame. Defaults to CrystalNN.
+            **kwargs: Passed to Trajectory.get_scene.
+
+        Returns:
+            Scene: of the first frame of the window, animated over its frames
+        """
+        frac_coords, lattices = self.get_window(index)
+        # as sites are unwrapped from the first frame of each window, the periodic
+        # images of the bonds have to follow the sites moving across the cell
+        bonds = self.get_bonds(bonding_strategy)
+        if bonds:
+            from_idx, to_idx, jimages = (np.array(col) for col in zip(*bonds))
+            reference, first = self.frac_coords[0], frac_coords[0]
+            jimages = np.round(
+                reference[to_idx]
+                - reference[from_idx]
+                + jimages
+                - first[to_idx]
+                + first[from_idx]
+            ).astype(int)
+            bonds = list(
+                zip(from_idx.tolist(), to_idx.tolist(), map(tuple, jimages.tolist()))
+            )
+        trajectory = self._get_trajectory(frac_coords, lattices)
+        return trajectory.get_scene(
+            bonding_strategy=bonding_strategy, bonds=bonds, **kwargs
+        )
+
+    def _get_trajectory(
+        self, frac_coords: np.ndarray, lattices: np.ndarray
+    ) -> Trajectory:
+        return Trajectory(
+            species=self.species,
+            coords=frac_coords,
+            lattice=lattices,
+            constant_lattice=self.constant_lattice,
+        )
+
+    def _load(self, index: int) -> _Window:
+        start, stop = self.get_frames(index)
+        frac_coords = np.array(self.frac_coords[start : stop + 1], dtype=float)
+        lattices = np.array(
+            self.lattices if self.constant_lattice else self.lattices[start : stop + 1],
+            dtype=float,
+        )
+        frac_coords.flags.writeable = lattices.flags.writeable = False
+        window = (frac_coords, lattices)
+        with self._lock:
+            if self.cache_size > 0:
+                self._windows[index] = window
+                self._windows.move_to_end(index)
+                while len(self._windows) > self.cache_size:
+                    self._windows.popitem(last=False)
+        return window
+
+    def _prefetch(self, index: int) -> _Window:
+        try:
+            return self._load(index)
+        finally:
+            with self._lock:
+                self._pending.pop(index, None)
+
+
+Trajectory._get_frames = _get_frames
+Trajectory._get_bonds = _get_bonds
+Trajectory.get_scene = get_trajectory_scene
@@ -1,19 +1,443 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from typing import TYPE_CHECKING, Any, Literal
 
 import numpy as np
 import skimage.measure
+from monty.serialization import dumpfn, loadfn
 from pymatgen.io.vasp import VolumetricData
 
-from crystal_toolkit.core.scene import Scene, Surface
+from crystal_toolkit.core.scene import IndexedSurface, Scene
+from crystal_toolkit.settings import SETTINGS
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from numpy.typing import ArrayLike, NDArray
     from pymatgen.core.structure import Lattice
 
+logger = logging.getLogger(__name__)
+
 _ANGS2_TO_BOHR3 = 1.88973**3
 
+# vertices, faces and normals as returned by marching_cubes, in grid coordinates
+_Mesh = tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _hash_data(data: NDArray) -> str:
+    """Hash the contents, shape and dtype of a volumetric data array."""
+    data = np.ascontiguousarray(data)
+    digest = hashlib.blake2b(f"{data.shape}{data.dtype}".encode(), digest_size=16)
+    digest.update(data.data)
+    return digest.hexdigest()
+
+
+def _marching_cubes(padded_data: NDArray, isolvl: float, step_size: int) -> _Mesh:
+    """Run marching cubes on data that has already been padded periodically."""
+    try:
+        vertices, faces, normals, _ = skimage.measure.marching_cubes(
+            padded_data, level=isolvl, step_size=step_size, method="lewiner"
+        )
+    except (ValueError, RuntimeError) as err:
+        if "Surface level" in str(err):
+            raise ValueError(
+                f"Isosurface level is not within data range. min: {padded_data.min()}, max: {padded_data.max()}"
+            ) from err
+        raise err
+    # meshes are shared between scenes, so guard them against modification
+    for arr in (vertices, faces, normals):
+        arr.flags.writeable = False
+    return vertices, faces, normals
+
+
+def _marching_cubes_block(
+    path: str,
+    isolvl: float,
+    step_size: int,
+    lo: int,
+    hi: int,
+    start: int,
+    stop: int,
+) -> _Mesh | None:
+    """Run marching cubes on the planes start to stop (inclusive, wrapping around) along
+    the first axis of the data saved at path, keeping only the faces in the cells
+    between planes lo and hi. The data is memory-mapped, so that only this block is
+    read and padded periodically in the worker.
+    """
+    data = np.load(path, mmap_mode="r")
+    planes = np.arange(start, stop + 1) % data.shape[0]
+    block = np.pad(data[planes], ((0, 0), (0, 1), (0, 1)), "wrap")
+    try:
+        vertices, faces, normals, _ = skimage.measure.marching_cubes(
+            block, level=isolvl, step_size=step_size, method="lewiner"
+        )
+    except (ValueError, RuntimeError):
+        # the surface does not pass through this block
+        return None
+    vertices[:, 0] += start
+    # every face lies within a single cell, so its centroid identifies the cell
+    centroids = vertices[faces, 0].mean(axis=1)
+    faces = faces[(centroids >= lo) & (centroids < hi)]
+    used = np.unique(faces)
+    new_indices = np.zeros(len(vertices), dtype=faces.dtype)
+    new_indices[used] = np.arange(len(used))
+    return vertices[used], new_indices[faces], normals[used]
+
+
+_MARCHING_CUBES_POOL: ProcessPoolExecutor | None = None
+_MARCHING_CUBES_POOL_SIZE: int | None = None
+_MARCHING_CUBES_POOL_LOCK = threading.Lock()
+
+
+def _get_marching_cubes_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """Get the process pool used by _chunked_marching_cubes, which is kept between
+    calls, and only re-created if a different number of workers is requested.
+    """
+    global _MARCHING_CUBES_POOL, _MARCHING_CUBES_POOL_SIZE  # noqa: PLW0603
+    with _MARCHING_CUBES_POOL_LOCK:
+        if _MARCHING_CUBES_POOL is None or (
+            max_workers is not None and max_workers != _MARCHING_CUBES_POOL_SIZE
+        ):
+            if _MARCHING_CUBES_POOL is not None:
+                _MARCHING_CUBES_POOL.shutdown(wait=False)
+            _MARCHING_CUBES_POOL = ProcessPoolExecutor(max_workers=max_workers)
+            _MARCHING_CUBES_POOL_SIZE = max_workers
+        return _MARCHING_CUBES_POOL
+
+
+def _chunked_marching_cubes(
+    data: NDArray,
+    isolvl: float,
+    step_size: int,
+    n_chunks: int,
+    max_workers: int | None = None,
+) -> _Mesh:
+    """Run marching cubes on periodic data split into blocks along the first axis, in
+    a process pool, and stitch the meshes of the blocks together.
+
+    The data is saved to a temporary file that the workers memory-map, and each block
+    is read and padded with one cell on either side in its worker, so that the normals
+    at the seams are computed from the same neighbouring values as for the whole grid.
+    The result is the same as for _marching_cubes on the padded grid, up to the order
+    of the vertices and faces, without making a padded copy of the whole grid.
+    """
+    global _MARCHING_CUBES_POOL  # noqa: PLW0603
+    data_min, data_max = data.min(), data.max()
+    if not data_min <= isolvl <= data_max:
+        raise ValueError(
+            f"Isosurface level is not within data range. min: {data_min}, max: {data_max}"
+        )
+
+    n_planes = data.shape[0]
+    # marching cubes only visits cells starting at multiples of step_size, so
+    # blocks have to start at these too
+    n_cells = n_planes // step_size
+    bounds = np.unique(
+        np.linspace(0, n_cells, n_chunks + 1).round().astype(int) * step_size
+    )
+    with TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / "data.npy")
+        np.save(path, data)
+        pool = _get_marching_cubes_pool(max_workers)
+        futures = []
+        try:
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                start, stop = max(lo - step_size, 0), min(hi + step_size, n_planes)
+                futures.append(
+                    pool.submit(
+                        _marching_cubes_block,
+                        path,
+                        isolvl,
+                        step_size,
+                        lo,
+                        hi,
+                        start,
+                        stop,
+                    )
+                )
+            meshes = [
+                mesh
+                for mesh in (future.result() for future in futures)
+                if mesh is not None
+            ]
+        except BrokenProcessPool:
+            # e.g. a process of the pool was killed for running out of memory
+            with _MARCHING_CUBES_POOL_LOCK:
+                if _MARCHING_CUBES_POOL is pool:
+                    _MARCHING_CUBES_POOL = None
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+    if not meshes:
+        raise RuntimeError("No surface found at the given iso value.")
+
+    offsets = np.cumsum([0] + [len(mesh[0]) for mesh in meshes[:-1]])
+    vertices = np.concatenate([mesh[0] for mesh in meshes])
+    faces = np.concatenate([mesh[1] + offset for mesh, offset in zip(meshes, offsets)])
+    normals = np.concatenate([mesh[2] for mesh in meshes])
+
+    # vertices on the seams between blocks are found in both blocks, with identical
+    # coordinates since they are interpolated from the same values
+    seam = np.flatnonzero(np.isin(vertices[:, 0], bounds[1:-1]))
+    _, first, inverse = np.unique(
+        vertices[seam], axis=0, return_index=True, return_inverse=True
+    )
+    merged = np.arange(len(vertices))
+    merged[seam] = seam[first][inverse.ravel()]
+    keep = merged == np.arange(len(vertices))
+    new_indices = np.cumsum(keep) - 1
+    vertices, faces, normals = (
+        vertices[keep],
+        new_indices[merged[faces]].astype(meshes[0][1].dtype),
+        normals[keep],
+    )
+    for arr in (vertices, faces, normals):
+        arr.flags.writeable = False
+    return vertices, faces, normals
+
+
+@dataclass(frozen=True)
+class IsosurfaceSimplification:
+    """Report of the simplification of an isosurface to a triangle budget, set as the
+    simplification attribute of the scenes returned by get_isosurface_scene and
+    VolumetricData.get_scene.
+
+    :param original_triangles: Number of triangles given by marching cubes.
+    :param triangles: Number of triangles after simplification.
+    :param max_error: Largest distance a vertex was moved, in Angstrom.
+    """
+
+    original_triangles: int
+    triangles: int
+    max_error: float
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of the triangles that were removed."""
+        return 1 - self.triangles / self.original_triangles
+
+
+def _simplify_mesh(
+    vertices: NDArray,
+    faces: NDArray,
+    normals: NDArray | None,
+    triangle_budget: int,
+) -> tuple[NDArray, NDArray, NDArray | None, float]:
+    """Simplify a mesh to at most triangle_budget faces by vertex clustering.
+
+    Vertices are merged into the mean position of all vertices in the same cell of a
+    cubic grid, and faces that collapse or become duplicates are removed. The cell size
+    is first estimated from the surface area, and grown until the budget is met.
+
+    Returns:
+        tuple: vertices, faces and normals of the simplified mesh, and the largest
+            distance a vertex was moved
+    """
+    triangles = vertices[faces]
+    area = (
+        np.linalg.norm(
+            np.cross(
+                triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+            ),
+            axis=1,
+        ).sum()
+        / 2
+    )
+    # a surface crossing a cell gives about two triangles
+    cell_size = np.sqrt(2 * area / max(triangle_budget, 1))
+    while True:
+        _, clusters, counts = np.unique(
+            np.floor(vertices / cell_size).astype(np.int64),
+            axis=0,
+            return_inverse=True,
+            return_counts=True,
+        )
+        clusters = clusters.ravel()
+        new_faces = clusters[faces]
+        new_faces = new_faces[
+            (new_faces[:, 0] != new_faces[:, 1])
+            & (new_faces[:, 1] != new_faces[:, 2])
+            & (new_faces[:, 2] != new_faces[:, 0])
+        ]
+        # keep the first of faces with the same vertices, which have either winding
+        _, first = np.unique(np.sort(new_faces, axis=1), axis=0, return_index=True)
+        new_faces = new_faces[np.sort(first)]
+        if len(new_faces) <= triangle_budget:
+            break
+        cell_size *= max(np.sqrt(len(new_faces) / max(triangle_budget, 1)), 1.05)
+
+    new_vertices = np.zeros((len(counts), 3))
+    np.add.at(new_vertices, clusters, vertices)
+    new_vertices /= counts[:, None]
+    error = float(np.linalg.norm(vertices - new_vertices[clusters], axis=1).max())
+    if normals is not None:
+        new_normals = np.zeros((len(counts), 3))
+        np.add.at(new_normals, clusters, normals)
+        lengths = np.linalg.norm(new_normals, axis=1, keepdims=True)
+        normals = np.divide(new_normals, lengths, where=lengths > 0, out=new_normals)
+
+    # drop vertices that are only used by removed faces
+    used = np.unique(new_faces)
+    new_indices = np.zeros(len(counts), dtype=faces.dtype)
+    new_indices[used] = np.arange(len(used))
+    return (
+        new_vertices[used],
+        new_indices[new_faces],
+        None if normals is None else normals[used],
+        error,
+    )
+
+
+class IsosurfaceCache:
+    """Least recently used cache of isosurface meshes, keyed by a hash of the volumetric
+    data, the isolevel and the step size. Meshes for a range of isolevels can be
+    precomputed in the background, so that isolevel changes in an interactive viewer
+    are served from the cache.
+    """
+
+    def __init__(self, maxsize: int = 32, max_workers: int | None = None) -> None:
+        """
+        Args:
+            maxsize (int, optional): Maximum number of meshes to keep. Defaults to 32.
+            max_workers (int, optional): Number of threads used by precompute. Defaults
+                to the ThreadPoolExecutor default.
+        """
+        self.maxsize = maxsize
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._meshes: OrderedDict[tuple[str, float, int], _Mesh] = OrderedDict()
+        self._pending: dict[tuple[str, float, int], Future] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def get(
+        self,
+        data: NDArray,
+        isolvl: float,
+        step_size: int,
+        data_hash: str | None = None,
+        n_chunks: int = 1,
+    ) -> _Mesh:
+        """Get the isosurface mesh of the data, running marching cubes on a cache miss.
+
+        Args:
+            data (NDArray): The volumetric data array.
+            isolvl (float): The cutoff to compute the isosurface.
+            step_size (int): step_size parameter for marching_cubes.
+            data_hash (str, optional): Hash of the data as given by _hash_data, to avoid
+                hashing the same data repeatedly.
+            n_chunks (int, optional): On a cache miss, split the data into this many
+                blocks that are processed in parallel. Defaults to 1.
+
+        Returns:
+            tuple: vertices, faces and normals in grid coordinates, as read-only arrays
+        """
+        key = (data_hash or _hash_data(data), float(isolvl), step_size)
+        with self._lock:
+            if key in self._meshes:
+                self.hits += 1
+                self._meshes.move_to_end(key)
+                return self._meshes[key]
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if pending is not None:
+            # being computed in the background already, so wait for that
+            return pending.result()
+        if n_chunks > 1:
+            mesh = _chunked_marching_cubes(data, key[1], step_size, n_chunks)
+        else:
+            mesh = _marching_cubes(np.pad(data, (0, 1), "wrap"), key[1], step_size)
+        self._add(key, mesh)
+        return mesh
+
+    def precompute(
+        self,
+        data: NDArray,
+        isolvls: Iterable[float],
+        step_size: int,
+    ) -> list[Future]:
+        """Compute the isosurface meshes for several isolevels in the background.
+
+        Isolevels that are cached or already being computed are skipped.
+
+        Args:
+            data (NDArray): The volumetric data array.
+            isolvls (Iterable[float]): The isolevels to compute, e.g. the values of an
+                isolevel slider.
+            step_size (int): step_size parameter for marching_cubes.
+
+        Returns:
+            list[Future]: One future per isolevel that is computed, which resolves to
+                the mesh or raises the marching_cubes error for that isolevel.
+        """
+        data_hash = _hash_data(data)
+        padded_data = np.pad(data, (0, 1), "wrap")
+        futures = []
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="isosurface"
+                )
+            for isolvl in isolvls:
+                key = (data_hash, float(isolvl), step_size)
+                if key in self._meshes or key in self._pending:
+                    continue
+                future = self._executor.submit(self._compute, key, padded_data)
+                self._pending[key] = future
+                futures.append(future)
+        return futures
+
+    def cache_info(self) -> dict[str, int]:
+        """Get the number of hits, misses and cached meshes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._meshes),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Remove all cached meshes and reset the hit and miss counts."""
+        with self._lock:
+            self._meshes.clear()
+            self.hits = self.misses = 0
+
+    def _compute(self, key: tuple[str, float, int], padded_data: NDArray) -> _Mesh:
+        try:
+            mesh = _marching_cubes(padded_data, key[1], key[2])
+            self._add(key, mesh)
+            return mesh
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _add(self, key: tuple[str, float, int], mesh: _Mesh) -> None:
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._meshes[key] = mesh
+            self._meshes.move_to_end(key)
+            while len(self._meshes) > self.maxsize:
+                self._meshes.popitem(last=False)
+
+
+ISOSURFACE_CACHE = IsosurfaceCache(maxsize=SETTINGS.ISOSURFACE_CACHE_SIZE)
+
 
 def get_isosurface_scene(
     data: NDArray,
@@ -21,6 +445,10 @@ def get_isosurface_scene(
     isolvl: float | None = None,
     step_size: int = 4,
     origin: ArrayLike | None = None,
+    include_normals: bool = False,
+    n_chunks: int = 1,
+    data_hash: str | None = None,
+    triangle_budget: int | None = None,
     **kwargs: Any,
 ) -> Scene:
     """Get the isosurface from a VolumetricData object.
@@ -31,34 +459,99 @@ def get_isosurface_scene(
         isolvl (float, optional): The cutoff to compute the isosurface
         step_size (int, optional): step_size parameter for marching_cubes_lewiner. Defaults to 3.
         origin (ArrayLike, optional): The origin of the isosurface. Defaults to None.
-        **kwargs: Passed to the Surface object.
+        include_normals (bool, optional): Include the vertex normals computed by
+            marching_cubes, for smooth shading. Defaults to False, in which case the
+            client computes normals from the faces.
+        n_chunks (int, optional): Split the grid into this many blocks that are run
+            through marching_cubes in parallel processes, for large grids. Defaults to 1.
+        data_hash (str, optional): Key identifying the data in ISOSURFACE_CACHE, to avoid
+            hashing large (e.g. memory-mapped) arrays. Defaults to a hash of the data.
+        triangle_budget (int, optional): Simplify the isosurface to at most this many
+            triangles. Defaults to SETTINGS.ISOSURFACE_TRIANGLE_BUDGET.
+        **kwargs: Passed to the IndexedSurface object.
 
     Returns:
-        Scene: object containing the isosurface component
+        Scene: object containing the isosurface component. Its simplification
+            attribute is an IsosurfaceSimplification giving the number of triangles
+            before and after simplification and the error, or None if the isosurface
+            was within the triangle budget.
     """
     origin = origin or list(-lattice.get_cartesian_coords([0.5, 0.5, 0.5]))
     if isolvl is None:
         # get the value such that 20% of the weight is enclosed
         isolvl = np.percentile(data, 20)
 
-    padded_data = np.pad(data, (0, 1), "wrap")
-    try:
-        vertices, faces, _, _ = skimage.measure.marching_cubes(
-            padded_data, level=isolvl, step_size=step_size, method="lewiner"
-        )
-    except (ValueError, RuntimeError) as err:
-        if "Surface level" in str(err):
-            raise ValueError(
-                f"Isosurface level is not within data range. min: {data.min()}, max: {data.max()}"
-            ) from err
-        raise err
+    vertices, faces, normals = ISOSURFACE_CACHE.get(
+        data, isolvl, step_size, data_hash=data_hash, n_chunks=n_chunks
+    )
     # transform to fractional coordinates
     vertices = vertices / (data.shape[0], data.shape[1], data.shape[2])
     vertices = np.dot(vertices, lattice.matrix)  # transform to Cartesian
-    pos = [vert for triangle in vertices[faces].tolist() for vert in triangle]
-    return Scene(
-        "isosurface", origin=origin, contents=[Surface(pos, show_edges=False, **kwargs)]
+    if include_normals:
+        # normals transform with the inverse transpose of the map from grid indices
+        # to Cartesian coordinates
+        transform = lattice.matrix / np.reshape(data.shape, (3, 1))
+        normals = np.dot(normals, np.linalg.inv(transform).T)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        # surfaces with normals are rendered single-sided, so the winding of the
+        # faces has to agree with the normals for the front faces to be visible
+        edges = np.diff(vertices[faces], axis=1)
+        face_normals = np.cross(edges[:, 0], edges[:, 1])
+        if np.sum(face_normals * normals[faces].sum(axis=1)) < 0:
+            faces = faces[:, ::-1]
+    else:
+        normals = None
+    if triangle_budget is None:
+        triangle_budget = SETTINGS.ISOSURFACE_TRIANGLE_BUDGET
+    simplification = None
+    if triangle_budget is not None and len(faces) > triangle_budget:
+        n_triangles = len(faces)
+        vertices, faces, normals, error = _simplify_mesh(
+            vertices, faces, normals, triangle_budget
+        )
+        simplification = IsosurfaceSimplification(
+            original_triangles=n_triangles, triangles=len(faces), max_error=error
+        )
+        logger.info(
+            "Simplified isosurface from %d to %d triangles (%.0f%% reduction), "
+            "moving vertices by up to %.3g Angstrom.",
+            n_triangles,
+            len(faces),
+            100 * simplification.reduction,
+            error,
+        )
+    # vertices are shared between faces, so are only expanded into triangles when
+    # the client cannot do so, see Scene.to_json(indexed_surfaces=True)
+    surface = IndexedSurface(
+        positions=vertices, faces=faces, normals=normals, show_edges=False, **kwargs
     )
+    scene = Scene("isosurface", origin=origin, contents=[surface])
+    scene.simplification = simplification
+    return scene
+
+
+def _get_normalization_factor(
+    volume: float, normalization: Literal["vol", "vesta"] | None
+) -> float:
+    factor = 1.0
+    if normalization in ("vol", "vesta"):
+        factor *= volume
+    if normalization == "vesta":
+        factor *= _ANGS2_TO_BOHR3
+    return factor
+
+
+def _get_normalized_data(
+    self,
+    data_key: str,
+    normalization: Literal["vol", "vesta"] | None,
+) -> NDArray:
+    vol_data = self.data[data_key]
+    if normalization in ("vol", "vesta"):
+        vol_data = vol_data / _get_normalization_factor(
+            self.structure.volume, normalization
+        )
+    return vol_data
 
 
 def get_volumetric_scene(
@@ -67,6 +560,8 @@ def get_volumetric_scene(
     isolvl: float | None = None,
     step_size: int = 3,
     normalization: Literal["vol", "vesta"] | None = "vol",
+    n_chunks: int = 1,
+    triangle_budget: int | None = None,
     **kwargs,
 ):
     """Get the Scene object which contains a structure and a isosurface components.
@@ -80,17 +575,19 @@ def get_volumetric_scene(
             Default is 'vol', which divides the data by the volume of the unit cell, this is required
             for all VASP volumetric data formats.  If normalization is 'vesta' we also change
             the units from Angstroms to Bohr.
+        n_chunks (int, optional): Number of blocks to split the grid into for parallel
+            marching cubes. Defaults to 1.
+        triangle_budget (int, optional): Simplify the isosurface to at most this many
+            triangles. Defaults to SETTINGS.ISOSURFACE_TRIANGLE_BUDGET.
         **kwargs: Passed to the Structure.get_scene() function.
 
     Returns:
-        Scene: object containing the structure and isosurface components
+        Scene: object containing the structure and isosurface components. Its
+            simplification attribute is that of the isosurface scene, see
+            get_isosurface_scene.
     """
     struct_scene = self.structure.get_scene(**kwargs)
-    vol_data = self.data[data_key]
-    if normalization in ("vol", "vesta"):
-        vol_data = vol_data / self.structure.volume
-    if normalization == "vesta":
-        vol_data = vol_data / _ANGS2_TO_BOHR3
+    vol_data = _get_normalized_data(self, data_key, normalization)
 
     iso_scene = get_isosurface_scene(
         data=vol_data,
@@ -98,10 +595,272 @@ def get_volumetric_scene(
         isolvl=isolvl,
         step_size=step_size,
         origin=struct_scene.origin,
+        n_chunks=n_chunks,
+        triangle_budget=triangle_budget,
     )
     struct_scene.contents.append(iso_scene)
+    struct_scene.simplification = iso_scene.simplification
     return struct_scene
 
 
+def precompute_isosurfaces(
+    self,
+    isolvls: Iterable[float],
+    data_key: str = "total",
+    step_size: int = 3,
+    normalization: Literal["vol", "vesta"] | None = "vol",
+) -> list[Future]:
+    """Compute the isosurfaces for several isolevels in the background, so that later
+    calls to get_scene with these isolevels are served from ISOSURFACE_CACHE.
+
+    Args:
+        isolvls (Iterable[float]): The isolevels to compute, e.g. the values of an
+            isolevel slider.
+        data_key (str, optional): Use the volumetric data from self.data[data_key]. Defaults to 'total'.
+        step_size (int, optional): step_size parameter for marching_cubes_lewiner. Defaults to 3.
+        normalization (str, optional): As for get_scene. Defaults to 'vol'.
+
+    Returns:
+        list[Future]: One future per isolevel that is not already cached.
+    """
+    vol_data = _get_normalized_data(self, data_key, normalization)
+    return ISOSURFACE_CACHE.precompute(vol_data, isolvls, step_size)
+
+
+def _downsample_axis(data: NDArray, factor: int, axis: int) -> NDArray:
+    """Downsample periodic data along one axis by averaging windows of factor points
+    centered on the coarse grid points, which need not divide the grid evenly.
+    """
+    n_points = data.shape[axis]
+    n_coarse = max(round(n_points / factor), 2)
+    centers = np.round(np.arange(n_coarse) * n_points / n_coarse).astype(int)
+    window = np.arange(factor) - factor // 2
+    return np.take(data, centers[:, None] + window, axis=axis, mode="wrap").mean(
+        axis=axis + 1
+    )
+
+
+class VolumetricPyramid:
+    """Volumetric data stored at several resolutions as memory-mapped .npy files, so that
+    many large data sets can be rendered without keeping them in memory. The resolution
+    is chosen to fit a triangle budget, and coarse levels can be shown first while
+    finer ones are computed.
+
+    Written with VolumetricData.write_pyramid, which stores each level as
+    "{factor}.npy", for each downsampling factor, and the structure in "pyramid.json".
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Args:
+            path (str | Path): Directory written by VolumetricData.write_pyramid.
+        """
+        self.path = Path(path)
+        metadata = loadfn(self.path / "pyramid.json")
+        self.structure = metadata["structure"]
+        self.data_key = metadata["data_key"]
+        self.factors = sorted(metadata["factors"])
+
+    @classmethod
+    def write(
+        cls,
+        volumetric_data: VolumetricData,
+        path: str | Path,
+        data_key: str = "total",
+        factors: Iterable[int] = (1, 2, 4, 8),
+    ) -> VolumetricPyramid:
+        """Write the levels of a VolumetricPyramid.
+
+        Args:
+            volumetric_data (VolumetricData): The data to write.
+            path (str | Path): Directory to write to, created if it does not exist.
+            data_key (str, optional): Use the volumetric data from
+                volumetric_data.data[data_key]. Defaults to 'total'.
+            factors (Iterable[int], optional): Downsampling factors of the levels,
+                where each level has 1/factor as many points along each axis. Defaults
+                to (1, 2, 4, 8).
+
+        Returns:
+            VolumetricPyramid: The written pyramid.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        data = volumetric_data.data[data_key]
+        factors = sorted(set(factors))
+        for factor in factors:
+            level = data
+            if factor > 1:
+                for axis in range(3):
+                    level = _downsample_axis(level, factor, axis)
+            np.save(path / f"{factor}.npy", level)
+        dumpfn(
+            {
+                "structure": volumetric_data.structure,
+                "data_key": data_key,
+                "factors": factors,
+            },
+            path / "pyramid.json",
+        )
+        return cls(path)
+
+    def get_level(self, factor: int) -> np.memmap:
+        """Get the data downsampled by factor, memory-mapped read-only."""
+        return np.load(self.path / f"{factor}.npy", mmap_mode="r")
+
+    def get_factor(
+        self,
+        isolvl: float,
+        step_size: int = 1,
+        triangle_budget: int | None = None,
+    ) -> int:
+        """Get the smallest downsampling factor whose isosurface is expected to fit the
+        triangle budget.
+
+        The number of triangles is estimated from the isosurface of the coarsest level
+        that has one, as it scales with the inverse square of the grid spacing.
+
+        Args:
+            isolvl (float): The isolevel, in the units of the stored data.
+            step_size (int, optional): step_size parameter for marching_cubes. Defaults to 1.
+            triangle_budget (int, optional): Target maximum number of triangles. Defaults
+                to SETTINGS.ISOSURFACE_TRIANGLE_BUDGET, if None the finest level is used.
+
+        Returns:
+            int: One of self.factors
+        """
+        if triangle_budget is None:
+            triangle_budget = SETTINGS.ISOSURFACE_TRIANGLE_BUDGET
+        if triangle_budget is None:
+            return self.factors[0]
+        for coarse_factor in reversed(self.factors):
+            try:
+                _, faces, _ = self._get_mesh(coarse_factor, isolvl, step_size)
+            except (ValueError, RuntimeError):
+                # averaging can remove the surface from coarse levels
+                continue
+            for factor in self.factors:
+                if len(faces) * (coarse_factor / factor) ** 2 <= triangle_budget:
+                    return factor
+            return self.factors[-1]
+        return self.factors[0]
+
+    def get_scene(
+        self,
+        isolvl: float | None = None,
+        step_size: int = 1,
+        normalization: Literal["vol", "vesta"] | None = "vol",
+        triangle_budget: int | None = None,
+        factor: int | None = None,
+        **kwargs,
+    ) -> Scene:
+        """Get the Scene object which contains the structure and an isosurface at a
+        resolution that fits the triangle budget.
+
+        Args:
+            isolvl (float, optional): The cutoff for the isosurface, if none is provided
+                we default to a surface that encloses 20% of the weight of the coarsest
+                level.
+            step_size (int, optional): step_size parameter for marching_cubes. Defaults to 1.
+            normalization (str, optional): As for VolumetricData.get_scene. Defaults to 'vol'.
+            triangle_budget (int, optional): Target maximum number of triangles, see
+                get_factor. If the chosen level still exceeds it, the isosurface is
+                simplified.
+            factor (int, optional): Use this level instead of choosing one from the
+                triangle budget.
+            **kwargs: Passed to the Structure.get_scene() function.
+
+        Returns:
+            Scene: object containing the structure and isosurface components
+        """
+        isolvl = self._get_stored_isolvl(isolvl, normalization)
+        factor = factor or self.get_factor(isolvl, step_size, triangle_budget)
+        return self._get_scene(factor, isolvl, step_size, triangle_budget, **kwargs)
+
+    def iter_scenes(
+        self,
+        isolvl: float | None = None,
+        step_size: int = 1,
+        normalization: Literal["vol", "vesta"] | None = "vol",
+        triangle_budget: int | None = None,
+        **kwargs,
+    ) -> Iterator[Scene]:
+        """Get scenes from the coarsest level up to the level that fits the triangle
+        budget, to progressively refine the isosurface shown. Arguments are as for
+        get_scene.
+        """
+        isolvl = self._get_stored_isolvl(isolvl, normalization)
+        finest_factor = self.get_factor(isolvl, step_size, triangle_budget)
+        for factor in reversed(self.factors):
+            if factor < finest_factor:
+                break
+            try:
+                scene = self._get_scene(
+                    factor, isolvl, step_size, triangle_budget, **kwargs
+                )
+            except (ValueError, RuntimeError):
+                # averaging can remove the surface from coarse levels
+                if factor == finest_factor:
+                    raise
+                continue
+            yield scene
+
+    def _get_stored_isolvl(
+        self, isolvl: float | None, normalization: Literal["vol", "vesta"] | None
+    ) -> float:
+        # the stored data is not normalized, so the isolevel is scaled instead to
+        # avoid copying the data
+        if isolvl is None:
+            return np.percentile(self.get_level(self.factors[-1]), 20)
+        return isolvl * _get_normalization_factor(self.structure.volume, normalization)
+
+    def _get_data_hash(self, factor: int) -> str:
+        file = self.path.resolve() / f"{factor}.npy"
+        return f"{file}:{file.stat().st_mtime_ns}"
+
+    def _get_mesh(self, factor: int, isolvl: float, step_size: int) -> _Mesh:
+        return ISOSURFACE_CACHE.get(
+            self.get_level(factor),
+            isolvl,
+            step_size,
+            data_hash=self._get_data_hash(factor),
+        )
+
+    def _get_scene(
+        self,
+        factor: int,
+        isolvl: float,
+        step_size: int,
+        triangle_budget: int | None,
+        **kwargs,
+    ) -> Scene:
+        struct_scene = self.structure.get_scene(**kwargs)
+        iso_scene = get_isosurface_scene(
+            data=self.get_level(factor),
+            lattice=self.structure.lattice,
+            isolvl=isolvl,
+            step_size=step_size,
+            origin=struct_scene.origin,
+            data_hash=self._get_data_hash(factor),
+            triangle_budget=triangle_budget,
+        )
+        struct_scene.contents.append(iso_scene)
+        struct_scene.simplification = iso_scene.simplification
+        return struct_scene
+
+
+def write_pyramid(
+    self,
+    path: str | Path,
+    data_key: str = "total",
+    factors: Iterable[int] = (1, 2, 4, 8),
+) -> VolumetricPyramid:
+    """Write the data at several resolutions to memory-mapped files, see
+    VolumetricPyramid.write.
+    """
+    return VolumetricPyramid.write(self, path, data_key=data_key, factors=factors)
+
+
 # todo: re-think origin, shift globally at end (scene.origin)
 VolumetricData.get_scene = get_volumetric_scene
+VolumetricData.precompute_isosurfaces = precompute_isosurfaces
+VolumetricData.write_pyramid = write_pyramid
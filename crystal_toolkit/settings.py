@@ -124,6 +124,102 @@ class Settings(BaseSettings):
         default=False,
         description="This setting controls whether previews are rendered for structure transformations.",
     )
+    SCENE_TYPED_ARRAYS: bool = Field(
+        default=False,
+        description="If True, scene positions are sent to the browser as base64-encoded float32 buffers instead of JSON lists of floats. This reduces payload size and parse time for large structures and volumetric data, at the cost of float32 precision.",
+    )
+    SCENE_INDEXED_BONDS: bool = Field(
+        default=False,
+        description="If True, bonds are sent to the browser as pairs of indices into a table of atom positions instead of explicit coordinates, and expanded client-side. This roughly halves the payload size for bonded structures.",
+    )
+    SCENE_INDEXED_SURFACES: bool = Field(
+        default=False,
+        description="If True, isosurfaces are sent to the browser as vertices and the indices of the vertices of each face instead of three explicit vertices per face, and expanded client-side. This reduces the payload size of volumetric data several times.",
+    )
+    ISOSURFACE_CACHE_SIZE: int = Field(
+        default=32,
+        description="Number of isosurfaces kept in memory, keyed by the volumetric data, isolevel and step size, so that returning to a previous isolevel does not re-run marching cubes. If 0, isosurfaces are not cached.",
+    )
+    ISOSURFACE_TRIANGLE_BUDGET: int | None = Field(
+        default=None,
+        description="Maximum number of triangles in an isosurface. Isosurfaces with more triangles are simplified by vertex clustering before they are sent to the browser, and the resolution level is chosen to fit it when rendering from a VolumetricPyramid. If None, isosurfaces are not simplified.",
+    )
+    MOLECULE_GRAPH_CACHE_SIZE: int = Field(
+        default=32,
+        description="Number of molecule graphs derived with another bonding strategy kept in memory, e.g. the OpenBabelNN graphs used to visualize bond orders, so that changing display options does not re-compute them. If 0, derived graphs are not cached.",
+    )
+    TRAJECTORY_WINDOW_SIZE: int = Field(
+        default=100,
+        description="Number of frames of a TrajectorySource sent to the browser at once, as an animated scene. Larger windows allow scrubbing through more frames without a callback, at the cost of larger payloads.",
+    )
+    TRAJECTORY_CACHE_SIZE: int = Field(
+        default=16,
+        description="Number of windows of frames of a TrajectorySource kept in memory after reading them from disk. If 0, windows are not cached.",
+    )
+    TRAJECTORY_PREFETCH: int = Field(
+        default=2,
+        description="Number of windows of frames of a TrajectorySource loaded in the background ahead of the one being viewed.",
+    )
+    OBJECT_STORE: Literal["disk", "redis"] | None = Field(
+        default=None,
+        description="If set, MSONable objects in the dcc.Stores of components (e.g. structure graphs or band structures) are kept on the server, on disk or in the Redis instance at REDIS_URL, and the browser only holds a handle to them. This avoids sending large objects back and forth on every callback. Use 'redis' when running several workers on different machines.",
+    )
+    OBJECT_STORE_PATH: Path | None = Field(
+        default=None,
+        description="Directory used by the 'disk' object store. If None, a directory in the system temporary directory is used.",
+    )
+    OBJECT_STORE_SIZE: int = Field(
+        default=1000,
+        description="Maximum number of objects kept by the 'disk' object store. The size of the 'redis' object store is controlled by the memory policy of the Redis instance instead.",
+    )
+    OBJECT_STORE_TTL: int = Field(
+        default=86400,
+        description="Number of seconds objects are kept in the object store after they were last sent to the browser.",
+    )
+    OBJECT_STORE_MEMORY_SIZE: int = Field(
+        default=32,
+        description="Number of decoded objects from the object store kept in memory by each worker, so that successive callbacks on the same object do not decode it again. If 0, objects are decoded on every callback.",
+    )
+    GRAPH_CACHE: Literal["disk", "redis"] | None = Field(
+        default=None,
+        description="Where bonding graphs computed by StructureMoleculeComponent are cached, keyed by the structure or molecule, the bonding strategy and its options. If 'disk' or 'redis' (using REDIS_URL), the cache is shared between the workers of an app, so that each graph is computed once. If None, each worker keeps its own cache in memory.",
+    )
+    GRAPH_CACHE_PATH: Path | None = Field(
+        default=None,
+        description="Directory used by the 'disk' graph cache. If None, a directory in the system temporary directory is used.",
+    )
+    GRAPH_CACHE_SIZE: int = Field(
+        default=1000,
+        description="Maximum number of bonding graphs kept by the 'disk' and in-memory graph caches. If 0, graphs are not cached.",
+    )
+    GRAPH_CACHE_TTL: int = Field(
+        default=0,
+        description="Number of seconds bonding graphs are kept in the graph cache. If 0, graphs are kept until they are evicted.",
+    )
+    BONDING_POOL_SIZE: int = Field(
+        default=0,
+        description="Maximum number of processes computing bonding graphs at once, one per graph, so that slow bonding strategies on pathological structures do not hold a worker of the app. If 0, bonding graphs are computed in the thread serving the request, without a timeout.",
+    )
+    BONDING_TIMEOUT: float = Field(
+        default=30,
+        description="Number of seconds to wait for a bonding graph computed in a separate process (see BONDING_POOL_SIZE), after which that process is killed. Bonds are found from typical bond lengths instead, and a warning is shown next to the choice of bonding algorithm.",
+    )
+    UNIT_CELL_PRECOMPUTE: bool = Field(
+        default=False,
+        description="If True, when a structure is loaded in a StructureMoleculeComponent, its other unit cell choices (primitive, conventional, etc.) and their bonding graphs are computed in the background, so that changing the unit cell is instant.",
+    )
+    UNIT_CELL_PRECOMPUTE_IDLE_TIMEOUT: float = Field(
+        default=60,
+        description="Number of seconds after which the background computation of the unit cells of a structure (see UNIT_CELL_PRECOMPUTE) is abandoned if no session requested that structure, when another structure is loaded.",
+    )
+    UNIT_CELL_CACHE_SIZE: int = Field(
+        default=64,
+        description="Number of structures in alternate unit cells kept in memory, so that changing the unit cell back and forth does not repeat the symmetry analysis. If 0, unit cells are not cached.",
+    )
+    SCENE_LAZY_TOOLTIPS: bool = Field(
+        default=False,
+        description="If True, atoms and bonds in structure scenes carry only the indices of their sites instead of tooltip text, so that atoms can be merged by appearance. The details of the sites are shown when they are clicked instead.",
+    )
     DOI_CACHE_PATH: Path | None = Field(
         default=MODULE_PATH / "apps/assets/doi_cache.json",
         description="Not currently used, maybe will be deprecated. This was used to avoid a CrossRef API lookup when a small set of DOIs were used in an app.",
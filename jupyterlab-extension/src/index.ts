@@ -12,6 +12,123 @@ const MIME_TYPE = 'application/vnd.mp.ctk+json';
  */
 const CLASS_NAME = 'mimerenderer-mp_ctk_json';
 
+/**
+ * Reshape a flat little-endian float32 or uint32 buffer into nested arrays.
+ */
+function reshape(
+  view: DataView,
+  dtype: string,
+  shape: number[],
+  offset: number
+): any[] {
+  const values = new Array(shape[0]);
+  if (shape.length === 1) {
+    for (let i = 0; i < shape[0]; i++) {
+      values[i] =
+        dtype === 'uint32'
+          ? view.getUint32(4 * (offset + i), true)
+          : view.getFloat32(4 * (offset + i), true);
+    }
+    return values;
+  }
+  const stride = shape.slice(1).reduce((a, b) => a * b, 1);
+  for (let i = 0; i < shape[0]; i++) {
+    values[i] = reshape(view, dtype, shape.slice(1), offset + i * stride);
+  }
+  return values;
+}
+
+/**
+ * Decode typed arrays, as created by Scene.to_json(typed_arrays=True),
+ * back into the nested arrays expected by the Scene.
+ */
+export function decodeTypedArrays(obj: any): any {
+  if (Array.isArray(obj)) {
+    return obj.map(decodeTypedArrays);
+  }
+  if (obj === null || typeof obj !== 'object') {
+    return obj;
+  }
+  if (typeof obj.buffer === 'string' && obj.dtype) {
+    const bytes = Uint8Array.from(atob(obj.buffer), (c) => c.charCodeAt(0));
+    return reshape(new DataView(bytes.buffer), obj.dtype, obj.shape, 0);
+  }
+  const decoded: { [key: string]: any } = {};
+  Object.keys(obj).forEach((key) => {
+    decoded[key] = decodeTypedArrays(obj[key]);
+  });
+  return decoded;
+}
+
+/**
+ * Expand IndexedCylinders, which reference the positions table of their
+ * Scene, into Cylinders with explicit position pairs, and IndexedSurfaces
+ * into Surfaces with explicit vertices for each face.
+ */
+export function expandIndexedPrimitives(obj: any): any {
+  if (obj === null || typeof obj !== 'object' || !Array.isArray(obj.contents)) {
+    return obj;
+  }
+  const positions: number[][] = obj.positions || [];
+  const scene = { ...obj };
+  delete scene.positions;
+  delete scene._animate;
+  // positions of the table in each frame of its animation, accumulated in
+  // float32 as when they were encoded
+  let frames: number[][][] | null = null;
+  if (obj._animate) {
+    let previous = positions;
+    frames = obj._animate.map((deltas: number[][]) => {
+      previous = previous.map((p, i) =>
+        p.map((x, k) => Math.fround(x + deltas[i][k]))
+      );
+      return previous;
+    });
+  }
+  scene.contents = obj.contents.map((item: any) => {
+    if (item && item.type === 'indexedSurface') {
+      const surface = { ...item };
+      delete surface.faces;
+      surface.type = 'surface';
+      surface.positions = [];
+      surface.normals = item.normals ? [] : undefined;
+      item.faces.forEach((face: number[]) => {
+        face.forEach((i) => {
+          surface.positions.push(item.positions[i]);
+          if (item.normals) {
+            surface.normals.push(item.normals[i]);
+          }
+        });
+      });
+      return surface;
+    }
+    if (!item || item.type !== 'indexedCylinders') {
+      return expandIndexedPrimitives(item);
+    }
+    const { indexPairs, split = 0.5, ...cylinders } = item;
+    cylinders.type = 'cylinders';
+    const getPositionPairs = (table: number[][]) =>
+      indexPairs.map(([i, j]: number[]) => [
+        table[i],
+        table[i].map((x, k) => (1 - split) * x + split * table[j][k]),
+      ]);
+    cylinders.positionPairs = getPositionPairs(positions);
+    if (frames) {
+      let previous: number[][][] = cylinders.positionPairs;
+      cylinders._animate = frames.map((table) => {
+        const pairs: number[][][] = getPositionPairs(table);
+        const deltas = pairs.map((pair, i) =>
+          pair.map((p, j) => p.map((x, k) => x - previous[i][j][k]))
+        );
+        previous = pairs;
+        return deltas;
+      });
+    }
+    return cylinders;
+  });
+  return scene;
+}
+
 /**
  * A widget for rendering Crystal Toolkit Scene JSON
  */
@@ -50,7 +167,9 @@ export class SceneRenderer extends Widget implements IRenderMime.IRenderer {
           () => {  // cameraState
                 /* we do not need to dispatch camera changes */
             }, null);
-      this.scene.addToScene(this.model.data[MIME_TYPE]);
+      this.scene.addToScene(
+        expandIndexedPrimitives(decodeTypedArrays(this.model.data[MIME_TYPE]))
+      );
       this.scene.resizeRendererToDisplaySize();
     }, 0);
 
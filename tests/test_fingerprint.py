@@ -0,0 +1,83 @@
+from flask import Flask
+from flask_caching import Cache
+from pymatgen.analysis.graphs import StructureGraph
+from pymatgen.analysis.local_env import CutOffDictNN
+from pymatgen.core import Lattice, Structure
+
+from crystal_toolkit.core.fingerprint import get_cache_key, get_fingerprint, memoize
+
+NaK = Structure(
+    Lattice.cubic(4.2),
+    ["Na", "K"],
+    [[0, 0, 0], [0.5, 0.5, 0.5]],
+    site_properties={"magmom": [1, -1]},
+)
+
+
+def test_fingerprint():
+    fingerprint = get_fingerprint(NaK)
+    # the MSON dict, e.g. the contents of a dcc.Store, has the same fingerprint
+    assert get_fingerprint(NaK.as_dict()) == fingerprint
+
+    noisy = NaK.copy()
+    noisy.translate_sites([1], [1e-7, -1e-7, 0])
+    assert get_fingerprint(noisy) == fingerprint
+    noisy.translate_sites([1], [1e-2, 0, 0])
+    assert get_fingerprint(noisy) != fingerprint
+
+    oxidized = NaK.copy()
+    oxidized.add_oxidation_state_by_element({"Na": 1, "K": 1})
+    assert get_fingerprint(oxidized) != fingerprint
+    antiferro = NaK.copy()
+    antiferro.add_site_property("magmom", [1, 1])
+    assert get_fingerprint(antiferro) != fingerprint
+
+    reordered = Structure.from_sites(NaK.sites[::-1])
+    assert get_fingerprint(reordered) != fingerprint
+    assert get_fingerprint(reordered, order_invariant=True) == get_fingerprint(
+        NaK, order_invariant=True
+    )
+
+    strategy = CutOffDictNN({("Na", "K"): 3.7})
+    graph = StructureGraph.from_local_env_strategy(NaK, strategy)
+    reordered_graph = StructureGraph.from_local_env_strategy(reordered, strategy)
+    assert get_fingerprint(graph) != fingerprint
+    assert get_fingerprint(graph.as_dict()) == get_fingerprint(graph)
+    assert get_fingerprint(graph, order_invariant=True) == get_fingerprint(
+        reordered_graph, order_invariant=True
+    )
+
+    # graphs with the same bonds but different weights, e.g. bond orders
+    weighted = _get_weighted_graph(1, "bond_order")
+    assert get_fingerprint(weighted) != get_fingerprint(
+        _get_weighted_graph(0.5, "bond_order")
+    )
+    assert get_fingerprint(weighted) != get_fingerprint(
+        _get_weighted_graph(1, "bond_length")
+    )
+    assert get_fingerprint(weighted.as_dict()) == get_fingerprint(weighted)
+
+
+def _get_weighted_graph(weight, edge_weight_name):
+    graph = StructureGraph.from_empty_graph(
+        NaK, edge_weight_name=edge_weight_name, edge_weight_units=""
+    )
+    graph.add_edge(0, 1, to_jimage=(0, 0, 0), weight=weight)
+    return graph
+
+
+def test_memoize():
+    cache = Cache(config={"CACHE_TYPE": "SimpleCache"})
+    cache.init_app(Flask(__name__))
+    calls = []
+
+    @memoize(cache)
+    def get_num_sites(structure, options=None):
+        calls.append(structure)
+        return len(structure)
+
+    assert get_num_sites(NaK, options={"a": 1}) == 2
+    assert get_num_sites(NaK.as_dict(), options={"a": 1}) == 2
+    assert get_num_sites(NaK, options={"a": 2}) == 2
+    assert len(calls) == 2
+    assert get_cache_key(NaK, [NaK]) == get_cache_key(NaK.as_dict(), [NaK.copy()])
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from pymatgen.core import Lattice, Site, Species, Structure
+
+from crystal_toolkit.core.legend import Legend
+
+
+def test_legend_lookup_tables():
+    struct = Structure(
+        Lattice.cubic(4.2),
+        ["Na", {"K": 0.5, "Rb": 0.25}, Species("Cl", -1), "Cl"],
+        [[0, 0, 0], [0.5, 0.5, 0.5], [0.5, 0, 0], [0, 0.5, 0]],
+        site_properties={"magmom": [1.5, -1, 0, 0.25]},
+    ).make_supercell(2)
+
+    legend = Legend(struct, color_scheme="magmom", cmap_range=(-0.5, 0.5))
+    assert legend.get_legend()["colors"] == {
+        "#b30326": "1.50",
+        "#3a4cc0": "-1.00",
+        "#000000": "0.00",
+        "#f39879": "0.25",
+    }
+    # values outside of the site collection are still looked up
+    site = Site("Na", [0, 0, 0], properties={"magmom": -0.25})
+    assert legend.get_color(Species("Na"), site) == "#8daffd"
+
+    legend = Legend(struct, radius_scheme="specified_or_average_ionic")
+    assert legend.get_legend()["colors"]["#1ff01f"] == "Cl, Cl⁻"
+    assert legend.get_color(Species("Cl", -1)) == legend.get_color(Species("Cl"))
+    assert legend.get_radius(Species("Cl", -1)) == 1.67
+    assert legend.get_radius(Species("Cl")) != 1.67
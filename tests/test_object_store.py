@@ -0,0 +1,49 @@
+import pytest
+from cachelib import FileSystemCache
+from pymatgen.core import Lattice, Structure
+
+import crystal_toolkit.core.object_store as object_store_module
+from crystal_toolkit.components.structure import StructureMoleculeComponent
+from crystal_toolkit.core.mpcomponent import MPComponent
+from crystal_toolkit.core.object_store import ObjectStore
+from crystal_toolkit.settings import SETTINGS
+
+NaK = Structure(Lattice.cubic(4.2), ["Na", "K"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+
+
+def test_object_store(tmp_path):
+    store = ObjectStore(FileSystemCache(str(tmp_path)), maxsize=1)
+    handle = store.put(NaK)
+    assert ObjectStore.is_handle(handle)
+    assert not ObjectStore.is_handle(NaK.as_dict())
+    # content-addressed, so the same structure gives the same handle
+    assert store.put(NaK.copy()) == handle
+
+    assert store.get(handle) == NaK
+    assert store.cache_info() == {"hits": 1, "misses": 0, "size": 1, "maxsize": 1}
+
+    # another worker sharing the backend decodes the object once
+    other_store = ObjectStore(FileSystemCache(str(tmp_path)))
+    assert other_store.get(handle) == NaK
+    assert other_store.get(handle) is other_store.get(handle)
+    assert other_store.cache_info()["misses"] == 1
+
+    store.backend.clear()
+    other_store.clear()
+    with pytest.raises(KeyError, match="no longer in the object store"):
+        other_store.get(handle)
+
+
+def test_component_object_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "OBJECT_STORE", "disk")
+    monkeypatch.setattr(SETTINGS, "OBJECT_STORE_PATH", tmp_path)
+    monkeypatch.setattr(object_store_module, "_OBJECT_STORE", None)
+
+    component = StructureMoleculeComponent(NaK, id="object_store_test")
+    # the browser only holds a handle to the structure
+    handle = component._stores["default"].data
+    assert ObjectStore.is_handle(handle)
+    assert component.initial_data["default"] is NaK
+    assert MPComponent.from_data(handle) == NaK
+    # objects returned from callbacks are serialized as handles too
+    assert NaK.to_plotly_json() == handle
@@ -0,0 +1,435 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from json import dumps, loads
+
+import numpy as np
+from pymatgen.analysis.graphs import MoleculeGraph, StructureGraph
+from pymatgen.analysis.local_env import CovalentBondNN, CutOffDictNN
+from pymatgen.core import Lattice, Molecule, Structure
+from pymatgen.io.vasp import Chgcar
+
+from crystal_toolkit.core.legend import Legend
+from crystal_toolkit.core.scene import (
+    Cylinders,
+    IndexedSurface,
+    Label,
+    Lines,
+    Scene,
+    Spheres,
+    _json_default,
+    decode_typed_arrays,
+    encode_typed_array,
+    expand_indexed_primitives,
+)
+from crystal_toolkit.renderables.moleculegraph import _get_derived_graph
+from crystal_toolkit.renderables.site import get_site_tooltips
+from crystal_toolkit.renderables.volumetric import get_isosurface_scene
+
+
+def test_array_backed_merge():
+    positions = np.random.default_rng(0).random((10, 3))
+
+    list_spheres = [
+        Spheres(positions=[pos.tolist()], color="#ff0000") for pos in positions
+    ]
+    array_spheres = [
+        Spheres(positions=positions[:4], color="#ff0000"),
+        Spheres(positions=positions[4:], color="#ff0000"),
+    ]
+
+    merged = Spheres.merge(array_spheres)
+    assert isinstance(merged.positions, np.ndarray)
+    assert merged.positions.shape == (10, 3)
+
+    # list-based and array-based scenes give identical JSON
+    list_json = Scene("test", contents=list_spheres).to_json()
+    array_json = Scene("test", contents=array_spheres).to_json()
+    assert list_json == array_json
+    assert isinstance(array_json["contents"][0]["positions"], list)
+
+    # mixing list-based and array-based primitives is also supported
+    pairs = positions.reshape(5, 2, 3)
+    cylinders = Cylinders.merge(
+        [
+            Cylinders(positionPairs=pairs[:2].tolist()),
+            Cylinders(positionPairs=pairs[2:]),
+        ]
+    )
+    assert cylinders.positionPairs.shape == (5, 2, 3)
+    assert Lines(positions=positions).bounding_box == [
+        positions.min(axis=0).tolist(),
+        positions.max(axis=0).tolist(),
+    ]
+
+
+def test_typed_arrays(test_files):
+    chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
+    scene = chgcar.get_scene(isolvl=0.001, normalization="vesta")
+
+    scene_json = scene.to_json()
+    typed_json = scene.to_json(typed_arrays=True)
+
+    isosurface = typed_json["contents"][-1]["contents"][0]
+    assert isosurface["positions"]["dtype"] == "float32"
+    assert len(dumps(typed_json)) < 0.5 * len(dumps(scene_json))
+
+    # decoding recovers the original scene to float32 precision
+    decoded = decode_typed_arrays(typed_json)
+    assert decoded.keys() == scene_json.keys()
+    assert np.allclose(
+        decoded["contents"][-1]["contents"][0]["positions"],
+        scene_json["contents"][-1]["contents"][0]["positions"],
+        atol=1e-5,
+    )
+
+    # small arrays are not worth encoding
+    spheres = Scene("test", [Spheres(positions=[[0, 0, 0]])])
+    assert spheres.to_json(typed_arrays=True) == spheres.to_json()
+
+    encoded = encode_typed_array([[0.5, 1, 2]] * 4)
+    assert encoded["shape"] == [4, 3]
+    assert decode_typed_arrays(encoded) == [[0.5, 1, 2]] * 4
+
+
+def _legacy_to_json(scene: Scene) -> dict:
+    """Scene.to_json as implemented with dataclasses.asdict, for reference."""
+
+    def remove_defaults(scene_dict):
+        trimmed_dict = {}
+        for key, val in scene_dict.items():
+            if isinstance(val, dict):
+                pass
+            elif isinstance(val, list):
+                trimmed_dict[key] = [
+                    remove_defaults(item) if isinstance(item, dict) else item
+                    for item in val
+                ]
+            elif isinstance(val, np.ndarray):
+                trimmed_dict[key] = val.tolist()
+            elif val is not None:
+                trimmed_dict[key] = val
+        return trimmed_dict
+
+    def to_surfaces(contents):
+        # IndexedSurfaces are sent as Surfaces by default
+        for item in contents:
+            if isinstance(item, Scene):
+                item.contents = to_surfaces(item.contents)
+        return [
+            item.to_surface() if isinstance(item, IndexedSurface) else item
+            for item in contents
+        ]
+
+    merged_scene = Scene(
+        name=scene.name,
+        contents=Scene.merge_primitives(to_surfaces(scene.contents)),
+        origin=scene.origin,
+        lattice=scene.lattice,
+    )
+    return remove_defaults(asdict(merged_scene))
+
+
+def test_serializer_matches_asdict(test_files):
+    struct = Structure(
+        Lattice.cubic(4.2),
+        ["Na", {"K": 0.5, "Rb": 0.25}, "Cl", "Cl"],
+        [[0, 0, 0], [0.5, 0.5, 0.5], [0.5, 0, 0], [0, 0.5, 0]],
+        site_properties={"magmom": [1, -1, 0, 0]},
+    )
+    graph = StructureGraph.from_local_env_strategy(
+        struct, CutOffDictNN({("Na", "Cl"): 3})
+    )
+    chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
+
+    # to_json merges primitives of nested scenes in-place, so create each scene anew
+    scene_factories = [
+        struct.get_scene,
+        graph.get_scene,
+        lambda: graph.get_scene(explicitly_calculate_polyhedra_hull=True),
+        lambda: chgcar.get_scene(isolvl=0.001, normalization="vesta"),
+        lambda: Scene("a", [Label("label")]) + Scene("b", [Spheres([[0, 0, 0]])]),
+    ]
+    for get_scene in scene_factories:
+        legacy = dumps(_legacy_to_json(get_scene()), default=_json_default)
+        assert dumps(get_scene().to_json(), default=_json_default) == legacy
+        assert loads(get_scene().to_json_bytes()) == loads(legacy)
+
+
+def test_scene_diff():
+    struct = Structure(
+        Lattice.cubic(4.2), ["Na", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]]
+    ).make_supercell(3)
+    graph = StructureGraph.from_local_env_strategy(
+        struct, CutOffDictNN({("Na", "Cl"): 3})
+    )
+    default = graph.get_scene().to_json()
+
+    scenes = [
+        graph.get_scene(legend=Legend(struct, color_scheme="accessible")).to_json(),
+        graph.get_scene(draw_image_atoms=False).to_json(),
+        graph.get_scene(explicitly_calculate_polyhedra_hull=True).to_json(),
+        Scene("test", [Spheres([[0, 0, 0]])]).to_json(),
+    ]
+    for scene_json in scenes:
+        patch = Scene.diff(default, scene_json)
+        assert Scene.apply_diff(default, patch) == scene_json
+        assert Scene.apply_diff(scene_json, Scene.diff(scene_json, default)) == default
+
+    # recoloring only sends colors
+    recolored = Scene.diff(default, scenes[0])
+    assert len(dumps(recolored)) < 0.2 * len(dumps(scenes[0]))
+    assert {key for changes in recolored.values() for key in changes} == {"color"}
+
+    assert Scene.diff(default, graph.get_scene()) == {}
+
+    # contents mixing scenes and other items are replaced wholesale if any of the
+    # other items changed, without also patching the scenes among them
+    old = {"name": "a", "contents": [{"contents": [1, 2]}, "x"]}
+    new = {"name": "a", "contents": [{"contents": [1, 2, 3]}, "y"]}
+    patch = Scene.diff(old, new)
+    assert patch == {"": {"contents": new["contents"]}}
+    assert Scene.apply_diff(old, patch) == new
+    new = {"name": "a", "contents": [{"contents": [1]}, "x", "z"]}
+    assert Scene.apply_diff(old, Scene.diff(old, new)) == new
+
+
+def _canonical(scene_json):
+    """Scene JSON with the order of contents and positions normalized."""
+    if isinstance(scene_json, list) and not all(
+        isinstance(item, (int, float)) for item in scene_json
+    ):
+        return sorted((_canonical(item) for item in scene_json), key=dumps)
+    if isinstance(scene_json, list):
+        return [_canonical(item) for item in scene_json]
+    if isinstance(scene_json, dict):
+        return {key: _canonical(val) for key, val in scene_json.items()}
+    if isinstance(scene_json, float):
+        return round(scene_json, 6) + 0.0
+    return scene_json
+
+
+def test_batched_structure_graph_scene():
+    struct = Structure(
+        Lattice.cubic(4.2),
+        ["Na", {"K": 0.5, "Rb": 0.25}, "Cl", "Cl"],
+        [[0, 0, 0], [0.5, 0.5, 0.5], [0.5, 0, 0], [0, 0.5, 0]],
+        site_properties={"magmom": [1, -1, 0, 0], "wyckoff": ["a", "b", "c", "c"]},
+    ).make_supercell(2)
+    graph = StructureGraph.from_local_env_strategy(
+        struct, CutOffDictNN({("Na", "Cl"): 3, ("Cl", "Cl"): 3})
+    )
+
+    for kwargs in [
+        {},
+        {"draw_image_atoms": False, "bonded_sites_outside_unit_cell": False},
+        {"group_by_site_property": "wyckoff"},
+    ]:
+        per_site = graph.get_scene(batched=False, **kwargs).to_json()
+        batched = graph.get_scene(**kwargs).to_json()
+        # bonds to equidistant neighbors may be listed in a different order
+        assert [scene["name"] for scene in batched["contents"]] == [
+            scene["name"] for scene in per_site["contents"]
+        ]
+        assert _canonical(loads(dumps(batched, default=_json_default))) == _canonical(
+            loads(dumps(per_site, default=_json_default))
+        )
+
+
+def test_batched_molecule_graph_scene():
+    mol = Molecule(
+        ["C", "H", "H", "H", "H", "O"],
+        [
+            [0, 0, 0],
+            [0.63, 0.63, 0.63],
+            [-0.63, -0.63, 0.63],
+            [-0.63, 0.63, -0.63],
+            [0.63, -0.63, -0.63],
+            [0, 0, 1.4],
+        ],
+    )
+    graph = MoleculeGraph.with_edges(
+        mol,
+        {(0, idx): {"weight": 2 if idx == 5 else 1} for idx in range(1, 6)},
+    )
+
+    for kwargs in [
+        {},
+        {"show_bond_length": True, "show_atom_coord": False},
+        {"draw_polyhedra": True, "explicitly_calculate_polyhedra_hull": True},
+        {"lazy_tooltips": True},
+    ]:
+        per_site = graph.get_scene(batched=False, **kwargs).to_json()
+        batched = graph.get_scene(**kwargs).to_json()
+        assert _canonical(loads(dumps(batched, default=_json_default))) == _canonical(
+            loads(dumps(per_site, default=_json_default))
+        )
+
+
+def test_derived_molecule_graph_cache():
+    mol = Molecule(["O", "H", "H"], [[0, 0, 0], [0.76, 0.59, 0], [-0.76, 0.59, 0]])
+    graph = _get_derived_graph(mol, CovalentBondNN())
+    assert len(graph.graph.edges) == 2
+    assert _get_derived_graph(mol.copy(), CovalentBondNN()) is graph
+    assert _get_derived_graph(mol, CovalentBondNN(tol=0.5)) is not graph
+    # keyed by fingerprint, so floating point noise still hits the cache, but site
+    # properties do not
+    noisy = mol.copy()
+    noisy.translate_sites([1], [1e-9, 0, 0])
+    assert _get_derived_graph(noisy, CovalentBondNN()) is graph
+    magnetic = mol.copy()
+    magnetic.add_site_property("magmom", [0, 1, 1])
+    assert _get_derived_graph(magnetic, CovalentBondNN()) is not graph
+    mol.translate_sites([1], [0.01, 0, 0])
+    assert _get_derived_graph(mol, CovalentBondNN()) is not graph
+
+
+def _without_cylinder_meta(scene_json):
+    if isinstance(scene_json, list):
+        return [_without_cylinder_meta(item) for item in scene_json]
+    if isinstance(scene_json, dict):
+        return {
+            key: _without_cylinder_meta(val)
+            for key, val in scene_json.items()
+            if not (key == "_meta" and scene_json.get("type") == "cylinders")
+        }
+    return scene_json
+
+
+def test_indexed_bonds():
+    struct = Structure(
+        Lattice.cubic(4.2), ["Na", "Cl"], [[0, 0, 0], [0.5, 0, 0]]
+    ).make_supercell(2)
+    graph = StructureGraph.from_local_env_strategy(
+        struct, CutOffDictNN({("Na", "Cl"): 3})
+    )
+    plain = loads(dumps(graph.get_scene().to_json(), default=_json_default))
+    indexed = loads(
+        dumps(graph.get_scene(indexed_bonds=True).to_json(), default=_json_default)
+    )
+
+    assert "indexedCylinders" in dumps(indexed)
+    assert len(dumps(indexed)) < 0.9 * len(dumps(plain))
+    assert _canonical(
+        _without_cylinder_meta(expand_indexed_primitives(indexed))
+    ) == _canonical(_without_cylinder_meta(plain))
+
+    # index pairs are encoded as uint32 typed arrays
+    typed = graph.get_scene(indexed_bonds=True).to_json(typed_arrays=True)
+    assert '"uint32"' in dumps(typed, default=_json_default)
+    assert _canonical(expand_indexed_primitives(decode_typed_arrays(typed))) == (
+        _canonical(expand_indexed_primitives(indexed))
+    )
+
+
+def test_lazy_tooltips():
+    struct = Structure(
+        Lattice.cubic(4.2),
+        ["Na", "Cl"],
+        [[0, 0, 0], [0.5, 0, 0]],
+        site_properties={"magmom": [0.5, 0]},
+    ).make_supercell(2)
+    graph = StructureGraph.from_local_env_strategy(
+        struct, CutOffDictNN({("Na", "Cl"): 3})
+    )
+
+    eager = graph.get_scene().to_json()
+    for batched in (True, False):
+        lazy = graph.get_scene(lazy_tooltips=True, batched=batched).to_json()
+
+        # atoms are merged by appearance, one Spheres per species
+        atoms = lazy["contents"][0]["contents"]
+        assert len(atoms) == 2
+        assert all("tooltip" not in item for item in atoms)
+        assert sum(len(item["_meta"]) for item in atoms) == sum(
+            len(item["positions"]) for item in eager["contents"][0]["contents"]
+        )
+        bonds = lazy["contents"][1]["contents"]
+        assert all(len(meta["atom_idx"]) == 2 for meta in bonds[0]["_meta"])
+
+    # tooltips are resolved from the site indices
+    tooltips = {
+        tuple(item["positions"][0]): item["tooltip"]
+        for item in eager["contents"][0]["contents"]
+    }
+    assert get_site_tooltips(struct, [0, 8]) == [
+        tooltips[tuple(struct[0].coords)],
+        tooltips[tuple(struct[8].coords)],
+    ]
+
+
+def test_symmetry_polyhedra():
+    struct = Structure.from_spacegroup(
+        "P4_2/mnm",
+        Lattice.tetragonal(4.59, 2.96),
+        ["Ti", "O"],
+        [[0, 0, 0], [0.305, 0.305, 0]],
+    ).make_supercell([1, 1, 2])
+    graph = StructureGraph.from_local_env_strategy(
+        struct, CutOffDictNN({("Ti", "O"): 2.1})
+    )
+
+    def get_triangles(scene):
+        # hulls as sets of triangles, independent of the order of their vertices
+        return sorted(
+            sorted(
+                sorted(map(tuple, triangle))
+                for triangle in np.round(surface.positions, 6).reshape(-1, 3, 3)
+            )
+            for surface in scene.contents[2].contents
+        )
+
+    per_site = graph.get_scene(explicitly_calculate_polyhedra_hull=True, batched=False)
+    for kwargs in [{}, {"use_symmetry": True}]:
+        scene = graph.get_scene(explicitly_calculate_polyhedra_hull=True, **kwargs)
+        assert len(scene.contents[2].contents) == len(per_site.contents[2].contents)
+        assert get_triangles(scene) == get_triangles(per_site)
+
+
+def test_indexed_surface(test_files):
+    chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
+    scene = chgcar.get_scene(isolvl=0.001, normalization="vesta")
+    surface = scene.contents[-1].contents[0]
+    assert isinstance(surface, IndexedSurface)
+
+    # by default, the isosurface is sent as a flat list of triangles
+    flat = scene.to_json()
+    isosurface = flat["contents"][-1]["contents"][0]
+    assert isosurface["type"] == "surface"
+    assert len(isosurface["positions"]) == 3 * len(surface.faces)
+
+    indexed = scene.to_json(indexed_surfaces=True)
+    assert indexed["contents"][-1]["contents"][0]["type"] == "indexedSurface"
+    assert len(dumps(indexed, default=_json_default)) < 0.5 * len(dumps(flat))
+    assert expand_indexed_primitives(
+        loads(dumps(indexed, default=_json_default))
+    ) == loads(dumps(flat))
+
+    # faces are encoded as uint32 typed arrays
+    typed = scene.to_json(typed_arrays=True, indexed_surfaces=True)
+    assert typed["contents"][-1]["contents"][0]["faces"]["dtype"] == "uint32"
+    assert np.allclose(
+        expand_indexed_primitives(decode_typed_arrays(typed))["contents"][-1][
+            "contents"
+        ][0]["positions"],
+        isosurface["positions"],
+        atol=1e-5,
+    )
+
+    # normals point away from the regions of high density, and agree with the
+    # winding of the faces
+    lattice = Lattice([[4, 0, 0], [1.5, 3, 0], [0, 0, 8]])
+    frac_coords = np.indices((20, 20, 20)).transpose(1, 2, 3, 0) / 20 - 0.5
+    data = np.exp(-np.sum((frac_coords @ lattice.matrix) ** 2, axis=-1))
+    surface = get_isosurface_scene(
+        data, lattice, isolvl=0.5, step_size=1, include_normals=True
+    ).contents[0]
+    radial = surface.positions - lattice.get_cartesian_coords([0.5, 0.5, 0.5])
+    radial /= np.linalg.norm(radial, axis=1, keepdims=True)
+    assert np.allclose(np.linalg.norm(surface.normals, axis=1), 1)
+    assert np.all(np.sum(radial * surface.normals, axis=1) > 0.9)
+    triangles = surface.positions[surface.faces]
+    face_normals = np.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    )
+    assert np.all(np.sum(face_normals * radial[surface.faces[:, 0]], axis=1) > 0)
@@ -1,7 +1,23 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
 import pytest
+from cachelib import FileSystemCache
+from pymatgen.analysis.local_env import CrystalNN, MinimumDistanceNN
 from pymatgen.core import Lattice, Molecule, Structure
+from pymatgen.core.surface import Slab, SlabGenerator
 
-from crystal_toolkit.components.structure import StructureMoleculeComponent
+from crystal_toolkit.components import structure as structure_module
+from crystal_toolkit.components.structure import (
+    StructureMoleculeComponent,
+    UnitCellCache,
+    _get_graph_in_process,
+)
+from crystal_toolkit.core.fingerprint import get_fingerprint
+from crystal_toolkit.core.graph_cache import GraphCache, get_graph_cache
+from crystal_toolkit.core.mpcomponent import MPComponent
+from crystal_toolkit.settings import SETTINGS
 
 NaK = Structure(Lattice.cubic(4.2), ["Na", "K"], [[0, 0, 0], [0.5, 0.5, 0.5]])
 
@@ -26,3 +42,213 @@ def test_repr_without_structure():
     expected = "StructureMoleculeComponent(formula=None, atoms=None)"
     assert repr(component) == expected
     assert str(component) == expected
+
+
+def test_get_sites_to_draw():
+    struct = Structure(
+        Lattice.cubic(4.2),
+        ["Na", "K", "Cl", "Cl"],
+        [[0, 0, 0], [0.5, 0.98, 0.5], [0.97, 0.04, 0.5], [0.07, 0.5, 1.0]],
+    )
+    assert struct._get_sites_to_draw(draw_image_atoms=False) == {
+        (idx, (0, 0, 0)) for idx in range(4)
+    }
+
+    corner_images = [
+        (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 0), (1, 0, 1), (0, 1, 1), (1, 1, 1)
+    ]  # fmt: skip
+    expected = {
+        *((idx, (0, 0, 0)) for idx in range(4)),
+        *((0, image) for image in corner_images),
+        (1, (0, -1, 0)),
+        (2, (-1, 0, 0)),
+        (2, (0, 1, 0)),
+        (3, (0, 0, -1)),
+    }
+    assert struct._get_sites_to_draw() == expected
+
+    # with a larger tolerance, site 3 is also on a boundary
+    assert (3, (1, 0, 0)) in struct._get_sites_to_draw(tol=0.1)
+    assert (3, (1, 0, 0)) not in struct._get_sites_to_draw()
+
+
+def test_graph_cache(tmp_path):
+    graph_cache = GraphCache(FileSystemCache(str(tmp_path)))
+    kwargs = {"cut_off_dict": [["Na", "K", 3.7]]}
+    assert graph_cache.get(NaK, "CutOffDictNN", kwargs) is None
+
+    graph = StructureMoleculeComponent._preprocess_input_to_graph(
+        NaK, bonding_strategy="CutOffDictNN", bonding_strategy_kwargs=kwargs
+    )
+    graph_cache.set(graph, "CutOffDictNN", kwargs)
+    # another worker sharing the backend gets the same graph
+    cached_graph = GraphCache(FileSystemCache(str(tmp_path))).get(
+        NaK, "CutOffDictNN", kwargs
+    )
+    assert cached_graph == graph
+    assert cached_graph.structure is NaK
+    assert len(cached_graph.graph.edges) == 8
+    # the JSON-serializable cut-off list was not replaced by a dict
+    assert kwargs == {"cut_off_dict": [["Na", "K", 3.7]]}
+
+    assert graph_cache.get(NaK, "CutOffDictNN", {"cut_off_dict": []}) is None
+    assert graph_cache.get(NaK, "MinimumDistanceNN", kwargs) is None
+    assert graph_cache.cache_info() == {"hits": 0, "misses": 3}
+
+
+def test_bonding_timeout(monkeypatch):
+    monkeypatch.setattr(SETTINGS, "BONDING_POOL_SIZE", 1)
+    monkeypatch.setattr(SETTINGS, "BONDING_TIMEOUT", 0)
+    monkeypatch.setattr(SETTINGS, "GRAPH_CACHE_SIZE", 0)
+
+    NaCl = Structure(Lattice.cubic(3.4), ["Na", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+    graph = StructureMoleculeComponent._preprocess_input_to_graph(
+        NaCl, bonding_strategy="CrystalNN"
+    )
+    # bonds from the VESTA bond lengths instead
+    assert len(graph.graph.edges) == 8
+    warning = StructureMoleculeComponent._get_bonding_warning(graph)
+    assert warning.startswith("Bonds could not be found with CrystalNN in 0 s")
+    assert (
+        StructureMoleculeComponent._get_bonding_warning(
+            MPComponent.from_data(graph.as_dict())
+        )
+        == warning
+    )
+
+    monkeypatch.setattr(SETTINGS, "BONDING_TIMEOUT", 60)
+    graph = StructureMoleculeComponent._preprocess_input_to_graph(
+        NaCl, bonding_strategy="CrystalNN"
+    )
+    assert StructureMoleculeComponent._get_bonding_warning(graph) is None
+
+
+class HangingNN(MinimumDistanceNN):
+    def get_nn_info(self, structure, n):
+        time.sleep(3600)
+
+
+class SlowNN(MinimumDistanceNN):
+    def get_nn_info(self, structure, n):
+        time.sleep(0.5)
+        return super().get_nn_info(structure, n)
+
+
+def test_bonding_timeout_kills_only_its_process(monkeypatch):
+    monkeypatch.setattr(SETTINGS, "BONDING_POOL_SIZE", 2)
+    monkeypatch.setattr(SETTINGS, "BONDING_TIMEOUT", 2)
+
+    # another request whose computation is running when the first one times out
+    results = []
+    thread = threading.Timer(
+        1.5, lambda: results.append(_get_graph_in_process(NaK, SlowNN()))
+    )
+    thread.start()
+    with pytest.raises(FuturesTimeoutError):
+        _get_graph_in_process(NaK, HangingNN())
+    thread.join()
+    assert len(results[0].graph.edges) > 0
+
+    # the stuck process does not hold a slot, so later structures still get their
+    # own bonds
+    monkeypatch.setattr(SETTINGS, "BONDING_POOL_SIZE", 1)
+    graph = _get_graph_in_process(NaK, CrystalNN())
+    assert len(graph.graph.edges) > 0
+    assert structure_module._BONDING_PROCESSES == 0
+
+
+def test_unit_cell_cache():
+    unit_cells = UnitCellCache()
+    # bcc iron in its conventional cell
+    structure = Structure(Lattice.cubic(3), ["Fe", "Fe"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+    options = {"bonding_strategy": "MinimumDistanceNN", "bonding_strategy_kwargs": {}}
+
+    futures = unit_cells.precompute(
+        structure, ["primitive", "conventional"], graph_options=options
+    )
+    primitive, conventional = (future.result() for future in futures)
+    assert len(primitive) == 1
+    assert len(conventional) == 2
+    assert unit_cells.get(structure, "primitive") is primitive
+    assert unit_cells.get(structure, "input") is structure
+    assert unit_cells.cache_info() == {"hits": 1, "misses": 0, "size": 2, "maxsize": 64}
+    # the bonding graph was computed in the background too
+    graph_cache = get_graph_cache()
+    hits = graph_cache.cache_info()["hits"]
+    StructureMoleculeComponent._preprocess_input_to_graph(primitive, **options)
+    assert graph_cache.cache_info()["hits"] == hits + 1
+    # the contents of a dcc.Store can be checked without decoding them
+    fingerprint = get_fingerprint(structure.as_dict())
+    assert unit_cells.touch(fingerprint, ["primitive", "conventional"])
+    assert not unit_cells.touch(fingerprint, ["reduced_lll"])
+
+    # tasks of a structure that no session requested recently are abandoned, once
+    # another structure is precomputed
+    gate = threading.Event()
+    unit_cells._executor.submit(gate.wait)
+    (nak_future,) = unit_cells.precompute(NaK, ["primitive"], graph_options=options)
+    NaCl = Structure(Lattice.cubic(5.6), ["Na", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+    futures = unit_cells.precompute(NaCl, ["primitive"], graph_options=options)
+    assert not nak_future.cancelled()
+    unit_cells.idle_timeout = 0
+    time.sleep(0.01)
+    futures += unit_cells.precompute(NaCl, ["reduced_lll"], graph_options=options)
+    assert nak_future.cancelled()
+    gate.set()
+    assert all(future.result() is not None for future in futures)
+    assert unit_cells.cache_info()["size"] == 4
+    assert len(unit_cells.get(NaK, "primitive")) == 2
+    assert unit_cells.cache_info()["misses"] == 1
+
+
+def test_wrap_frac_coords():
+    structure = Structure(
+        Lattice.cubic(4.2),
+        ["Na", "K"],
+        [[-0.25, 0, 1.0], [0.5, 1.5, 0.5]],
+        site_properties={"magmom": [1, -1]},
+    )
+    graph = StructureMoleculeComponent._preprocess_input_to_graph(structure)
+    assert graph.structure.frac_coords.tolist() == [[0.75, 0, 0], [0.5, 0.5, 0.5]]
+    assert graph.structure.site_properties == {"magmom": [1, -1]}
+    # the input structure is not modified
+    assert structure.frac_coords[0].tolist() == [-0.25, 0, 1.0]
+    # structures that are already wrapped are used as-is
+    assert StructureMoleculeComponent._preprocess_input_to_graph(NaK).structure is NaK
+
+    slab = SlabGenerator(NaK, (1, 0, 0), 5, 5).get_slab()
+    slab.translate_sites([0], [-0.5, 0, 0])
+    graph = StructureMoleculeComponent._preprocess_input_to_graph(slab)
+    assert isinstance(graph.structure, Slab)
+    assert graph.structure.miller_index == (1, 0, 0)
+    assert graph.structure.lattice == slab.lattice
+    assert (graph.structure.frac_coords < 1).all()
+    assert (graph.structure.frac_coords >= 0).all()
+
+
+def test_precompute_unit_cells_from_data(monkeypatch):
+    monkeypatch.setattr(SETTINGS, "UNIT_CELL_PRECOMPUTE", True)
+    decoded = []
+    from_data = MPComponent.from_data
+    monkeypatch.setattr(
+        MPComponent,
+        "from_data",
+        staticmethod(lambda data: decoded.append(data) or from_data(data)),
+    )
+    options = {
+        "bonding_strategy": "MinimumDistanceNN",
+        "bonding_strategy_kwargs": {},
+        "unit_cell_choice": "input",
+    }
+    structure = Structure(Lattice.cubic(3.1), ["W", "W"], [[0, 0, 0], [0.5] * 3])
+    precompute = StructureMoleculeComponent._precompute_unit_cells
+    futures = precompute(structure.as_dict(), options)
+    assert len(futures) == 4
+    assert len(decoded) == 1
+    # unit cells that are cached or being computed are not scheduled again, and the
+    # structure is not decoded again for this
+    assert precompute(structure.as_dict(), options) == []
+    assert len(decoded) == 1
+    assert precompute(water.as_dict(), options) == []
+    for future in futures:
+        future.result()
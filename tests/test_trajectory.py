@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+from pymatgen.analysis.local_env import CutOffDictNN
+from pymatgen.core import Lattice, Structure
+from pymatgen.core.trajectory import Trajectory
+
+from crystal_toolkit.core.scene import (
+    decode_animation,
+    decode_typed_arrays,
+    encode_animation,
+    expand_indexed_primitives,
+)
+from crystal_toolkit.renderables.trajectory import TrajectorySource
+
+
+def test_animation_roundtrip():
+    rng = np.random.default_rng(0)
+    frames = 1000 + np.cumsum(rng.normal(0, 0.01, (2000, 5, 3)), axis=0)
+
+    animate = encode_animation(frames)
+    assert animate.dtype == np.float32
+    decoded = decode_animation(frames[0], animate)
+    # rounding errors do not accumulate over the frames
+    assert np.abs(decoded - frames).max() < 1e-3
+
+
+def test_trajectory_scene():
+    structure = Structure(Lattice.cubic(3), ["Si", "Si"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+    rng = np.random.default_rng(0)
+    frac_coords = structure.frac_coords + rng.normal(0, 0.01, (20, 2, 3))
+    trajectory = Trajectory(
+        species=structure.species, coords=frac_coords % 1, lattice=structure.lattice
+    )
+
+    scene = trajectory.get_scene(
+        bonding_strategy=CutOffDictNN({("Si", "Si"): 2.7}), bond_interval=10
+    )
+    scene_json = expand_indexed_primitives(
+        decode_typed_arrays(json.loads(scene.to_json_bytes(typed_arrays=True)))
+    )
+    atoms, bonds, _unit_cell = scene_json["contents"]
+
+    spheres = atoms["contents"][0]
+    frames = decode_animation(spheres["positions"], spheres["_animate"])
+    assert frames.shape == (20, 2, 3)
+    # sites are unwrapped from the first frame, so they do not jump across the cell
+    unwrapped = frac_coords - frac_coords[0] + frac_coords[0] % 1
+    assert np.allclose(frames, unwrapped @ structure.lattice.matrix, atol=1e-4)
+
+    assert [bond.get("reference") for bond in bonds["contents"]] == [
+        "frames 0-9",
+        "frames 10-19",
+    ]
+    assert bonds["contents"][1]["visible"] is False
+    bond_frames = decode_animation(
+        bonds["contents"][0]["positionPairs"], bonds["contents"][0]["_animate"]
+    )
+    # 8 neighbors of each site, as half bonds
+    assert bond_frames.shape == (20, 16, 2, 3)
+    assert np.allclose(
+        np.linalg.norm(bond_frames[:, :, 1] - bond_frames[:, :, 0], axis=-1),
+        np.sqrt(3) * 3 / 4,
+        atol=0.1,
+    )
+
+
+def test_trajectory_source(tmp_path):
+    structure = Structure(Lattice.cubic(3), ["Si", "Si"], [[0, 0, 0], [0.5, 0.5, 0.5]])
+    rng = np.random.default_rng(0)
+    frac_coords = (structure.frac_coords + rng.normal(0, 0.01, (25, 2, 3))) % 1
+
+    # XDATCAR of a constant-cell run
+    lines = ["Si2", "1.0", "3 0 0", "0 3 0", "0 0 3", "Si", "2"]
+    for frame, coords in enumerate(frac_coords, start=1):
+        lines.append(f"Direct configuration= {frame}")
+        lines.extend(" ".join(map(str, site)) for site in coords)
+    (tmp_path / "XDATCAR").write_text("\n".join(lines))
+
+    source = TrajectorySource.from_xdatcar(
+        tmp_path / "XDATCAR", tmp_path / "source", window_size=10, prefetch=0
+    )
+    assert len(source) == 25
+    assert source.n_windows == 3
+    assert source.constant_lattice
+    assert source.get_frames(2) == (20, 24)
+    assert np.allclose(source.frac_coords, frac_coords)
+
+    frac_window, lattice = source.get_window(1)
+    assert np.allclose(frac_window, frac_coords[10:20])
+    assert np.allclose(lattice, np.eye(3) * 3)
+    assert source.cache_info()["misses"] == 1
+    # windows loaded in the background are served from the cache
+    for future in source.prefetch([1, 2, 3]):
+        future.result()
+    source.get_window(2)
+    assert source.cache_info() == {"hits": 1, "misses": 1, "size": 2, "maxsize": 16}
+
+    strategy = CutOffDictNN({("Si", "Si"): 2.7})
+    bonds = source.get_bonds(strategy)
+    assert len(bonds) == 8
+    assert source.get_bonds(strategy) is bonds
+
+    scene_json = expand_indexed_primitives(
+        decode_typed_arrays(source.get_scene(2, bonding_strategy=strategy).to_json())
+    )
+    cylinders = scene_json["contents"][1]["contents"][0]
+    bond_frames = decode_animation(cylinders["positionPairs"], cylinders["_animate"])
+    assert bond_frames.shape == (5, 16, 2, 3)
+    # bonds of the first frame stay bonds as the sites move across the cell
+    assert np.allclose(
+        np.linalg.norm(bond_frames[:, :, 1] - bond_frames[:, :, 0], axis=-1),
+        np.sqrt(3) * 3 / 4,
+        atol=0.1,
+    )
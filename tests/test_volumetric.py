@@ -1,6 +1,15 @@
+import numpy as np
 import pytest
 from pymatgen.io.vasp import Chgcar
 
+from crystal_toolkit.renderables.volumetric import (
+    ISOSURFACE_CACHE,
+    VolumetricPyramid,
+    _chunked_marching_cubes,
+    _get_marching_cubes_pool,
+    _marching_cubes,
+)
+
 
 def test_volumetric(test_files):
     chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
@@ -19,3 +28,129 @@ def test_volumetric(test_files):
 
     # vesta units
     scene = chgcar.get_scene(isolvl=0.001, normalization="vesta")
+
+
+def test_isosurface_cache(test_files):
+    chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
+    ISOSURFACE_CACHE.clear()
+
+    scene = chgcar.get_scene(isolvl=10, normalization=None)
+    assert ISOSURFACE_CACHE.cache_info()["misses"] == 1
+    cached_scene = chgcar.get_scene(isolvl=10, normalization=None)
+    assert ISOSURFACE_CACHE.cache_info()["hits"] == 1
+    assert cached_scene.to_json() == scene.to_json()
+
+    futures = chgcar.precompute_isosurfaces([5, 10, 20], normalization=None)
+    # isolevel 10 is already cached
+    assert len(futures) == 2
+    for future in futures:
+        future.result()
+    chgcar.get_scene(isolvl=20, normalization=None)
+    assert ISOSURFACE_CACHE.cache_info() == {
+        "hits": 2,
+        "misses": 1,
+        "size": 3,
+        "maxsize": ISOSURFACE_CACHE.maxsize,
+    }
+
+    # out of range errors are raised by the futures, and not cached
+    max_val = chgcar.data["total"].max()
+    (future,) = chgcar.precompute_isosurfaces([max_val * 2], normalization=None)
+    with pytest.raises(ValueError, match="Isosurface level is not within data range"):
+        future.result()
+    assert ISOSURFACE_CACHE.cache_info()["size"] == 3
+
+
+def test_chunked_isosurface(test_files):
+    data = Chgcar.from_file(test_files / "chgcar.vasp").data["total"]
+    for step_size in (1, 3):
+        vertices, faces, normals = _marching_cubes(
+            np.pad(data, (0, 1), "wrap"), 10, step_size
+        )
+        chunked_vertices, chunked_faces, chunked_normals = _chunked_marching_cubes(
+            data, 10, step_size, n_chunks=3, max_workers=2
+        )
+        # the same vertices, without seam duplicates, up to their order
+        order = np.lexsort(vertices.T)
+        chunked_order = np.lexsort(chunked_vertices.T)
+        assert np.allclose(vertices[order], chunked_vertices[chunked_order], atol=1e-4)
+        assert np.allclose(normals[order], chunked_normals[chunked_order])
+
+        # the same faces, in terms of the sorted vertices
+        rank, chunked_rank = np.argsort(order), np.argsort(chunked_order)
+        assert {tuple(face) for face in np.sort(rank[faces], axis=1)} == {
+            tuple(face) for face in np.sort(chunked_rank[chunked_faces], axis=1)
+        }
+
+    # the process pool is reused between calls
+    assert _get_marching_cubes_pool(2) is _get_marching_cubes_pool()
+
+
+def test_volumetric_pyramid(test_files, tmp_path):
+    chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
+    data = chgcar.data["total"]
+    chgcar.write_pyramid(tmp_path / "pyramid", factors=(1, 2, 4))
+
+    pyramid = VolumetricPyramid(tmp_path / "pyramid")
+    assert pyramid.factors == [1, 2, 4]
+    assert pyramid.structure == chgcar.structure
+    assert np.array_equal(pyramid.get_level(1), data)
+    coarse = pyramid.get_level(4)
+    assert isinstance(coarse, np.memmap)
+    assert coarse.shape == tuple(round(n / 4) for n in data.shape)
+    # averaging preserves the mean of the data
+    assert np.isclose(coarse.mean(), data.mean(), rtol=0.05)
+
+    isolvl = 10 / chgcar.structure.volume
+    assert pyramid.get_factor(10) == 1
+    assert pyramid.get_factor(10, triangle_budget=1) == 4
+    # the isolevel is scaled instead of the data, so the surfaces agree to within
+    # rounding
+    surface = pyramid.get_scene(isolvl=isolvl).contents[-1].contents[0]
+    expected = chgcar.get_scene(isolvl=isolvl, step_size=1).contents[-1].contents[0]
+    assert np.allclose(surface.positions, expected.positions, atol=1e-6)
+    assert np.array_equal(surface.faces, expected.faces)
+
+    n_faces = [
+        len(scene.contents[-1].contents[0].faces)
+        for scene in pyramid.iter_scenes(isolvl=isolvl, triangle_budget=10**9)
+    ]
+    # refined from coarse to fine
+    assert n_faces == sorted(n_faces)
+    assert len(n_faces) == 3
+
+
+def test_isosurface_triangle_budget(test_files):
+    chgcar = Chgcar.from_file(test_files / "chgcar.vasp")
+    full_scene = chgcar.get_scene(isolvl=10, step_size=1, normalization=None)
+    full_surface = full_scene.contents[-1].contents[0]
+    n_triangles = len(full_surface.faces)
+
+    scene = chgcar.get_scene(
+        isolvl=10, step_size=1, normalization=None, triangle_budget=n_triangles // 10
+    )
+    iso_scene = scene.contents[-1]
+    surface = iso_scene.contents[0]
+    assert len(surface.faces) <= n_triangles // 10
+    assert surface.faces.max() == len(surface.positions) - 1
+    simplification = scene.simplification
+    assert simplification is iso_scene.simplification
+    assert simplification.original_triangles == n_triangles
+    assert simplification.triangles == len(surface.faces)
+    assert simplification.reduction >= 0.9
+    # vertices stay within a few grid spacings of the original surface
+    grid_spacing = max(chgcar.structure.lattice.abc) / min(chgcar.dim)
+    assert 0 < simplification.max_error < 5 * grid_spacing
+
+    # an explicit budget of 0 does not fall back to the setting
+    scene = chgcar.get_scene(
+        isolvl=10, step_size=1, normalization=None, triangle_budget=0
+    )
+    assert scene.simplification.triangles == 0
+
+    # meshes within the budget are unchanged
+    scene = chgcar.get_scene(
+        isolvl=10, step_size=1, normalization=None, triangle_budget=n_triangles
+    )
+    assert scene.simplification is None
+    assert len(scene.contents[-1].contents[0].faces) == n_triangles